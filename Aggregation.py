@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/Aggregation.py:
+# This is the Aggregation Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           Aggregation.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import numpy as np
+from collections import OrderedDict
+
+# Aggregation main functions
+#-----------------------------------------------------------------------
+# The output files have one line per satellite and epoch. These functions
+# aggregate their columns per key (epoch, PRN...) in a single pass over
+# the data, instead of filtering the whole columns once per key
+
+def countPerKey(Keys, KeyMin, KeyMax, Weights=None):
+
+    # Purpose: count the rows (or sum the weights) of every integer key
+    #          in [KeyMin, KeyMax]
+
+    # Parameters
+    # ==========
+    # Keys: array
+    #       Integer key of every row (e.g. SOD)
+    # KeyMin: int
+    #         First key
+    # KeyMax: int
+    #         Last key
+    # Weights: array
+    #          Value to sum of every row (by default, 1 to count the rows)
+
+    # Returns
+    # =======
+    # Counts: array
+    #         Count (or sum) of every key from KeyMin to KeyMax, 0 for the
+    #         keys without rows
+
+    Keys = np.asarray(Keys).astype(np.int64)
+    Valid = (Keys >= KeyMin) & (Keys <= KeyMax)
+
+    if Weights is not None:
+        Weights = np.asarray(Weights, dtype=np.float64)[Valid]
+
+    return np.bincount(Keys[Valid] - KeyMin, weights=Weights, minlength=KeyMax - KeyMin + 1)
+
+# End of countPerKey()
+
+def groupRows(Keys):
+
+    # Purpose: group the rows by key, keeping their order within each
+    #          group
+
+    # Parameters
+    # ==========
+    # Keys: array
+    #       Key of every row (e.g. PRN)
+
+    # Returns
+    # =======
+    # Groups: dict
+    #         Row indices of every key, sorted by key
+
+    Keys = np.asarray(Keys)
+    Order = np.argsort(Keys, kind="stable")
+    GroupKeys, Starts = np.unique(Keys[Order], return_index=True)
+
+    return OrderedDict(zip(GroupKeys.tolist(), np.split(Order, Starts[1:])))
+
+# End of groupRows()
+
+def computeStatsPerKey(Keys, Values, KeyList, Percentile):
+
+    # Purpose: compute the maximum, minimum, RMS and a percentile of the
+    #          values of every key
+
+    # Parameters
+    # ==========
+    # Keys: array
+    #       Integer key of every row (e.g. PRN)
+    # Values: array
+    #         Value of every row
+    # KeyList: list
+    #          Keys for which the statistics are computed
+    # Percentile: float
+    #             Percentile to compute [%], with linear interpolation as
+    #             numpy.percentile
+
+    # Returns
+    # =======
+    # Stats: dict
+    #        Arrays "Max", "Min", "RMS" and "Pct" with the statistics of
+    #        every key in KeyList (0.0 for the keys without rows)
+
+    Keys = np.asarray(Keys).astype(np.int64)
+    Values = np.asarray(Values, dtype=np.float64)
+    KeyList = np.asarray(KeyList, dtype=np.int64)
+
+    Stats = OrderedDict({})
+    for Stat in ["Max", "Min", "RMS", "Pct"]:
+        Stats[Stat] = np.zeros(len(KeyList))
+
+    if len(KeyList) == 0:
+        return Stats
+
+    # Keep the rows of the requested keys, sorted by key and by value
+    Sorter = np.argsort(KeyList)
+    Pos = Sorter[np.minimum(np.searchsorted(KeyList, Keys, sorter=Sorter), len(KeyList) - 1)]
+    Valid = KeyList[Pos] == Keys
+    Pos, Values = Pos[Valid], Values[Valid]
+    if len(Values) == 0:
+        return Stats
+
+    Order = np.lexsort((Values, Pos))
+    Pos, Values = Pos[Order], Values[Order]
+
+    Counts = np.bincount(Pos, minlength=len(KeyList))
+    Ends = np.cumsum(Counts)
+    Starts = Ends - Counts
+    InView = Counts > 0
+
+    Stats["Min"][InView] = Values[Starts[InView]]
+    Stats["Max"][InView] = Values[Ends[InView] - 1]
+    Stats["RMS"][InView] = np.sqrt(np.bincount(Pos, weights=Values**2, \
+        minlength=len(KeyList))[InView] / Counts[InView])
+
+    # Percentile interpolated between the two closest sorted values
+    Rank = (Counts[InView] - 1) * Percentile / 100.0
+    Low = np.floor(Rank).astype(np.int64)
+    High = np.minimum(Low + 1, Counts[InView] - 1)
+    LowValue = Values[Starts[InView] + Low]
+    HighValue = Values[Starts[InView] + High]
+    Stats["Pct"][InView] = LowValue + (HighValue - LowValue) * (Rank - Low)
+
+    return Stats
+
+# End of computeStatsPerKey()
+
+########################################################################
+# END OF AGGREGATION FUNCTIONS MODULE
+########################################################################
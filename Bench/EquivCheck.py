@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+
+########################################################################
+# EquivCheck.py:
+# This is the Outputs Equivalence Check of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           EquivCheck.py
+#  Date(YY/MM/DD): 16/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   EquivCheck.py $SCEN_PATH [--reference SPEC] [--candidate SPEC]
+#                 [--jobs N] [--tol-factor K]
+#   EquivCheck.py --dirs $REF_OUT_PATH $CAND_OUT_PATH [--tol-factor K]
+#
+#   SPEC: variant of StageBench.py (SCALAR, VECTOR, PIPELINE, NPZ) or
+#         configuration parameters KEY=FIELDS[,KEY=FIELDS...] overriding
+#         the scenario configuration (default: SCALAR as reference and
+#         VECTOR as candidate)
+#
+#   Runs the full chain on the scenario with the reference and with the
+#   candidate configurations (or takes the outputs of two runs in
+#   $REF_OUT_PATH and $CAND_OUT_PATH, e.g. of two commits) and compares
+#   the PREPRO, CORR, POS, PERF and VPE_HIST files column by column. The
+#   tolerance of each column is K units of its last written digit
+#   (exact for integers and strings). The first divergent line of each
+#   file is reported with its SOD/PRN. Exits with an error if any file
+#   differs
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+import glob
+import shutil
+import time
+from collections import OrderedDict
+import numpy as np
+from StageBench import BENCH_VARIANTS, runVariant
+from InputOutput import PreproIdx, PreproFmt, CorrIdx, CorrFmt, PosIdx, PosFmt
+from InputOutput import PerfIdx, PerfFmt, HistIdx, HistFmt, OUTPUT_EXT
+from InputOutput import readOutputFile
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Compared outputs: [OUT subdirectory and file prefix, columns, formats,
+# columns identifying a line]
+EQUIV_OUTPUTS = OrderedDict({})
+EQUIV_OUTPUTS["PREPRO"] = ["PPVE/PREPRO_OBS_", PreproIdx, PreproFmt, ["SOD", "PRN"]]
+EQUIV_OUTPUTS["CORR"] = ["CORR/CORR_", CorrIdx, CorrFmt, ["SOD", "PRN"]]
+EQUIV_OUTPUTS["POS"] = ["SPVT/POS_", PosIdx, PosFmt, ["SOD", "SOL"]]
+EQUIV_OUTPUTS["PERF"] = ["PERF/PERF_", PerfIdx, PerfFmt, ["RCVR", "SERVICE"]]
+EQUIV_OUTPUTS["VPE_HIST"] = ["PERF/VPE_HIST_", HistIdx, HistFmt, ["SERVICE", "BINID"]]
+
+# Files with a compared prefix which are not compared
+EQUIV_SKIPPED = ["PERF_SUM_"]
+
+# Outputs directories of the chain
+EQUIV_DIRS = ["PPVE", "CORR", "SPVT", "PERF"]
+
+# Default reference and candidate
+EQUIV_DEFAULTS = {"Reference": "SCALAR", "Candidate": "VECTOR"}
+
+def displayUsage():
+    sys.stderr.write("ERROR: Please provide path to SCENARIO or the outputs to compare\n")
+    sys.stderr.write("Usage: EquivCheck.py $SCEN_PATH [--reference SPEC] [--candidate SPEC] "\
+        "[--jobs N] [--tol-factor K]\n")
+    sys.stderr.write("       EquivCheck.py --dirs $REF_OUT_PATH $CAND_OUT_PATH [--tol-factor K]\n")
+
+def readVariantSpec(Spec):
+
+    # Purpose: get the configuration parameters of a reference or
+    #          candidate specification
+
+    # Returns
+    # =======
+    # Overrides: dict
+    #            Fields of the configuration parameters overriding the
+    #            scenario configuration (None if Spec is not valid)
+
+    if Spec in BENCH_VARIANTS:
+        return BENCH_VARIANTS[Spec]
+
+    Overrides = OrderedDict({})
+    for Param in Spec.split(','):
+        if '=' not in Param:
+            return None
+        Key, Fields = Param.split('=', 1)
+        Overrides[Key] = Fields
+
+    return Overrides
+
+# End of readVariantSpec()
+
+def readArguments(Argv):
+
+    # Purpose: read the command line arguments
+
+    # Returns
+    # =======
+    # Options: dict
+    #          Scenario or outputs paths, reference and candidate
+    #          specifications, number of jobs and tolerance factor
+
+    Options = {"Scen": None, "Dirs": None, "Jobs": 1, "TolFactor": 1.0}
+    Options.update(EQUIV_DEFAULTS)
+
+    if len(Argv) >= 4 and Argv[1] == "--dirs":
+        Options["Dirs"] = Argv[2:4]
+        Args = Argv[4:]
+    elif len(Argv) >= 2 and not Argv[1].startswith("--"):
+        Options["Scen"] = Argv[1]
+        Args = Argv[2:]
+    else:
+        displayUsage()
+        sys.exit()
+
+    while len(Args) > 1 and Args[0].startswith("--"):
+        Key = Args[0][2:]
+        if Key in ["reference", "candidate"] and Options["Scen"] is not None and \
+            readVariantSpec(Args[1]) is not None:
+            Options[Key.capitalize()] = Args[1]
+        elif Key == "jobs" and Args[1].isdigit() and int(Args[1]) >= 1:
+            Options["Jobs"] = int(Args[1])
+        elif Key == "tol-factor":
+            try:
+                Options["TolFactor"] = float(Args[1])
+            except ValueError:
+                displayUsage()
+                sys.exit()
+        else:
+            displayUsage()
+            sys.exit()
+        Args = Args[2:]
+
+    if len(Args) > 0:
+        displayUsage()
+        sys.exit()
+
+    return Options
+
+# End of readArguments()
+
+def readScenConf(CfgFile):
+
+    # Purpose: read the fields of each parameter of a configuration file,
+    #          as strings
+
+    Conf = OrderedDict({})
+    with open(CfgFile, 'r') as f:
+        for Line in f:
+            Fields = Line.split()
+            if len(Fields) > 1 and not Line.startswith('#'):
+                Conf[Fields[0]] = " ".join(Fields[1:])
+
+    return Conf
+
+# End of readScenConf()
+
+def getColumnTol(Fmt, TolFactor):
+
+    # Purpose: get the tolerance of a column from its output format: one
+    #          unit of the last written digit, as two roundings of close
+    #          values can differ by that much
+
+    # Parameters
+    # ==========
+    # Fmt: str
+    #      Format of the column (e.g. "%8.3f")
+    # TolFactor: float
+    #            Number of units of the last written digit tolerated
+
+    # Returns
+    # =======
+    # AbsTol, RelTol: float
+    #                 Absolute and relative tolerances (None for strings)
+
+    if Fmt.endswith("s"):
+        return None, None
+
+    if Fmt.endswith("d"):
+        return 0.0, 0.0
+
+    Precision = int(Fmt.split('.')[1][:-1]) if '.' in Fmt else 6
+
+    # Exponent format: the last digit is relative to the value
+    if Fmt.endswith("e"):
+        return 0.0, TolFactor * 10.0**-Precision
+
+    return TolFactor * 10.0**-Precision, 0.0
+
+# End of getColumnTol()
+
+def toReportValue(Value):
+
+    # Purpose: convert a value of an output column to a value of the
+    #          report: numpy scalars to the equivalent Python scalars,
+    #          strings (e.g. RCVR, SERVICE, CONST) unchanged
+
+    if isinstance(Value, np.generic):
+        return np.asarray(Value).item()
+
+    return Value
+
+# End of toReportValue()
+
+def compareOutputFile(RefPath, CandPath, ColIdx, Fmt, Keys, TolFactor):
+
+    # Purpose: compare two output files column by column
+
+    # Parameters
+    # ==========
+    # RefPath, CandPath: str
+    #                    Reference and candidate files (text or NPZ)
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+    # Fmt: list
+    #      Format of each column
+    # Keys: list
+    #       Columns identifying a line
+    # TolFactor: float
+    #            Number of units of the last written digit tolerated
+
+    # Returns
+    # =======
+    # Report: dict
+    #         Lines of both files, number of divergent lines and maximum
+    #         difference per divergent column, and first divergent line
+    #         (None if the files are equivalent)
+
+    AllCols = list(range(len(ColIdx)))
+    Ref = readOutputFile(RefPath, ColIdx, AllCols, Fmt)
+    Cand = readOutputFile(CandPath, ColIdx, AllCols, Fmt)
+    NRows = min(len(Ref), len(Cand))
+
+    Report = OrderedDict([("RefRows", len(Ref)), ("CandRows", len(Cand)),
+        ("Diffs", OrderedDict({})), ("First", None)])
+    Divergent = np.zeros(NRows, dtype=bool)
+    Values = OrderedDict({})
+
+    for Name, Col in ColIdx.items():
+        RefCol = Ref[Col].to_numpy()[:NRows]
+        CandCol = Cand[Col].to_numpy()[:NRows]
+        AbsTol, RelTol = getColumnTol(Fmt[Col], TolFactor)
+
+        if AbsTol is None:
+            Diff = RefCol.astype(str) != CandCol.astype(str)
+            MaxDiff = None
+
+        else:
+            RefCol = RefCol.astype(np.float64)
+            CandCol = CandCol.astype(np.float64)
+            Delta = np.abs(RefCol - CandCol)
+            # Margin for the parsing of the written decimals
+            Tol = (AbsTol + RelTol * np.abs(RefCol)) * (1 + 1e-6)
+            Diff = ~((Delta <= Tol) | (np.isnan(RefCol) & np.isnan(CandCol)))
+            MaxDiff = float(np.nanmax(np.where(Diff, Delta, np.nan))) if Diff.any() else None
+
+        if Diff.any():
+            Report["Diffs"][Name] = [int(Diff.sum()), MaxDiff]
+            Divergent |= Diff
+
+        Values[Name] = (RefCol, CandCol, Diff)
+
+    # First divergent line, or first line of the longest file
+    if Divergent.any():
+        Row = int(np.argmax(Divergent))
+    elif len(Ref) != len(Cand):
+        Row = NRows
+    else:
+        return Report
+
+    First = OrderedDict({})
+    First["Line"] = Row + 1
+    Longest = Ref if len(Ref) > len(Cand) else Cand
+    for Key in Keys:
+        First[Key] = toReportValue(Values[Key][0][Row] if Row < NRows else \
+            Longest[ColIdx[Key]].to_numpy()[Row]) if Key in ColIdx else None
+    First["Columns"] = OrderedDict({})
+    if Row < NRows:
+        for Name, (RefCol, CandCol, Diff) in Values.items():
+            if Diff[Row]:
+                First["Columns"][Name] = [toReportValue(RefCol[Row]), toReportValue(CandCol[Row])]
+    Report["First"] = First
+
+    return Report
+
+# End of compareOutputFile()
+
+def findOutputFile(OutPath, Prefix, Name):
+
+    # Purpose: find an output file in any of the output formats
+
+    for Ext in OUTPUT_EXT.values():
+        Path = "%s/%s/%s%s" % (OutPath, os.path.dirname(Prefix), Name, Ext)
+        if os.path.isfile(Path):
+            return Path
+
+    return None
+
+# End of findOutputFile()
+
+def compareOutputDirs(RefOut, CandOut, TolFactor):
+
+    # Purpose: compare all the outputs of two runs of the chain
+
+    # Parameters
+    # ==========
+    # RefOut, CandOut: str
+    #                  Reference and candidate OUT directories
+    # TolFactor: float
+    #            Number of units of the last written digit tolerated
+
+    # Returns
+    # =======
+    # NDivergent: int
+    #             Number of files divergent or missing in the candidate
+
+    NCompared = 0
+    NDivergent = 0
+
+    # Outputs written in several formats (e.g. the POS file, also saved
+    # in NPZ format with the text outputs) are compared once
+    Compared = set()
+
+    for Output, (Prefix, ColIdx, Fmt, Keys) in EQUIV_OUTPUTS.items():
+        for Ext in OUTPUT_EXT.values():
+            for RefPath in sorted(glob.glob("%s/%s*%s" % (RefOut, Prefix, Ext))):
+                Name = os.path.splitext(os.path.basename(RefPath))[0]
+                if any(Name.startswith(Skipped) for Skipped in EQUIV_SKIPPED) or Name in Compared:
+                    continue
+                Compared.add(Name)
+
+                CandPath = findOutputFile(CandOut, Prefix, Name)
+                NCompared = NCompared + 1
+                if CandPath is None:
+                    sys.stderr.write("ERROR: %s: missing in %s\n" % (Name, CandOut))
+                    NDivergent = NDivergent + 1
+                    continue
+
+                Start = time.perf_counter()
+                Report = compareOutputFile(RefPath, CandPath, ColIdx, Fmt, Keys, TolFactor)
+                Elapsed = time.perf_counter() - Start
+
+                if Report["First"] is None:
+                    print("INFO: %s: equivalent (%d lines, %.2f s)" % (Name, Report["RefRows"], Elapsed))
+                    continue
+
+                NDivergent = NDivergent + 1
+                First = Report["First"]
+                sys.stderr.write("ERROR: %s: divergent (%d/%d lines), first at line %d (%s)\n" % \
+                    (Name, Report["RefRows"], Report["CandRows"], First["Line"],
+                    " ".join("%s %s" % (Key, First[Key]) for Key in Keys)))
+                for Col, (RefValue, CandValue) in First["Columns"].items():
+                    sys.stderr.write("    %-12s reference %s candidate %s\n" % (Col, RefValue, CandValue))
+                for Col, (NDiff, MaxDiff) in Report["Diffs"].items():
+                    sys.stderr.write("    %-12s %d divergent lines%s\n" % (Col, NDiff,
+                        ", max. difference %g" % MaxDiff if MaxDiff is not None else ""))
+
+    print("INFO: %d files compared, %d divergent" % (NCompared, NDivergent))
+
+    if NCompared == 0:
+        sys.stderr.write("ERROR: No outputs found in %s\n" % RefOut)
+        return 1
+
+    return NDivergent
+
+# End of compareOutputDirs()
+
+def runEquivCheck(Scen, Options):
+
+    # Purpose: run the chain with the reference and the candidate
+    #          configurations and compare their outputs
+
+    # Returns
+    # =======
+    # NDivergent: int
+    #             Number of divergent files (-1 if a run failed)
+
+    CfgFile = Scen + "/CFG/petrus.cfg"
+    RefOut = Scen + "/EQUIV_REF"
+
+    # The scenario configuration is restored after the runs
+    with open(CfgFile, 'r') as f:
+        CfgText = f.read()
+    Conf = readScenConf(CfgFile)
+
+    try:
+        for Run in ["Reference", "Candidate"]:
+            Result = runVariant(Scen, Conf, Options[Run], Options["Jobs"],
+                readVariantSpec(Options[Run]))
+            if Result is None:
+                return -1
+            print("INFO: %s %s: %.3f s" % (Run, Options[Run], Result["WallTime"]))
+
+            # Keep the reference outputs
+            if Run == "Reference":
+                shutil.rmtree(RefOut, ignore_errors = True)
+                os.makedirs(RefOut)
+                for Dir in EQUIV_DIRS:
+                    if os.path.isdir(Scen + "/OUT/" + Dir):
+                        shutil.move(Scen + "/OUT/" + Dir, RefOut + "/" + Dir)
+
+    finally:
+        with open(CfgFile, 'w') as f:
+            f.write(CfgText)
+
+    return compareOutputDirs(RefOut, Scen + "/OUT", Options["TolFactor"])
+
+# End of runEquivCheck()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    Options = readArguments(sys.argv)
+
+    if Options["Dirs"] is not None:
+        NDivergent = compareOutputDirs(Options["Dirs"][0], Options["Dirs"][1], Options["TolFactor"])
+    else:
+        NDivergent = runEquivCheck(Options["Scen"], Options)
+
+    if NDivergent != 0:
+        sys.exit(-1)
+
+#######################################################
+# End of EquivCheck.py
+#######################################################
@@ -0,0 +1,729 @@
+#!/usr/bin/env python
+
+########################################################################
+# ScenarioGen.py:
+# This is the Synthetic Scenario Generator of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           ScenarioGen.py
+#  Date(YY/MM/DD): 16/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   ScenarioGen.py $SCEN_PATH [--rcvrs N] [--sats N] [--days N]
+#                  [--rate SECONDS] [--date DD/MM/YYYY] [--seed N]
+#
+#   Writes a synthetic SCENARIO: CFG/petrus.cfg, INP/RCVR/SCEN_RCVR.dat
+#   and, per receiver and day, INP/OBS, OUT/SAT and OUT/LOS files.
+#   The measurements are built from circular GPS orbits and from the SBAS
+#   corrections written in the SAT and LOS files, so that PETRUS computes
+#   a consistent solution. They include data gaps, cycle slips, NPA
+#   (UDREI 12-13) and Not Monitored/Don't Use (UDREI 14-15) periods
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.dirname(SRC_DIR))
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+from COMMON import GnssConstants as Const
+from COMMON.Coordinates import llh2xyz
+from COMMON.Iono import computeIonoMappingFunction
+from InputOutput import ObsIdx, SatIdx, LosIdx
+from Corrections import computeTropoMpp
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Default scenario
+SCEN_DEFAULTS = OrderedDict({})
+SCEN_DEFAULTS["RCVRS"] = 1                  # Number of receivers
+SCEN_DEFAULTS["SATS"] = 32                  # Number of GPS satellites
+SCEN_DEFAULTS["DAYS"] = 1                   # Number of days
+SCEN_DEFAULTS["RATE"] = 1                   # Sampling rate [s]
+SCEN_DEFAULTS["DATE"] = "01/01/2021"        # First day [DD/MM/YYYY]
+SCEN_DEFAULTS["SEED"] = 1                   # Seed of the random generator
+
+# Name of the RCVR file
+SCEN_RCVR_FILE = "SCEN_RCVR.dat"
+
+# Default configuration of the scenario (KEY -> fields). INI_DATE,
+# END_DATE, SAMPLING_RATE and HATCH_GAP_TH (10 epochs) are set from the
+# scenario
+SCEN_CONF = OrderedDict({})
+SCEN_CONF["INI_DATE"] = ""
+SCEN_CONF["END_DATE"] = ""
+SCEN_CONF["SAMPLING_RATE"] = ""
+SCEN_CONF["SBAS_MODE"] = "SF"
+SCEN_CONF["GEO"] = "123"
+SCEN_CONF["NAV_SOLUTION"] = "GPS"
+SCEN_CONF["GPS_FREQ"] = "L1L2"
+SCEN_CONF["GAL_FREQ"] = "E1E5A"
+SCEN_CONF["PREPRO_OUT"] = "1"
+SCEN_CONF["CORR_OUT"] = "1"
+SCEN_CONF["SPVT_OUT"] = "1"
+SCEN_CONF["PERF_OUT"] = "1"
+SCEN_CONF["VPEHIST_OUT"] = "1"
+SCEN_CONF["RCVR_INFO"] = "STAT"
+SCEN_CONF["RCVR_FILE"] = SCEN_RCVR_FILE
+SCEN_CONF["NCHANNELS_GPS"] = "12"
+SCEN_CONF["NCHANNELS_GAL"] = "12"
+SCEN_CONF["RCVR_MASK"] = "5"
+SCEN_CONF["EQUIPMENT_CLASS"] = "3"
+SCEN_CONF["AIR_ACC_DESIG"] = "A"
+SCEN_CONF["ELEV_NOISE_TH"] = "20"
+SCEN_CONF["SIGMA_NOISE_DF"] = "0.4"
+SCEN_CONF["MIN_CNR"] = "1 20"
+SCEN_CONF["MIN_NCS_TH"] = "1 3 3"
+SCEN_CONF["MAX_PSR_OUTRNG"] = "1 330000000"
+SCEN_CONF["MAX_CODE_RATE"] = "1 952"
+SCEN_CONF["MAX_CODE_RATE_STEP"] = "1 10"
+SCEN_CONF["MAX_PHASE_RATE"] = "1 952"
+SCEN_CONF["MAX_PHASE_RATE_STEP"] = "1 10"
+SCEN_CONF["HATCH_GAP_TH"] = ""
+SCEN_CONF["HATCH_TIME"] = "100"
+SCEN_CONF["HATCH_STATE_F"] = "6"
+SCEN_CONF["HATCH_DIV_TH"] = "10"
+SCEN_CONF["HATCH_DIV_TIME"] = "3"
+SCEN_CONF["MAX_LSQ_ITER"] = "100"
+SCEN_CONF["SBAS_IONO_NPA"] = "1"
+SCEN_CONF["PDOP_MAX"] = "10000"
+#                         ON HAL  VAL  HPE95 VPE95 VPE1E7 AVAI CONT  CINT
+SCEN_CONF["OS"] =        "0  -1   -1   -1    -1    -1     99   1e-4  15    0"
+SCEN_CONF["APVI"] =      "1  40   50   16    20    1000   99   8e-6  15    0"
+SCEN_CONF["LPV200"] =    "1  40   35   16    4     10     99   8e-6  15    0"
+SCEN_CONF["CATI"] =      "0  40   10   16    4     10     99   8e-6  15    0"
+SCEN_CONF["NPA"] =       "1  556  1000 220   1000  1000   99.9 1e-4  3600  0"
+SCEN_CONF["MARITIME"] =  "0  10   1000 10    1000  1000   99.8 3e-4  900   0"
+SCEN_CONF["CUSTOM"] =    "0  40   50   16    20    1000   99   8e-6  15    0"
+
+# Orbits
+GPS_SMA = 26559.7e3                 # Semi-major axis [m]
+GPS_PERIOD = 43082.05               # Orbital period [s]
+GPS_INC = 55.0                      # Inclination [deg]
+GPS_PLANES = 6                      # Number of orbital planes
+OMEGA_EARTH = 7.2921151467e-5       # Earth rotation rate [rad/s]
+MIN_ELEV = 2.0                      # Elevation of the files horizon [deg]
+
+# Ionosphere
+EARTH_RADIUS = 6378.1363e3          # Earth radius [m]
+IONO_HEIGHT = 350e3                 # Height of the ionospheric layer [m]
+IGP_RES = 5.0                       # IGP grid resolution [deg]
+TRIANG_INTERP_PROB = 0.02           # Probability of triangular interpolation
+
+# UDRE per UDREI 0-13 [m] (MOPS DO-229), sigma UDRE = UDRE / 3.29
+UDRE_TABLE = [0.75, 1.0, 1.25, 1.75, 2.25, 3.0, 3.75, 4.5, 5.25, 6.0, 7.5, 15.0, 50.0, 150.0]
+
+# Events per satellite and day: [mean number, min length, max length] [s]
+SHORT_GAPS = [2.0, 2, 8]            # Gaps shorter than HATCH_GAP_TH [epochs]
+LONG_GAPS = [0.5, 60, 900]          # Gaps resetting the Hatch filter
+RCVR_OUTAGES = [1.0, 30, 120]       # Outages of all the satellites (per receiver)
+NPA_PERIODS = [0.3, 600, 3600]      # UDREI 12-13
+NM_PERIODS = [0.2, 600, 3600]       # UDREI 14 (Not Monitored)
+DU_PERIODS = [0.1, 60, 300]         # UDREI 15 (Don't Use)
+CYCLE_SLIPS = 1.0                   # Mean number of cycle slips
+MAX_SLIP = 20                       # Largest cycle slip [cycles]
+
+# Epochs generated at once
+CHUNK_SECONDS = 3600
+
+# Input files formats
+ObsFmt = {
+    "SOD": "%05d", "DOY": "%03d", "YEAR": "%04d", "CONST": "G", "PRN": "%02d",
+    "ELEV": "%8.3f", "AZIM": "%8.3f", "C1": "%15.3f", "L1": "%15.3f",
+    "P2": "%15.3f", "L2": "%15.3f", "S1": "%6.2f", "S2": "%6.2f",
+}
+SatFmt = {
+    "SOD": "%05d", "DOY": "%03d", "CONST": "G", "PRN": "%02d",
+    "ELEV": "%8.3f", "AZIM": "%8.3f",
+    "SAT-X": "%15.3f", "SAT-Y": "%15.3f", "SAT-Z": "%15.3f",
+    "VEL-X": "%10.4f", "VEL-Y": "%10.4f", "VEL-Z": "%10.4f",
+    "SAT-CLK": "%14.3f", "TGD": "%7.3f", "FC": "%7.3f",
+    "LTC-B": "%7.3f", "LTC-X": "%7.3f", "LTC-Y": "%7.3f", "LTC-Z": "%7.3f",
+    "UDREI": "%2d", "SIGMAUDRE": "%8.3f", "DELTAUDRE": "%6.3f", "RSS": "%1d",
+    "EPS-FC": "%6.3f", "EPS-RRC": "%6.3f", "EPS-LTC": "%6.3f", "EPS-ER": "%6.3f",
+}
+LosFmt = {
+    "SOD": "%05d", "DOY": "%03d", "CONST": "G", "PRN": "%02d",
+    "ELEV": "%8.3f", "AZIM": "%8.3f", "FLAG": "%1d",
+    "IPPLON": "%8.3f", "IPPLAT": "%8.3f", "INTERP": "%1d",
+    "UISD": "%7.3f", "SUIRE": "%7.3f", "STD": "%7.3f",
+}
+for Vertex in ["NE", "NW", "SW", "SE"]:
+    LosFmt["IGP_%s_LON" % Vertex] = "%7.2f"
+    LosFmt["IGP_%s_LAT" % Vertex] = "%7.2f"
+    LosFmt["GIVD_%s" % Vertex] = "%7.3f"
+    LosFmt["GIVE_%s" % Vertex] = "%7.3f"
+
+def displayUsage():
+    sys.stderr.write("ERROR: Please provide path to SCENARIO as first argument\n")
+    sys.stderr.write("Usage: ScenarioGen.py $SCEN_PATH [--rcvrs N] [--sats N] [--days N] "\
+        "[--rate SECONDS] [--date DD/MM/YYYY] [--seed N]\n")
+
+def readArguments(Argv):
+
+    # Purpose: read the command line arguments
+
+    # Parameters
+    # ==========
+    # Argv: list
+    #       Command line arguments (sys.argv)
+
+    # Returns
+    # =======
+    # Scen: str
+    #       Path to SCENARIO
+    # Params: dict
+    #         Scenario parameters (SCEN_DEFAULTS keys)
+
+    # Check the number of arguments
+    if len(Argv) < 2:
+        displayUsage()
+        sys.exit()
+
+    Scen = Argv[1]
+    Params = SCEN_DEFAULTS.copy()
+
+    # Check the optional arguments
+    Args = Argv[2:]
+    while len(Args) > 1 and Args[0].startswith("--") and \
+        Args[0][2:].upper() in Params:
+        Key = Args[0][2:].upper()
+        if Key == "DATE":
+            Params[Key] = Args[1]
+        elif Args[1].isdigit() and int(Args[1]) >= 1:
+            Params[Key] = int(Args[1])
+        else:
+            displayUsage()
+            sys.exit()
+        Args = Args[2:]
+
+    if len(Args) > 0:
+        displayUsage()
+        sys.exit()
+
+    if Params["SATS"] > Const.MAX_NUM_SATS_CONSTEL or \
+        Const.S_IN_D % Params["RATE"] != 0:
+        sys.stderr.write("ERROR: Up to %d satellites and a sampling rate dividing "\
+            "the day are supported\n" % Const.MAX_NUM_SATS_CONSTEL)
+        sys.exit(-1)
+
+    return Scen, Params
+
+# End of readArguments()
+
+def writeConf(CfgFile, Conf):
+
+    # Purpose: write a configuration file
+
+    # Parameters
+    # ==========
+    # CfgFile: str
+    #          Path to conf file
+    # Conf: dict
+    #       Fields of each configuration parameter, as strings
+
+    # Returns
+    # =======
+    # Nothing
+
+    os.makedirs(os.path.dirname(CfgFile), exist_ok=True)
+    with open(CfgFile, 'w') as f:
+        f.write("# PETRUS configuration of a synthetic scenario (ScenarioGen.py)\n")
+        for Key, Fields in Conf.items():
+            f.write("%-20s %s\n" % (Key, " ".join(str(Fields).split())))
+
+# End of writeConf()
+
+def generateRcvrs(Rng, NRcvrs):
+
+    # Purpose: generate the receivers, spread over Europe
+
+    # Returns
+    # =======
+    # Rcvrs: dict
+    #        [ID, LON, LAT, ALT, MASK] per receiver acronym
+
+    Rcvrs = OrderedDict({})
+    for Id in range(1, NRcvrs + 1):
+        Rcvrs["R%03d" % Id] = [Id, Rng.uniform(-10, 30), Rng.uniform(35, 60),
+            Rng.uniform(0, 1000), 5.0]
+
+    return Rcvrs
+
+# End of generateRcvrs()
+
+def writeRcvrFile(RcvrFile, Rcvrs):
+
+    # Purpose: write the RCVR file (ACR FLAG ID LON LAT ALT MASK ACQ)
+
+    os.makedirs(os.path.dirname(RcvrFile), exist_ok=True)
+    with open(RcvrFile, 'w') as f:
+        f.write("#ACR FLAG  ID       LON       LAT      ALT MASK ACQ\n")
+        for Acr, (Id, Lon, Lat, Alt, Mask) in Rcvrs.items():
+            f.write("%-4s %4d %3d %9.4f %9.4f %8.2f %4.1f %3d\n" % \
+                (Acr, 1, Id, Lon, Lat, Alt, Mask, 0))
+
+# End of writeRcvrFile()
+
+def generateIntervals(Rng, Events, NKeys):
+
+    # Purpose: generate random intervals of the day per key (satellite
+    #          or receiver)
+
+    # Parameters
+    # ==========
+    # Events: list
+    #         [mean number per day, min length, max length] [s]
+    # NKeys: int
+    #        Number of keys
+
+    # Returns
+    # =======
+    # Intervals: list
+    #            [Start, End] SoDs per key
+
+    Intervals = []
+    for Key in range(NKeys):
+        Starts = Rng.uniform(0, Const.S_IN_D, Rng.poisson(Events[0]))
+        Lengths = Rng.uniform(Events[1], Events[2], len(Starts))
+        Intervals.append(list(zip(Starts, Starts + Lengths)))
+
+    return Intervals
+
+# End of generateIntervals()
+
+def inIntervals(Intervals, Sod):
+
+    # Purpose: check which SoDs are in the intervals of each key
+
+    # Returns
+    # =======
+    # In: numpy.ndarray
+    #     Boolean per SoD and key
+
+    In = np.zeros((len(Sod), len(Intervals)), dtype=bool)
+    for Key, KeyIntervals in enumerate(Intervals):
+        for Start, End in KeyIntervals:
+            In[:, Key] |= (Sod >= Start) & (Sod < End)
+
+    return In
+
+# End of inIntervals()
+
+def generateDayEvents(Rng, NSats, Rate):
+
+    # Purpose: generate the events of one receiver and day
+
+    # Returns
+    # =======
+    # Events: dict
+    #         Gaps, UDREI periods and cycle slips ([SoD, L1 cycles,
+    #         L2 cycles] per satellite)
+
+    Events = OrderedDict({})
+    Events["ShortGaps"] = generateIntervals(Rng,
+        [SHORT_GAPS[0], SHORT_GAPS[1] * Rate, SHORT_GAPS[2] * Rate], NSats)
+    Events["LongGaps"] = generateIntervals(Rng, LONG_GAPS, NSats)
+    Events["Outages"] = generateIntervals(Rng, RCVR_OUTAGES, 1)
+    Events["Npa"] = generateIntervals(Rng, NPA_PERIODS, NSats)
+    Events["NotMonitored"] = generateIntervals(Rng, NM_PERIODS, NSats)
+    Events["DontUse"] = generateIntervals(Rng, DU_PERIODS, NSats)
+    Events["Slips"] = []
+    for Sat in range(NSats):
+        NSlips = Rng.poisson(CYCLE_SLIPS)
+        Events["Slips"].append(np.array([Rng.uniform(0, Const.S_IN_D, NSlips),
+            Rng.integers(-MAX_SLIP, MAX_SLIP + 1, NSlips),
+            Rng.integers(-MAX_SLIP, MAX_SLIP + 1, NSlips)]))
+
+    return Events
+
+# End of generateDayEvents()
+
+def computeSlips(Slips, Sod):
+
+    # Purpose: compute the accumulated L1 and L2 cycle slips per SoD and
+    #          satellite
+
+    SlipL1 = np.zeros((len(Sod), len(Slips)))
+    SlipL2 = np.zeros((len(Sod), len(Slips)))
+    for Sat, (SlipSod, CyclesL1, CyclesL2) in enumerate(Slips):
+        Order = np.argsort(SlipSod)
+        Pos = np.searchsorted(SlipSod[Order], Sod, side='right')
+        SlipL1[:, Sat] = np.concatenate(([0], np.cumsum(CyclesL1[Order])))[Pos]
+        SlipL2[:, Sat] = np.concatenate(([0], np.cumsum(CyclesL2[Order])))[Pos]
+
+    return SlipL1, SlipL2
+
+# End of computeSlips()
+
+def computeOrbits(Time, NSats):
+
+    # Purpose: compute the ECEF position and velocity of the satellites,
+    #          on circular orbits in GPS_PLANES planes
+
+    # Parameters
+    # ==========
+    # Time: numpy.ndarray
+    #       Seconds since the start of the scenario
+    # NSats: int
+    #        Number of satellites
+
+    # Returns
+    # =======
+    # Pos, Vel: numpy.ndarray
+    #           Position [m] and velocity [m/s] per time, satellite and axis
+
+    Prn = np.arange(NSats)
+    Plane = Prn % GPS_PLANES
+    NSlots = int(np.ceil(NSats / GPS_PLANES))
+    Raan = np.radians(Plane * 360.0 / GPS_PLANES)
+    U0 = np.radians((Prn // GPS_PLANES) * 360.0 / NSlots + Plane * 360.0 / NSlots / GPS_PLANES)
+    Inc = np.radians(GPS_INC)
+    N = 2 * np.pi / GPS_PERIOD
+
+    # Position and velocity in the orbital plane
+    U = U0[np.newaxis, :] + N * Time[:, np.newaxis]
+    Xo, Yo = GPS_SMA * np.cos(U), GPS_SMA * np.sin(U)
+    VXo, VYo = -GPS_SMA * N * np.sin(U), GPS_SMA * N * np.cos(U)
+
+    # Rotate to inertial, then to ECEF (Theta: Earth rotation angle)
+    Theta = OMEGA_EARTH * Time[:, np.newaxis]
+    Lon = Raan[np.newaxis, :] - Theta
+    def toEcef(Xo, Yo):
+        return np.stack([
+            Xo * np.cos(Lon) - Yo * np.cos(Inc) * np.sin(Lon),
+            Xo * np.sin(Lon) + Yo * np.cos(Inc) * np.cos(Lon),
+            Yo * np.sin(Inc)], axis=-1)
+    Pos = toEcef(Xo, Yo)
+    Vel = toEcef(VXo, VYo)
+
+    # Remove the velocity of the rotating frame
+    Vel[..., 0] = Vel[..., 0] + OMEGA_EARTH * Pos[..., 1]
+    Vel[..., 1] = Vel[..., 1] - OMEGA_EARTH * Pos[..., 0]
+
+    return Pos, Vel
+
+# End of computeOrbits()
+
+def computeLos(RcvrXyz, Lon, Lat, Pos):
+
+    # Purpose: compute the range, elevation and azimuth of the satellites
+
+    Los = Pos - np.array(RcvrXyz)
+    Range = np.linalg.norm(Los, axis=-1)
+    Lam, Phi = np.radians(Lon), np.radians(Lat)
+    East = -np.sin(Lam) * Los[..., 0] + np.cos(Lam) * Los[..., 1]
+    North = -np.sin(Phi) * np.cos(Lam) * Los[..., 0] - \
+        np.sin(Phi) * np.sin(Lam) * Los[..., 1] + np.cos(Phi) * Los[..., 2]
+    Up = np.cos(Phi) * np.cos(Lam) * Los[..., 0] + \
+        np.cos(Phi) * np.sin(Lam) * Los[..., 1] + np.sin(Phi) * Los[..., 2]
+    Elev = np.degrees(np.arcsin(Up / Range))
+    Azim = np.degrees(np.arctan2(East, North)) % 360.0
+
+    return Range, Elev, Azim
+
+# End of computeLos()
+
+def computeIpp(Lon, Lat, Elev, Azim):
+
+    # Purpose: compute the Ionospheric Pierce Point (MOPS A.4.4.10.1)
+
+    E, A = np.radians(Elev), np.radians(Azim)
+    Phi, Lam = np.radians(Lat), np.radians(Lon)
+    Psi = np.pi / 2 - E - np.arcsin(EARTH_RADIUS / (EARTH_RADIUS + IONO_HEIGHT) * np.cos(E))
+    PhiPp = np.arcsin(np.sin(Phi) * np.cos(Psi) + np.cos(Phi) * np.sin(Psi) * np.cos(A))
+    LamPp = Lam + np.arcsin(np.sin(Psi) * np.sin(A) / np.cos(PhiPp))
+
+    return (np.degrees(LamPp) + 180.0) % 360.0 - 180.0, np.degrees(PhiPp)
+
+# End of computeIpp()
+
+def computeGivd(Lon, Lat, Sod, Day):
+
+    # Purpose: compute the vertical ionospheric delay [m]. It is linear in
+    #          longitude and latitude at each epoch, so that the MOPS
+    #          interpolation of the IGPs delays is exact at the IPP
+
+    Diurnal = 1.0 + 4.0 * np.maximum(0.0, np.cos(2 * np.pi * (Sod - 50400.0) / Const.S_IN_D))
+
+    return Diurnal * (2.0 + 0.2 * np.sin(Day)) * (1.0 - 0.015 * (Lat - 45.0) + 0.005 * (Lon - 10.0))
+
+# End of computeGivd()
+
+def writeInputFile(f, ColIdx, Fmt, Columns):
+
+    # Purpose: write the lines of an input file, one per row of Columns
+
+    # Parameters
+    # ==========
+    # f: file descriptor
+    #    Input file
+    # ColIdx: dict
+    #         Column index of each field
+    # Fmt: dict
+    #      Format of each field (CONST is written as is)
+    # Columns: dict
+    #          Values of each field but CONST
+
+    Names = [Name for Name in ColIdx if Name != "CONST"]
+    LineFmt = " ".join(Fmt[Name] for Name in ColIdx) + "\n"
+    Rows = np.column_stack([Columns[Name] for Name in Names]).tolist()
+
+    f.write("".join(LineFmt % tuple(Row) for Row in Rows))
+
+# End of writeInputFile()
+
+def generateRcvrDay(Rng, Scen, Params, Acr, Rcvr, DayIdx, Date):
+
+    # Purpose: generate the OBS, SAT and LOS files of one receiver and day
+
+    # Parameters
+    # ==========
+    # Rng: numpy.random.Generator
+    #      Random generator
+    # Scen: str
+    #       Path to SCENARIO
+    # Params: dict
+    #         Scenario parameters
+    # Acr: str
+    #      Receiver acronym
+    # Rcvr: list
+    #       Receiver [ID, LON, LAT, ALT, MASK]
+    # DayIdx: int
+    #         Day since the start of the scenario
+    # Date: datetime
+    #       Day
+
+    # Returns
+    # =======
+    # NRows: int
+    #        Number of lines of the OBS file
+
+    Id, Lon, Lat, Alt, Mask = Rcvr
+    RcvrXyz = llh2xyz(Lon, Lat, Alt)
+    Year, Doy = Date.year, Date.timetuple().tm_yday
+    Day = "%s_Y%02dD%03d" % (Acr, Year % 100, Doy)
+    NSats = Params["SATS"]
+
+    # Constant errors and biases of the receiver day
+    Events = generateDayEvents(Rng, NSats, Params["RATE"])
+    RcvrClk = [Rng.uniform(-3e5, 3e5), Rng.uniform(-0.05, 0.05)]     # [m], [m/s]
+    SatClk = Rng.uniform(-3e4, 3e4, NSats)                          # [m]
+    SatClkDrift = Rng.uniform(-1e-3, 1e-3, NSats)                   # [m/s]
+    Tgd = Rng.uniform(-3.0, 3.0, NSats)                             # [m]
+    Ltc = Rng.normal(0, 0.5, (NSats, 3))                            # [m]
+    LtcB = Rng.normal(0, 0.5, NSats)                                # [m]
+    FcAmp = Rng.uniform(0.5, 2.0, NSats)                            # [m]
+    Phase = Rng.uniform(0, 2 * np.pi, NSats)
+    NominalUdrei = Rng.integers(3, 10, NSats)
+    NL1 = Rng.integers(-1000000, 1000000, NSats).astype(float)
+    # L2 ambiguity giving a positive Geometry-Free combination
+    NL2 = np.round((NL1 * Const.GPS_L1_WAVE - (1 - Const.GPS_GAMMA_L1L2) * 1000.0) / Const.GPS_L2_WAVE)
+    FaultsPerSat = Rng.normal(0, 0.3, NSats)                       # [m]
+
+    vMpp = np.vectorize(computeIonoMappingFunction, otypes=[float])
+    vTropoMpp = np.vectorize(computeTropoMpp, otypes=[float])
+
+    Files = OrderedDict({})
+    for Name, Path in [("OBS", "/INP/OBS/OBS_%s.dat"), ("SAT", "/OUT/SAT/SAT_%s.dat"),
+        ("LOS", "/OUT/LOS/LOS_%s.dat")]:
+        Path = Scen + Path % Day
+        os.makedirs(os.path.dirname(Path), exist_ok=True)
+        Files[Name] = open(Path, 'w')
+    Files["OBS"].write("# " + " ".join(ObsIdx) + "\n")
+    Files["SAT"].write("# " + " ".join(SatIdx) + "\n")
+    Files["LOS"].write("# " + " ".join(LosIdx) + "\n")
+
+    NRows = 0
+    Rate = Params["RATE"]
+    for ChunkStart in range(0, Const.S_IN_D, CHUNK_SECONDS):
+        Sod = np.arange(ChunkStart, min(ChunkStart + CHUNK_SECONDS, Const.S_IN_D), Rate, dtype=float)
+        if len(Sod) == 0:
+            continue
+        Time = DayIdx * Const.S_IN_D + Sod
+        NEpochs = len(Sod)
+
+        # Geometry
+        #-----------------------------------------------------------------
+        Pos, Vel = computeOrbits(Time, NSats)
+        Range, Elev, Azim = computeLos(RcvrXyz, Lon, Lat, Pos)
+
+        # SBAS corrections: the broadcast orbit is corrected by the LTC,
+        # the broadcast clock by the slowly varying FC and the LTC
+        Fc = FcAmp * np.sin(2 * np.pi * Time[:, np.newaxis] / 3600.0 + Phase)
+        BrdcPos = Pos - Ltc
+        ClkBrdc = SatClk[np.newaxis, :] + SatClkDrift[np.newaxis, :] * Time[:, np.newaxis]
+        Dtr = -2 * np.sum(BrdcPos * Vel, axis=-1) / Const.SPEED_OF_LIGHT
+        SatClkCorr = ClkBrdc - Tgd[np.newaxis, :] + Dtr + Fc + LtcB
+        Rho = np.linalg.norm(Pos - np.array(RcvrXyz), axis=-1)
+
+        # UDREI: nominal, NPA, Not Monitored and Don't Use periods
+        Udrei = np.repeat(NominalUdrei[np.newaxis, :], NEpochs, axis=0)
+        Npa = inIntervals(Events["Npa"], Sod)
+        Udrei[Npa] = np.broadcast_to(12 + np.arange(NSats) % 2, Udrei.shape)[Npa]
+        Udrei[inIntervals(Events["NotMonitored"], Sod)] = 14
+        Udrei[inIntervals(Events["DontUse"], Sod)] = 15
+        SigmaUdre = np.array(UDRE_TABLE + [0.0, 0.0])[Udrei] / 3.29
+
+        # Ionosphere and troposphere
+        IppLon, IppLat = computeIpp(Lon, Lat, Elev, Azim)
+        Visible = Elev >= MIN_ELEV
+        Mpp = np.where(Visible, vMpp(np.where(Visible, Elev, 90.0)), 0.0)
+        Givd = computeGivd(IppLon, IppLat, Sod[:, np.newaxis], DayIdx)
+        Uisd = Mpp * Givd
+        Std = 2.4 * np.where(Visible, vTropoMpp(np.where(Visible, Elev, 90.0)), 0.0)
+
+        # Measurements
+        #-----------------------------------------------------------------
+        Clk = RcvrClk[0] + RcvrClk[1] * Time[:, np.newaxis]
+        Geom = Rho + Clk - SatClkCorr + Std + FaultsPerSat[np.newaxis, :]
+        # Ionospheric delay with a small smooth error w.r.t. the SBAS model
+        Iono = Uisd * (1.0 + 0.05 * np.sin(2 * np.pi * Time[:, np.newaxis] / 7200.0 + Phase))
+        CodeNoise = 0.3 + 1.0 * np.exp(-Elev / 10.0)
+        C1 = Geom + Iono + Rng.normal(0, 1, (NEpochs, NSats)) * CodeNoise
+        P2 = Geom + Const.GPS_GAMMA_L1L2 * Iono + Rng.normal(0, 1, (NEpochs, NSats)) * CodeNoise
+        SlipL1, SlipL2 = computeSlips(Events["Slips"], Sod)
+        L1 = (Geom - Iono + Rng.normal(0, 0.002, (NEpochs, NSats))) / Const.GPS_L1_WAVE + NL1 + SlipL1
+        L2 = (Geom - Const.GPS_GAMMA_L1L2 * Iono + Rng.normal(0, 0.002, (NEpochs, NSats))) / \
+            Const.GPS_L2_WAVE + NL2 + SlipL2
+        S1 = 30.0 + 20.0 * np.sin(np.radians(np.maximum(Elev, 0))) + Rng.normal(0, 1.0, (NEpochs, NSats))
+
+        # Lines of the files: satellites above the horizon, sorted by SoD and PRN
+        Tracked = Visible & ~inIntervals(Events["ShortGaps"], Sod) & \
+            ~inIntervals(Events["LongGaps"], Sod) & \
+            ~inIntervals(Events["Outages"], Sod)[:, [0] * NSats]
+        SodGrid = np.repeat(Sod[:, np.newaxis], NSats, axis=1)
+        PrnGrid = np.repeat(np.arange(1, NSats + 1)[np.newaxis, :], NEpochs, axis=0)
+
+        # OBS file
+        Sel = np.nonzero(Tracked)
+        writeInputFile(Files["OBS"], ObsIdx, ObsFmt, {
+            "SOD": SodGrid[Sel], "DOY": np.full(len(Sel[0]), Doy), "YEAR": np.full(len(Sel[0]), Year),
+            "PRN": PrnGrid[Sel], "ELEV": Elev[Sel], "AZIM": Azim[Sel],
+            "C1": C1[Sel], "L1": L1[Sel], "P2": P2[Sel], "L2": L2[Sel],
+            "S1": S1[Sel], "S2": S1[Sel] - 5.0})
+        NRows = NRows + len(Sel[0])
+
+        # SAT file
+        Sel = np.nonzero(Visible)
+        NSel = len(Sel[0])
+        writeInputFile(Files["SAT"], SatIdx, SatFmt, {
+            "SOD": SodGrid[Sel], "DOY": np.full(NSel, Doy),
+            "PRN": PrnGrid[Sel], "ELEV": Elev[Sel], "AZIM": Azim[Sel],
+            "SAT-X": BrdcPos[..., 0][Sel], "SAT-Y": BrdcPos[..., 1][Sel], "SAT-Z": BrdcPos[..., 2][Sel],
+            "VEL-X": Vel[..., 0][Sel], "VEL-Y": Vel[..., 1][Sel], "VEL-Z": Vel[..., 2][Sel],
+            "SAT-CLK": ClkBrdc[Sel], "TGD": np.broadcast_to(Tgd, Elev.shape)[Sel],
+            "FC": Fc[Sel], "LTC-B": np.broadcast_to(LtcB, Elev.shape)[Sel],
+            "LTC-X": np.broadcast_to(Ltc[:, 0], Elev.shape)[Sel],
+            "LTC-Y": np.broadcast_to(Ltc[:, 1], Elev.shape)[Sel],
+            "LTC-Z": np.broadcast_to(Ltc[:, 2], Elev.shape)[Sel],
+            "UDREI": Udrei[Sel], "SIGMAUDRE": SigmaUdre[Sel],
+            "DELTAUDRE": np.full(NSel, 1.0), "RSS": np.full(NSel, 1),
+            "EPS-FC": np.full(NSel, 0.0), "EPS-RRC": np.full(NSel, 0.0),
+            "EPS-LTC": np.full(NSel, 0.0), "EPS-ER": np.full(NSel, 0.0)})
+
+        # LOS file: IGP cell around the IPP, with triangular interpolation
+        # (one vertex missing) for some lines
+        IgpLon = {"W": np.floor(IppLon / IGP_RES) * IGP_RES}
+        IgpLon["E"] = IgpLon["W"] + IGP_RES
+        IgpLat = {"S": np.floor(IppLat / IGP_RES) * IGP_RES}
+        IgpLat["N"] = IgpLat["S"] + IGP_RES
+        Interp = np.where(Rng.uniform(0, 1, (NEpochs, NSats)) < TRIANG_INTERP_PROB,
+            Rng.integers(1, 5, (NEpochs, NSats)), 0)
+        Columns = {
+            "SOD": SodGrid[Sel], "DOY": np.full(NSel, Doy),
+            "PRN": PrnGrid[Sel], "ELEV": Elev[Sel], "AZIM": Azim[Sel],
+            "FLAG": np.full(NSel, 1), "IPPLON": IppLon[Sel], "IPPLAT": IppLat[Sel],
+            "INTERP": Interp[Sel], "UISD": Uisd[Sel], "STD": Std[Sel]}
+        SumGive2 = np.zeros(NSel)
+        for Vertex in ["NE", "NW", "SW", "SE"]:
+            VertexLon = IgpLon[Vertex[1]][Sel]
+            VertexLat = IgpLat[Vertex[0]][Sel]
+            Columns["IGP_%s_LON" % Vertex] = VertexLon
+            Columns["IGP_%s_LAT" % Vertex] = VertexLat
+            Columns["GIVD_%s" % Vertex] = computeGivd(VertexLon, VertexLat, SodGrid[Sel], DayIdx)
+            Columns["GIVE_%s" % Vertex] = 0.5 + 0.1 * Columns["GIVD_%s" % Vertex]
+            SumGive2 = SumGive2 + Columns["GIVE_%s" % Vertex]**2 / 4
+        Columns["SUIRE"] = Mpp[Sel] * np.sqrt(SumGive2)
+        writeInputFile(Files["LOS"], LosIdx, LosFmt, Columns)
+
+    # End of for ChunkStart in range(0, Const.S_IN_D, CHUNK_SECONDS):
+
+    for f in Files.values():
+        f.close()
+
+    return NRows
+
+# End of generateRcvrDay()
+
+def generateScenario(Scen, Params):
+
+    # Purpose: generate a synthetic SCENARIO
+
+    # Parameters
+    # ==========
+    # Scen: str
+    #       Path to SCENARIO
+    # Params: dict
+    #         Scenario parameters (SCEN_DEFAULTS keys)
+
+    # Returns
+    # =======
+    # Conf: dict
+    #       Fields of each configuration parameter written in
+    #       CFG/petrus.cfg
+
+    Rng = np.random.default_rng(Params["SEED"])
+    IniDate = datetime.strptime(Params["DATE"], "%d/%m/%Y")
+    EndDate = IniDate + timedelta(days = Params["DAYS"] - 1)
+
+    Conf = SCEN_CONF.copy()
+    Conf["INI_DATE"] = IniDate.strftime("%d/%m/%Y")
+    Conf["END_DATE"] = EndDate.strftime("%d/%m/%Y")
+    Conf["SAMPLING_RATE"] = str(Params["RATE"])
+    Conf["HATCH_GAP_TH"] = str(min(10 * Params["RATE"], 3600))
+    writeConf(Scen + "/CFG/petrus.cfg", Conf)
+
+    Rcvrs = generateRcvrs(Rng, Params["RCVRS"])
+    writeRcvrFile(Scen + "/INP/RCVR/" + SCEN_RCVR_FILE, Rcvrs)
+
+    for Acr, Rcvr in Rcvrs.items():
+        for DayIdx in range(Params["DAYS"]):
+            Date = IniDate + timedelta(days = DayIdx)
+            NRows = generateRcvrDay(Rng, Scen, Params, Acr, Rcvr, DayIdx, Date)
+            print("INFO: %s %s: %d observations" % (Acr, Date.strftime("%d/%m/%Y"), NRows))
+
+    return Conf
+
+# End of generateScenario()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    Scen, Params = readArguments(sys.argv)
+
+    generateScenario(Scen, Params)
+
+    print("INFO: Scenario generated in %s: %s" % (Scen, \
+        ", ".join("%s %s" % (Key, Value) for Key, Value in Params.items())))
+
+#######################################################
+# End of ScenarioGen.py
+#######################################################
@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+
+########################################################################
+# StageBench.py:
+# This is the Stage Benchmark of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           StageBench.py
+#  Date(YY/MM/DD): 16/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   StageBench.py $BENCH_PATH $RESULTS_JSON [--variants V1,V2...]
+#                 [--compare $OLD_RESULTS_JSON] [--jobs N]
+#                 [ScenarioGen.py options: --rcvrs N --sats N --days N
+#                  --rate SECONDS --date DD/MM/YYYY --seed N]
+#
+#   Generates a synthetic scenario in $BENCH_PATH/SCEN (reused while
+#   its parameters do not change), runs the full PETRUS chain on it with
+#   the profiling activated for each configuration variant, and writes
+#   in $RESULTS_JSON the wall time of the chain and the time of every
+#   stage, with the git commit of the sources. With --compare, the
+#   results are compared with those of a previous run (e.g. of another
+#   commit)
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+import json
+import glob
+import shutil
+import platform
+import subprocess
+import time
+from collections import OrderedDict
+from datetime import datetime
+from ScenarioGen import SCEN_DEFAULTS, generateScenario, writeConf
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Configuration variants (configuration parameters overriding the
+# scenario configuration)
+BENCH_VARIANTS = OrderedDict({})
+BENCH_VARIANTS["SCALAR"] = OrderedDict({})
+BENCH_VARIANTS["VECTOR"] = OrderedDict([("PREPRO_ENGINE", "VECTOR"),
+    ("CORR_ENGINE", "VECTOR"), ("SPVT_BATCH", "0")])
+BENCH_VARIANTS["PIPELINE"] = OrderedDict([("PREPRO_ENGINE", "VECTOR"),
+    ("CORR_ENGINE", "VECTOR"), ("PIPELINE", "1")])
+BENCH_VARIANTS["NPZ"] = OrderedDict([("PREPRO_ENGINE", "VECTOR"),
+    ("CORR_ENGINE", "VECTOR"), ("SPVT_BATCH", "0"), ("OUT_FORMAT", "NPZ")])
+
+# Configuration parameters set in all the variants
+BENCH_CONF = OrderedDict([("PROFILING", "1"), ("STAGE_CACHE", "0")])
+
+# Outputs of the chain, removed before each run (SAT and LOS are inputs)
+BENCH_OUTPUTS = ["PPVE", "CORR", "SPVT", "PERF", "PROF", "CACHE"]
+
+# Source directory
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def displayUsage():
+    sys.stderr.write("ERROR: Please provide the benchmark path and the results file\n")
+    sys.stderr.write("Usage: StageBench.py $BENCH_PATH $RESULTS_JSON [--variants V1,V2...] "\
+        "[--compare $OLD_RESULTS_JSON] [--jobs N] [ScenarioGen.py options]\n")
+
+def readArguments(Argv):
+
+    # Purpose: read the command line arguments
+
+    # Returns
+    # =======
+    # BenchPath: str
+    #            Path to the benchmark directory
+    # ResultsFile: str
+    #              Path to the results file
+    # Options: dict
+    #          Variants, file to compare with and number of jobs
+    # Params: dict
+    #         Scenario parameters (SCEN_DEFAULTS keys)
+
+    if len(Argv) < 3:
+        displayUsage()
+        sys.exit()
+
+    BenchPath = Argv[1]
+    ResultsFile = Argv[2]
+    Options = {"Variants": list(BENCH_VARIANTS), "Compare": None, "Jobs": 1}
+    Params = SCEN_DEFAULTS.copy()
+
+    Args = Argv[3:]
+    while len(Args) > 1 and Args[0].startswith("--"):
+        Key = Args[0][2:]
+        if Key == "variants" and all(Variant in BENCH_VARIANTS for Variant in Args[1].split(',')):
+            Options["Variants"] = Args[1].split(',')
+        elif Key == "compare":
+            Options["Compare"] = Args[1]
+        elif Key == "jobs" and Args[1].isdigit() and int(Args[1]) >= 1:
+            Options["Jobs"] = int(Args[1])
+        elif Key.upper() == "DATE":
+            Params["DATE"] = Args[1]
+        elif Key.upper() in Params and Args[1].isdigit() and int(Args[1]) >= 1:
+            Params[Key.upper()] = int(Args[1])
+        else:
+            displayUsage()
+            sys.exit()
+        Args = Args[2:]
+
+    if len(Args) > 0:
+        displayUsage()
+        sys.exit()
+
+    return BenchPath, ResultsFile, Options, Params
+
+# End of readArguments()
+
+def prepareScenario(Scen, Params):
+
+    # Purpose: generate the benchmark scenario, unless it was generated
+    #          with the same parameters
+
+    # Returns
+    # =======
+    # Conf: dict
+    #       Fields of each configuration parameter of the scenario
+
+    ScenFile = Scen + "/SCENARIO.json"
+
+    if os.path.isfile(ScenFile):
+        with open(ScenFile, 'r') as f:
+            Scenario = json.load(f, object_pairs_hook = OrderedDict)
+        if Scenario["Params"] == Params:
+            print("INFO: Reusing scenario %s" % Scen)
+            return Scenario["Conf"]
+
+    print("INFO: Generating scenario %s..." % Scen)
+    shutil.rmtree(Scen, ignore_errors = True)
+    Conf = generateScenario(Scen, Params)
+
+    with open(ScenFile, 'w') as f:
+        json.dump(OrderedDict([("Params", Params), ("Conf", Conf)]), f, indent=1)
+
+    return Conf
+
+# End of prepareScenario()
+
+def getCommit():
+
+    # Purpose: get the git commit of the sources ("+" if modified)
+
+    try:
+        Commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd = SRC_DIR,
+            capture_output = True, text = True, check = True).stdout.strip()
+        Status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd = SRC_DIR, capture_output = True, text = True, check = True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return Commit + ("+" if Status else "")
+
+# End of getCommit()
+
+def collectProfiles(Scen):
+
+    # Purpose: sum the profiling reports of all the receiver days
+
+    # Returns
+    # =======
+    # Result: dict
+    #         Epochs, epochs per second, peak memory and time and calls
+    #         of every stage
+
+    Result = OrderedDict([("Epochs", 0), ("EpochsPerSecond", None),
+        ("PeakRssMB", None), ("RcvrDays", 0), ("Stages", OrderedDict({}))])
+    EpochsTime = 0.0
+
+    for ProfFile in sorted(glob.glob(Scen + "/OUT/PROF/PROF_*.json")):
+        with open(ProfFile, 'r') as f:
+            Report = json.load(f, object_pairs_hook = OrderedDict)
+
+        Result["RcvrDays"] = Result["RcvrDays"] + 1
+        Result["Epochs"] = Result["Epochs"] + Report["Epochs"]
+        if Report["EpochsPerSecond"]:
+            EpochsTime = EpochsTime + Report["Epochs"] / Report["EpochsPerSecond"]
+        if Report["PeakRssMB"] is not None:
+            Result["PeakRssMB"] = max(Result["PeakRssMB"] or 0, Report["PeakRssMB"])
+
+        for Name, Stage in Report["Stages"].items():
+            Sum = Result["Stages"].setdefault(Name, OrderedDict([("Time", 0.0), ("Calls", 0)]))
+            Sum["Time"] = Sum["Time"] + Stage["Time"]
+            Sum["Calls"] = Sum["Calls"] + Stage["Calls"]
+
+    if EpochsTime > 0:
+        Result["EpochsPerSecond"] = Result["Epochs"] / EpochsTime
+
+    return Result
+
+# End of collectProfiles()
+
+def runVariant(Scen, Conf, Variant, NJobs, Overrides=None):
+
+    # Purpose: run the full chain on the scenario with the configuration
+    #          of a variant (or with the given configuration parameters,
+    #          KEY -> fields, overriding the scenario configuration)
+
+    # Returns
+    # =======
+    # Result: dict
+    #         Wall time of the chain and the profiling results, None if
+    #         the chain failed
+
+    VariantConf = Conf.copy()
+    VariantConf.update(BENCH_VARIANTS[Variant] if Overrides is None else Overrides)
+    VariantConf.update(BENCH_CONF)
+    writeConf(Scen + "/CFG/petrus.cfg", VariantConf)
+
+    for Output in BENCH_OUTPUTS:
+        shutil.rmtree(Scen + "/OUT/" + Output, ignore_errors = True)
+
+    print("INFO: Running variant %s..." % Variant)
+    Start = time.perf_counter()
+    Out = subprocess.run([sys.executable, SRC_DIR + "/Petrus.py", Scen, "--jobs", str(NJobs)],
+        cwd = SRC_DIR, capture_output = True, text = True)
+    WallTime = time.perf_counter() - Start
+
+    if Out.returncode != 0:
+        sys.stderr.write(Out.stderr[-2000:])
+        sys.stderr.write("ERROR: Variant %s failed\n" % Variant)
+        return None
+
+    Result = OrderedDict([("WallTime", WallTime)])
+    Result.update(collectProfiles(Scen))
+
+    return Result
+
+# End of runVariant()
+
+def compareResults(Old, New):
+
+    # Purpose: display the ratio of the times of two benchmark results
+
+    print("INFO: Comparison of %s (%s) with %s (%s): NEW/OLD time" % \
+        (New["Commit"], New["Date"], Old["Commit"], Old["Date"]))
+
+    if Old["Scenario"] != New["Scenario"]:
+        print("WARNING: The scenarios differ")
+
+    for Variant, NewResult in New["Variants"].items():
+        OldResult = Old["Variants"].get(Variant)
+        if not OldResult or not NewResult:
+            continue
+
+        print("%-28s %10s %10s %7s" % (Variant, "OLD [s]", "NEW [s]", "RATIO"))
+        Rows = [("FULL CHAIN", OldResult["WallTime"], NewResult["WallTime"])]
+        for Name, Stage in NewResult["Stages"].items():
+            if Name in OldResult["Stages"]:
+                Rows.append((Name, OldResult["Stages"][Name]["Time"], Stage["Time"]))
+        for Name, OldTime, NewTime in Rows:
+            print("  %-26s %10.3f %10.3f %7.3f" % (Name, OldTime, NewTime,
+                NewTime / OldTime if OldTime > 0 else float("nan")))
+
+# End of compareResults()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    BenchPath, ResultsFile, Options, Params = readArguments(sys.argv)
+
+    Scen = BenchPath + "/SCEN"
+    Conf = prepareScenario(Scen, Params)
+
+    Results = OrderedDict({})
+    Results["Commit"] = getCommit()
+    Results["Date"] = datetime.now().isoformat(timespec = "seconds")
+    Results["Python"] = platform.python_version()
+    Results["Machine"] = platform.machine()
+    Results["Jobs"] = Options["Jobs"]
+    Results["Scenario"] = Params
+    Results["Variants"] = OrderedDict({})
+
+    NFailed = 0
+    for Variant in Options["Variants"]:
+        Result = runVariant(Scen, Conf, Variant, Options["Jobs"])
+        Results["Variants"][Variant] = Result
+        if Result is None:
+            NFailed = NFailed + 1
+        else:
+            print("INFO: Variant %s: %.3f s, %d epochs" % (Variant, Result["WallTime"], Result["Epochs"]))
+
+    os.makedirs(os.path.dirname(os.path.abspath(ResultsFile)), exist_ok=True)
+    with open(ResultsFile, 'w') as f:
+        json.dump(Results, f, indent=1)
+    print("INFO: Benchmark results: %s" % ResultsFile)
+
+    if Options["Compare"] is not None:
+        with open(Options["Compare"], 'r') as f:
+            compareResults(json.load(f, object_pairs_hook = OrderedDict), Results)
+
+    if NFailed > 0:
+        sys.exit(-1)
+
+#######################################################
+# End of StageBench.py
+#######################################################
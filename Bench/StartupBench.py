@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+########################################################################
+# StartupBench.py:
+# This is the Startup Benchmark of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           StartupBench.py
+#  Date(YY/MM/DD): 16/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   StartupBench.py [$MAX_TIME]
+#
+#   Measures the time to import Petrus.py in a new interpreter (the best
+#   of several runs) and checks that the plotting and SciPy stacks are
+#   not imported at startup. Exits with an error if they are, or if the
+#   import time exceeds $MAX_TIME seconds
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+import subprocess
+import time
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Number of measured imports
+NRUNS = 5
+
+# Modules which must only be imported when a stage needs them
+HEAVY_MODULES = ["matplotlib", "scipy", "pandas"]
+
+# Source directory
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def importPetrus():
+
+    # Purpose: import Petrus.py in a new interpreter
+
+    # Returns
+    # =======
+    # Time: float
+    #       Wall-clock time of the interpreter, startup included [s]
+    # Loaded: list
+    #         Heavy modules loaded by the import
+
+    Env = dict(os.environ)
+    Env["PYTHONPATH"] = os.pathsep.join([SRC_DIR, os.path.dirname(SRC_DIR)] + \
+        [Path for Path in [os.environ.get("PYTHONPATH")] if Path])
+
+    Code = "import sys, Petrus; print(' '.join(Mod for Mod in %s if Mod in sys.modules))" % HEAVY_MODULES
+
+    Start = time.perf_counter()
+    Out = subprocess.run([sys.executable, "-c", Code], cwd = SRC_DIR, env = Env,
+        capture_output = True, text = True)
+    Time = time.perf_counter() - Start
+
+    if Out.returncode != 0:
+        sys.stderr.write(Out.stderr)
+        sys.stderr.write("ERROR: Petrus.py could not be imported\n")
+        sys.exit(-1)
+
+    return Time, Out.stdout.split()
+
+# End of importPetrus()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    MaxTime = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    Times = []
+    for Run in range(NRUNS):
+        Time, Loaded = importPetrus()
+        Times.append(Time)
+
+    print("INFO: Petrus.py import time: best %.3f s, worst %.3f s over %d runs" % \
+        (min(Times), max(Times), NRUNS))
+
+    if len(Loaded) > 0:
+        sys.stderr.write("ERROR: Modules imported at startup: %s\n" % ' '.join(Loaded))
+        sys.exit(-1)
+
+    if MaxTime is not None and min(Times) > MaxTime:
+        sys.stderr.write("ERROR: Import time above %.3f s\n" % MaxTime)
+        sys.exit(-1)
+
+#######################################################
+# End of StartupBench.py
+#######################################################
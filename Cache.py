@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/Cache.py:
+# This is the Stage Cache Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           Cache.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+Common = os.path.dirname(os.path.dirname(
+    os.path.abspath(sys.argv[0]))) + '/COMMON'
+sys.path.insert(0, Common)
+import json
+import glob
+import hashlib
+from collections import OrderedDict
+
+# Stage cache parameters
+#-----------------------------------------------------------------------
+# Every stage of a receiver day is identified by a fingerprint of its
+# inputs: the configuration parameters it depends on, the input files
+# (size, modification time and content hash) and the source files of its
+# code. A stage whose fingerprint is the same as in the previous run, and
+# whose outputs are still there, does not need to be run again
+
+# Configuration parameters per stage. The parameters which only select how
+# the results are computed (engines, batches, pipeline...) are not
+# included, since they give the same outputs
+STAGE_CONF = OrderedDict({})
+# Preprocessing, corrections and spvt, computed together epoch by epoch
+STAGE_CONF["CHAIN"] = ["SAMPLING_RATE", "SBAS_MODE", "GEO",
+    "NAV_SOLUTION", "GPS_FREQ", "GAL_FREQ", "PREPRO_OUT", "CORR_OUT", "SPVT_OUT",
+    "RCVR_INFO", "RCVR_FILE", "NCHANNELS_GPS", "NCHANNELS_GAL", "RCVR_MASK",
+    "EQUIPMENT_CLASS", "AIR_ACC_DESIG", "ELEV_NOISE_TH", "SIGMA_NOISE_DF", "MIN_CNR",
+    "MIN_NCS_TH", "MAX_PSR_OUTRNG", "MAX_CODE_RATE", "MAX_CODE_RATE_STEP",
+    "MAX_PHASE_RATE", "MAX_PHASE_RATE_STEP", "HATCH_GAP_TH", "HATCH_TIME",
+    "HATCH_STATE_F", "HATCH_DIV_TH", "HATCH_DIV_TIME", "MAX_LSQ_ITER", "SBAS_IONO_NPA",
+    "PDOP_MAX", "OUT_FORMAT"]
+# Performances
+STAGE_CONF["PERF"] = ["SAMPLING_RATE", "HATCH_GAP_TH", "PERF_OUT", "VPEHIST_OUT",
+    "OUT_FORMAT", "OS", "APVI", "LPV200", "CATI", "NPA", "MARITIME", "CUSTOM"]
+# Plots
+STAGE_CONF["PREPRO_PLOTS"] = []
+STAGE_CONF["CORR_PLOTS"] = []
+STAGE_CONF["POS_PLOTS"] = []
+
+# Source files per stage, besides the ones of the COMMON package, which
+# are part of the code of all the stages
+STAGE_CODE = OrderedDict({})
+STAGE_CODE["CHAIN"] = ["Petrus.py", "InputOutput.py", "Preprocessing.py",
+    "Corrections.py", "Spvt.py", "Pipeline.py"]
+STAGE_CODE["PERF"] = ["Petrus.py", "InputOutput.py", "Perf.py", "Histogram.py", "PerfPlots.py"]
+STAGE_CODE["PREPRO_PLOTS"] = ["InputOutput.py", "ConPlots.py", "PreprocessingPlots.py"]
+STAGE_CODE["CORR_PLOTS"] = ["InputOutput.py", "ConPlots.py", "CorrectionsPlots.py"]
+STAGE_CODE["POS_PLOTS"] = ["InputOutput.py", "ConPlots.py", "PosPlots.py", "Histogram.py"]
+
+# Size of the blocks read to hash the files
+HASH_BLOCK_SIZE = 2**20
+
+# Source files hashes, computed once per process
+CodeHashes = OrderedDict({})
+
+# Stage cache internal functions
+#-----------------------------------------------------------------------
+
+def hashFile(Path):
+
+    # Purpose: compute the hash of the content of a file
+
+    h = hashlib.sha1()
+    with open(Path, 'rb') as f:
+        for Block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(Block)
+
+    return h.hexdigest()
+
+# End of hashFile()
+
+def getFileHash(Cache, Path):
+
+    # Purpose: get the hash of a file. The hash of the previous run is
+    #          reused if the size and modification time of the file have
+    #          not changed
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Path: str
+    #       Path to file
+
+    # Returns
+    # =======
+    # Hash: str
+    #       Hash of the file ("" if the file does not exist)
+
+    if not os.path.isfile(Path):
+        return ""
+
+    Stat = os.stat(Path)
+    Prev = Cache["Files"].get(Path)
+
+    if Prev is not None and Prev[0] == Stat.st_size and Prev[1] == Stat.st_mtime_ns:
+        return Prev[2]
+
+    Hash = hashFile(Path)
+    Cache["Files"][Path] = [Stat.st_size, Stat.st_mtime_ns, Hash]
+
+    return Hash
+
+# End of getFileHash()
+
+def getCommonSources():
+
+    # Purpose: get the source files of the COMMON package
+
+    try:
+        import COMMON
+
+    except ImportError:
+        return []
+
+    Sources = []
+    for CommonDir in COMMON.__path__:
+        Sources.extend(sorted(glob.glob(os.path.join(CommonDir, "*.py"))))
+
+    return Sources
+
+# End of getCommonSources()
+
+def getCodeHash(Stage):
+
+    # Purpose: get the hash of the source files of a stage
+
+    if Stage not in CodeHashes:
+        h = hashlib.sha1()
+        SrcDir = os.path.dirname(os.path.abspath(__file__))
+        for SrcFile in STAGE_CODE[Stage]:
+            Path = os.path.join(SrcDir, SrcFile)
+            h.update(SrcFile.encode())
+            if os.path.isfile(Path):
+                h.update(hashFile(Path).encode())
+        for Path in getCommonSources():
+            h.update(("COMMON/" + os.path.basename(Path)).encode())
+            h.update(hashFile(Path).encode())
+
+        CodeHashes[Stage] = h.hexdigest()
+
+    return CodeHashes[Stage]
+
+# End of getCodeHash()
+
+# Stage cache main functions
+#-----------------------------------------------------------------------
+
+def openStageCache(Scen, Conf, Rcvr, Year, Doy):
+
+    # Purpose: open the stage cache of a receiver day, with the stages
+    #          fingerprints of the previous run
+
+    # Parameters
+    # ==========
+    # Scen: str
+    #       Path to SCENARIO
+    # Conf: dict
+    #       Configuration dictionary
+    # Rcvr: str
+    #       Receiver acronym
+    # Year: int
+    #       Year
+    # Doy: int
+    #      Day of year
+
+    # Returns
+    # =======
+    # Cache: dict
+    #        Stage cache of the receiver day
+
+    Cache = {
+        "Enabled": Conf["STAGE_CACHE"] == 1,        # Stage cache activated
+        "Path": Scen + '/OUT/CACHE/' + "CACHE_%s_Y%02dD%03d.json" % (Rcvr, Year % 100, Doy),
+        "Stages": OrderedDict({}),                  # Fingerprint and outputs per stage
+        "Files": OrderedDict({}),                   # Size, mtime and hash per file
+    } # End of Cache
+
+    # Load the previous run, if any
+    if Cache["Enabled"] and os.path.isfile(Cache["Path"]):
+        try:
+            with open(Cache["Path"], 'r') as f:
+                Prev = json.load(f)
+            Cache["Stages"].update(Prev["Stages"])
+            Cache["Files"].update(Prev["Files"])
+
+        # A corrupted cache only means that all the stages are run
+        except (ValueError, KeyError):
+            sys.stderr.write("WARNING: Ignoring corrupted stage cache %s\n" % Cache["Path"])
+
+    return Cache
+
+# End of openStageCache()
+
+def computeStageFingerprint(Cache, Stage, Conf, InputFiles, Extra=None):
+
+    # Purpose: compute the fingerprint of the inputs of a stage
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Stage: str
+    #        Stage name (key of STAGE_CONF)
+    # Conf: dict
+    #       Configuration dictionary
+    # InputFiles: list
+    #             Paths to the input files of the stage
+    # Extra: object
+    #        Other inputs of the stage (e.g. plots configuration),
+    #        serializable in JSON
+
+    # Returns
+    # =======
+    # Fingerprint: str
+    #              Fingerprint of the stage inputs
+
+    if not Cache["Enabled"]:
+        return ""
+
+    Inputs = OrderedDict({})
+    Inputs["Conf"] = [(Key, Conf.get(Key)) for Key in STAGE_CONF[Stage]]
+    Inputs["Files"] = [(Path, getFileHash(Cache, Path)) for Path in InputFiles]
+    Inputs["Code"] = getCodeHash(Stage)
+    Inputs["Extra"] = Extra
+
+    return hashlib.sha1(json.dumps(Inputs, default=str).encode()).hexdigest()
+
+# End of computeStageFingerprint()
+
+def isStageCached(Cache, Stage, Fingerprint, Outputs):
+
+    # Purpose: check if a stage can be skipped: same fingerprint as in the
+    #          previous run and outputs not modified since then
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Stage: str
+    #        Stage name
+    # Fingerprint: str
+    #              Fingerprint of the stage inputs
+    # Outputs: list
+    #          Paths to the output files of the stage
+
+    # Returns
+    # =======
+    # Cached: bool
+    #         True if the stage can be skipped
+
+    if not Cache["Enabled"] or Stage not in Cache["Stages"]:
+        return False
+
+    Prev = Cache["Stages"][Stage]
+    if Prev["Fingerprint"] != Fingerprint or sorted(Prev["Outputs"]) != sorted(Outputs):
+        return False
+
+    # The outputs must be the ones written by the stage
+    for Path in Outputs:
+        Stat = os.stat(Path) if os.path.isfile(Path) else None
+        if Stat is None or Cache["Files"].get(Path, [None, None])[:2] != [Stat.st_size, Stat.st_mtime_ns]:
+            return False
+
+    return True
+
+# End of isStageCached()
+
+def updateStageCache(Cache, Stage, Fingerprint, Outputs):
+
+    # Purpose: record a stage which has been run, with its outputs
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Stage: str
+    #        Stage name
+    # Fingerprint: str
+    #              Fingerprint of the stage inputs
+    # Outputs: list
+    #          Paths to the output files of the stage
+
+    # Returns
+    # =======
+    # Nothing
+
+    if not Cache["Enabled"]:
+        return
+
+    # Record the outputs as written
+    for Path in Outputs:
+        getFileHash(Cache, Path)
+
+    Cache["Stages"][Stage] = {"Fingerprint": Fingerprint, "Outputs": list(Outputs)}
+
+# End of updateStageCache()
+
+def getCachedOutputs(Cache, Stage):
+
+    # Purpose: get the outputs of a stage recorded in the previous run,
+    #          for the stages whose outputs are only known once run
+    #          (e.g. the figures of the plots)
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Stage: str
+    #        Stage name
+
+    # Returns
+    # =======
+    # Outputs: list
+    #          Paths to the output files of the stage (empty if the stage
+    #          was not recorded)
+
+    if not Cache["Enabled"] or Stage not in Cache["Stages"]:
+        return []
+
+    return list(Cache["Stages"][Stage]["Outputs"])
+
+# End of getCachedOutputs()
+
+def closeStageCache(Cache):
+
+    # Purpose: write the stage cache of the receiver day for the next run
+
+    if not Cache["Enabled"]:
+        return
+
+    os.makedirs(os.path.dirname(Cache["Path"]), exist_ok=True)
+
+    # Write it in a temporary file first, not to leave a corrupted cache
+    TmpPath = Cache["Path"] + ".tmp"
+    with open(TmpPath, 'w') as f:
+        json.dump({"Stages": Cache["Stages"], "Files": Cache["Files"]}, f, indent=1)
+
+    os.replace(TmpPath, Cache["Path"])
+
+# End of closeStageCache()
+
+########################################################################
+# END OF STAGE CACHE FUNCTIONS MODULE
+########################################################################
@@ -20,6 +20,7 @@
 # Import External and Internal functions and Libraries
 #----------------------------------------------------------------------
 import sys, os
+import math
 # Add path to find all modules
 Common = os.path.dirname(os.path.dirname(
     os.path.abspath(sys.argv[0]))) + '/COMMON'
@@ -79,7 +80,7 @@ def computeSigmaFlt(SatInfo, CorrectInfo):
     # Reference: MOPS-DO-229D Section A.4.5.1
 
     # If RSS==0
-    if(SatInfo[SatIdx["RSS"]]=='0'):
+    if(int(SatInfo[SatIdx["RSS"]]) == 0):
         # Compute non-root-sum-squared
         CorrectInfo["SigmaFlt"] = (\
             (float(SatInfo[SatIdx["SIGMAUDRE"]]) * float(SatInfo[SatIdx["DELTAUDRE"]])) + \
@@ -124,7 +125,7 @@ def computeUisdAndUire(PreproInfo, LosInfo, CorrectInfo):
     # Reference: MOPS-DO-229D Section A.4.4.10.3
 
     # Rectangular interpolation
-    if(LosInfo[LosIdx["INTERP"]] == '0'):
+    if(int(LosInfo[LosIdx["INTERP"]]) == 0):
         # Case of IPP between S85 and N85
         if (float(LosInfo[LosIdx["IPPLAT"]]) < 85.0) and\
             (float(LosInfo[LosIdx["IPPLAT"]]) > -85.0):
@@ -225,7 +226,7 @@ def computeUisdAndUire(PreproInfo, LosInfo, CorrectInfo):
             )
         )
 
-    # End of if(int(LosInfo[LosIdx["INTERP"]]) == '0'):
+    # End of if(int(LosInfo[LosIdx["INTERP"]]) == 0):
 
 
 def computeTropoMpp(Elev):
@@ -536,3 +537,377 @@ def runCorrectMeas(Conf, Rcvr, PreproObsInfo, SatInfo, LosInfo):
             SatCorrInfo["EntGps"] = EntGpsSum / EntGpsN if EntGpsN else np.nan
 
     return CorrInfo
+
+# Vertex of the IGP grid cell: column of the arrays in runCorrectMeasVec
+VecVertexIdx = {
+    "NE": 0,
+    "NW": 1,
+    "SW": 2,
+    "SE": 3,
+}
+
+# Triangular interpolation: Vertex opposite the hypotenuse (Vertex 2),
+# Vertex 1 (N/S swap of Vertex 2) and Vertex 3 (E/W swap of Vertex 2)
+# per INTERP value, as computed in computeUisdAndUire
+VecTriangleVertex = np.array([
+    # V1 V2 V3
+    [0, 0, 0],                                          # INTERP=0 (not used)
+    [VecVertexIdx["NW"], VecVertexIdx["SW"], VecVertexIdx["SE"]],    # INTERP=1
+    [VecVertexIdx["NE"], VecVertexIdx["SE"], VecVertexIdx["SW"]],    # INTERP=2
+    [VecVertexIdx["SE"], VecVertexIdx["NE"], VecVertexIdx["NW"]],    # INTERP=3
+    [VecVertexIdx["SW"], VecVertexIdx["NW"], VecVertexIdx["NE"]],    # INTERP=4
+])
+
+# C library pow() as a NumPy ufunc: the loop over the array elements runs
+# in C and each element goes through the same pow() call as the Python
+# float power of the per satellite functions
+LibmPow = np.frompyfunc(math.pow, 2, 1)
+
+def rewrapLonVec(Longitude):
+
+    # Purpose: rewrap the longitudes into [-180, 180] degrees, as
+    #          rewrapLon does for a single longitude
+
+    # Parameters
+    # ==========
+    # Longitude: numpy.ndarray
+    #            Longitudes [deg]
+
+    # Returns
+    # =======
+    # Longitude: numpy.ndarray
+    #            Rewrapped longitudes [deg]
+
+    return np.where(np.abs(Longitude) > 180.0,
+        Longitude - (Longitude/np.abs(Longitude)) * 360.0,
+        Longitude)
+
+# End of rewrapLonVec()
+
+def rewrapLatVec(Latitude):
+
+    # Purpose: rewrap the latitudes into [-90, 90] degrees, as
+    #          rewrapLat does for a single latitude
+
+    # Parameters
+    # ==========
+    # Latitude: numpy.ndarray
+    #           Latitudes [deg]
+
+    # Returns
+    # =======
+    # Latitude: numpy.ndarray
+    #           Rewrapped latitudes [deg]
+
+    return np.where(np.abs(Latitude) > 90.0,
+        Latitude - (Latitude/np.abs(Latitude)) * 180.0,
+        Latitude)
+
+# End of rewrapLatVec()
+
+def powLibm(Values, Exponent):
+
+    # Purpose: element-wise power computed with the C library pow(), as
+    #          done for Python floats in the per satellite functions
+
+    # runCorrectMeasVec must give the same CorrInfo as runCorrectMeas,
+    # bit for bit. The NumPy array power does not: it squares for
+    # Exponent = 2 and uses its own pow() kernels otherwise, and both
+    # differ from the C library pow() in the last bit for some values
+    # (about 0.1% of the squares and 4% of the inverse squares of random
+    # samples). Hence the power goes through LibmPow.
+
+    # Parameters
+    # ==========
+    # Values: numpy.ndarray
+    #         Bases
+    # Exponent: float
+    #           Exponent
+
+    # Returns
+    # =======
+    # Power: numpy.ndarray
+    #        Values**Exponent, with the shape of Values
+
+    return LibmPow(Values, float(Exponent)).astype(float)
+
+# End of powLibm()
+
+def dotRows(A, B):
+
+    # Purpose: row-wise dot product of two (N, 3) arrays, computed as
+    #          np.dot on each pair of rows
+
+    # Parameters
+    # ==========
+    # A: numpy.ndarray
+    #    (N, 3) array
+    # B: numpy.ndarray
+    #    (N, 3) array
+
+    # Returns
+    # =======
+    # Dot: numpy.ndarray
+    #      (N,) array of the dot products of the rows of A and B
+
+    return np.matmul(A[:, np.newaxis, :], B[:, :, np.newaxis])[:, 0, 0]
+
+# End of dotRows()
+
+def runCorrectMeasVec(Conf, Rcvr, PreproObsInfo, SatData, LosData):
+
+    # Purpose: correct GNSS preprocessed measurements and compute
+    #          pseudo range residuals, for all the satellites of the
+    #          epoch at once
+
+    # This is the array-backed counterpart of runCorrectMeas: every input
+    # field is read once from the typed SAT/LOS arrays and the satellite 
+    # position and clock, SigmaFLT, UISD/UIRE (rectangular and triangular
+    # interpolation), tropo, airborne sigmas and residuals are computed as
+    # array operations. The floating point operations are the same as in 
+    # runCorrectMeas and the receiver clock and ENT-GPS sums are 
+    # accumulated in the same order, so that CorrInfo is identical.
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #         Configuration dictionary
+    # Rcvr: list
+    #         Receiver information: position, masking angle...
+    # PreproObsInfo: dict
+    #         Preprocessed observations for current epoch per sat
+    #         PreproObsInfo["G01"]["C1"]
+    # SatData: numpy.ndarray
+    #         SAT file lines of the epoch, as read by readIndexedCorrectInputs
+    # LosData: numpy.ndarray
+    #         LOS file lines of the epoch, as read by readIndexedCorrectInputs
+
+    # Returns
+    # =======
+    # CorrInfo: dict
+    #         Corrected measurements for current epoch per sat
+    #         CorrInfo["G01"]["CorrectedPsr"]
+
+    # Initialize output
+    CorrInfo = OrderedDict({})
+
+    # Get the satellites in convergence
+    Labels = [SatLabel for SatLabel, SatPrepro in PreproObsInfo.items() \
+        if SatPrepro["Status"] == 1]
+
+    # Index SAT and LOS lines by satellite label
+    SatRow = {"%s%02d" % (Const, Prn): Row for Row, (Const, Prn) in \
+        enumerate(zip(SatData["CONST"], SatData["PRN"].astype(int)))}
+    LosRow = {"%s%02d" % (Const, Prn): Row for Row, (Const, Prn) in \
+        enumerate(zip(LosData["CONST"], LosData["PRN"].astype(int)))}
+
+    # Get the satellites with SBAS information
+    Avail = [SatLabel for SatLabel in Labels if (SatLabel in SatRow) and (SatLabel in LosRow)]
+    Sat = SatData[[SatRow[SatLabel] for SatLabel in Avail]]
+    Los = LosData[[LosRow[SatLabel] for SatLabel in Avail]]
+
+    # Get the LoS flag from UDREI: Not Monitored or Don't Use (0), NPA (2) or PA (1)
+    Udrei = Sat["UDREI"].astype(int)
+    Flag = np.where(Udrei >= 14, 0, np.where(Udrei >= 12, 2, 1))
+    AvailInfo = dict(zip(Avail, zip(Flag.tolist(), Los["IPPLON"].tolist(), Los["IPPLAT"].tolist())))
+
+    # Keep only the satellites to be corrected
+    Used = Flag > 0
+    UsedLabels = [SatLabel for SatLabel, IsUsed in zip(Avail, Used) if IsUsed]
+    Sat = Sat[Used]
+    Los = Los[Used]
+    Elev = np.array([PreproObsInfo[SatLabel]["Elevation"] for SatLabel in UsedLabels], dtype=float)
+    Mpp = np.array([PreproObsInfo[SatLabel]["Mpp"] for SatLabel in UsedLabels], dtype=float)
+    SmoothC1 = np.array([PreproObsInfo[SatLabel]["SmoothC1"] for SatLabel in UsedLabels], dtype=float)
+
+    # Get the SAT fields
+    SatX = Sat["SAT-X"]
+    SatY = Sat["SAT-Y"]
+    SatZ = Sat["SAT-Z"]
+    LtcX = Sat["LTC-X"]
+    LtcY = Sat["LTC-Y"]
+    LtcZ = Sat["LTC-Z"]
+    Fc = Sat["FC"]
+    LtcB = Sat["LTC-B"]
+
+    # Apply the SBAS corrections to the satellite position and clock
+    # Reference: MOPS-DO-229D Section A.4.4.7
+    CorrSatX = SatX + LtcX
+    CorrSatY = SatY + LtcY
+    CorrSatZ = SatZ + LtcZ
+    Dtr = (-2 * dotRows(np.stack([SatX, SatY, SatZ], axis=-1),
+        np.stack([Sat["VEL-X"], Sat["VEL-Y"], Sat["VEL-Z"]], axis=-1))) / Const.SPEED_OF_LIGHT
+    SatClk = Sat["SAT-CLK"] + (-1)*Sat["TGD"] + Dtr + Fc + LtcB
+
+    # Compute the Sigma FLT
+    # Reference: MOPS-DO-229D Section A.4.5.1
+    Udre = Sat["SIGMAUDRE"] * Sat["DELTAUDRE"]
+    SigmaFlt = np.where(Sat["RSS"].astype(int) == 0,
+        Udre + Sat["EPS-FC"] + Sat["EPS-RRC"] + Sat["EPS-LTC"] + Sat["EPS-ER"],
+        np.sqrt(powLibm(Udre, 2) + powLibm(Sat["EPS-FC"], 2) + powLibm(Sat["EPS-RRC"], 2) + \
+            powLibm(Sat["EPS-LTC"], 2) + powLibm(Sat["EPS-ER"], 2)))
+
+    # Compute UISD and UIRE on the IPP
+    # Reference: MOPS-DO-229D Section A.4.4.10.3
+    IppLon = Los["IPPLON"]
+    IppLat = Los["IPPLAT"]
+    Interp = Los["INTERP"].astype(int)
+    IgpLon = np.stack([Los["IGP_" + Vertex + "_LON"] for Vertex in VecVertexIdx], axis=-1)
+    IgpLat = np.stack([Los["IGP_" + Vertex + "_LAT"] for Vertex in VecVertexIdx], axis=-1)
+    Givd = np.stack([Los["GIVD_" + Vertex] for Vertex in VecVertexIdx], axis=-1)
+    GiveSquare = powLibm(np.stack([Los["GIVE_" + Vertex] for Vertex in VecVertexIdx], axis=-1), 2)
+    MppSquare = powLibm(Mpp, 2)
+    NE, NW, SW, SE = [VecVertexIdx[Vertex] for Vertex in VecVertexIdx]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Rectangular interpolation
+        Polar = ~((IppLat < 85.0) & (IppLat > -85.0))
+        ypp = np.where(Polar,
+            (np.abs(IppLat) - 85.0) / 10.0,
+            rewrapLatVec(IppLat - IgpLat[:, SW])/rewrapLatVec(IgpLat[:, NW] - IgpLat[:, SW]))
+        xpp = np.where(Polar,
+            ((rewrapLonVec(IppLon - IgpLon[:, SW])/90.0) * (1.0 - (2.0 * ypp))) + ypp,
+            rewrapLonVec(IppLon - IgpLon[:, SW])/rewrapLonVec(IgpLon[:, SE] - IgpLon[:, SW]))
+        W1 = xpp * ypp
+        W2 = (1 - xpp) * ypp
+        W3 = (1 - xpp) * (1 - ypp)
+        W4 = xpp * (1 - ypp)
+        RectUisd = Mpp * ((W1 * Givd[:, NE]) + (W2 * Givd[:, NW]) + \
+            (W3 * Givd[:, SW]) + (W4 * Givd[:, SE]))
+        RectUire = np.sqrt(MppSquare * ((W1 * GiveSquare[:, NE]) + (W2 * GiveSquare[:, NW]) + \
+            (W3 * GiveSquare[:, SW]) + (W4 * GiveSquare[:, SE])))
+
+        # Triangular interpolation
+        Rows = np.arange(len(Interp))
+        Vertex = VecTriangleVertex[np.clip(Interp, 0, 4)]
+        V1, V2, V3 = Vertex[:, 0], Vertex[:, 1], Vertex[:, 2]
+        xpp = rewrapLonVec(IppLon - IgpLon[Rows, V2])/rewrapLonVec(IgpLon[Rows, V3] - IgpLon[Rows, V2])
+        ypp = rewrapLatVec(IppLat - IgpLat[Rows, V2])/rewrapLatVec(IgpLat[Rows, V1] - IgpLat[Rows, V2])
+        W1 = ypp
+        W2 = 1 - xpp - ypp
+        W3 = xpp
+        TriUisd = Mpp * ((W1 * Givd[Rows, V1]) + (W2 * Givd[Rows, V2]) + (W3 * Givd[Rows, V3]))
+        TriUire = np.sqrt(MppSquare * ((W1 * GiveSquare[Rows, V1]) + (W2 * GiveSquare[Rows, V2]) + \
+            (W3 * GiveSquare[Rows, V3])))
+
+    Uisd = np.where(Interp == 0, RectUisd, TriUisd)
+    SigmaUire = np.where(Interp == 0, RectUire, TriUire)
+
+    # Compute the Slant Tropospheric Delay Error Sigma
+    # Refer to MOPS guidelines in Appendix A section A.4.2.4
+    Std = Los["STD"]
+    TropoMpp = (1.001/(np.sqrt(0.002001+powLibm(np.sin(np.radians(Elev)), 2))))
+    TropoMpp = np.where(Elev >= 4, TropoMpp,
+        np.where(Elev >= 2, TropoMpp*(1+0.015*powLibm(np.maximum(0,4-Elev), 2)), np.nan))
+    SigmaTropo = 0.12*TropoMpp
+
+    # Compute User Airborne Sigma
+    # Ref: MOPS-DO-229D Section J.2.4
+    SigmaMpSquare = powLibm(0.13+0.53*np.exp(-Elev/10.0), 2)
+    if Conf["AIR_ACC_DESIG"] == 'A':
+        SigmaNoiseDivSquare = np.where(Elev > Conf["ELEV_NOISE_TH"], 0.15 ** 2, 0.36 ** 2)
+    else:
+        SigmaNoiseDivSquare = np.where(Elev > Conf["ELEV_NOISE_TH"], 0.11 ** 2, 0.15 ** 2)
+    if Conf["EQUIPMENT_CLASS"] == 1:
+        SigmaAirborne = np.full(len(Elev), 5)
+    else:
+        SigmaAirborne = np.sqrt(SigmaMpSquare + SigmaNoiseDivSquare)
+
+    # Compute UERE by combining all Sigma contributions
+    # Ref: MOPS-DO-229D Section J.1
+    SigmaUere = np.sqrt(powLibm(SigmaFlt, 2) + powLibm(SigmaUire, 2) + \
+        powLibm(SigmaTropo, 2) + powLibm(SigmaAirborne, 2))
+
+    # Correct the Smoothed Pseudo Range from Sat Clock, Tropo and Iono delays
+    CorrPsr = SmoothC1 + SatClk - Uisd - Std
+
+    # Compute the Geometrical Range and the Residual
+    RcvrXyz = Rcvr[RcvrIdx["XYZ"]]
+    GeomRange = np.sqrt(powLibm(CorrSatX - RcvrXyz[0], 2) + powLibm(CorrSatY - RcvrXyz[1], 2) + \
+        powLibm(CorrSatZ - RcvrXyz[2], 2))
+    PsrResidual = CorrPsr - GeomRange
+
+    # Compute ENT-GPS estimation from each satellite
+    Ulos = np.stack([SatX - RcvrXyz[0], SatY - RcvrXyz[1], SatZ - RcvrXyz[2]], axis=-1)
+    Unorm = np.sqrt(dotRows(Ulos, Ulos))
+    Ulos = Ulos/Unorm[:, np.newaxis]
+    EntGps = dotRows(np.stack([LtcX, LtcY, LtcZ], axis=-1), Ulos) - (Fc + LtcB)
+
+    # Compute the Receiver Clock and ENT-GPS estimations, accumulating
+    # the satellites in the same order as runCorrectMeas
+    ResSum = 0.0
+    ResN = 0
+    for Weight, Residual in zip(powLibm(SigmaUere, -2), PsrResidual):
+        ResSum = ResSum + (Weight * Residual)
+        ResN = ResN + Weight
+    EntGpsSum = 0.0
+    for SatEntGps in EntGps:
+        EntGpsSum = EntGpsSum + SatEntGps
+    RcvrClk = ResSum / ResN if ResN else np.nan
+    EntGpsMean = EntGpsSum / len(EntGps) if len(EntGps) else np.nan
+
+    # Build the outputs
+    UsedIdx = {SatLabel: i for i, SatLabel in enumerate(UsedLabels)}
+    for SatLabel in Labels:
+        SatPrepro = PreproObsInfo[SatLabel]
+        SatCorrInfo = {
+            "Sod": SatPrepro["Sod"],        # Second of day
+            "Doy": SatPrepro["Doy"],        # Day of year
+            "Elevation": SatPrepro["Elevation"],    # Elevation
+            "Azimuth": SatPrepro["Azimuth"],        # Azimuth
+            "IppLon": 0.0,          # IPP Longitude
+            "IppLat": 0.0,          # IPP Latitude
+            "Flag": 0,              # 0: Not Used 1: Used for PA 2: Used for NPA
+            "SatX": 0.0,            # X-Component of the Satellite Position 
+                                    # corrected with SBAS LTC
+            "SatY": 0.0,            # Y-Component of the Satellite Position 
+                                    # corrected with SBAS LTC
+            "SatZ": 0.0,            # Z-Component of the Satellite Position 
+                                    # corrected with SBAS LTC
+            "SatClk": 0.0,          # Satellite Clock corrected with SBAS FLT
+            "Uisd": 0.0,            # User Ionospheric Slant Delay
+            "Std": 0.0,             # Slant Tropospheric Delay
+            "CorrPsr": 0.0,         # Pseudo Range corrected from delays
+            "GeomRange": 0.0,       # Geometrical Range
+            "PsrResidual": 0.0,     # Pseudo Range Residual
+            "RcvrClk": 0.0,         # Receiver Clock estimation
+            "SigmaFlt": 0,          # Sigma of the residual error associated to FLT
+            "SigmaUire": 0,         # User Ionospheric Range Error Sigma
+            "SigmaTropo": 0,        # Sigma of the Tropospheric error 
+            "SigmaAirborne": 0.0,   # Sigma Airborne Error
+            "SigmaNoiseDiv": 0.0,   # Sigma of the receiver noise + divergence
+            "SigmaMultipath": 0.0,  # Sigma of the receiver multipath
+            "SigmaUere": 0.0,       # Sigma User Equivalent Range Error
+            "EntGps": 0.0,          # ENT to GPS Offset
+        } # End of SatCorrInfo
+
+        # If SBAS information is available for current satellite
+        if SatLabel in AvailInfo:
+            SatCorrInfo["Flag"], SatCorrInfo["IppLon"], SatCorrInfo["IppLat"] = AvailInfo[SatLabel]
+
+        # If the satellite has been corrected
+        if SatLabel in UsedIdx:
+            i = UsedIdx[SatLabel]
+            SatCorrInfo["SatX"] = CorrSatX[i]
+            SatCorrInfo["SatY"] = CorrSatY[i]
+            SatCorrInfo["SatZ"] = CorrSatZ[i]
+            SatCorrInfo["SatClk"] = SatClk[i]
+            SatCorrInfo["SigmaFlt"] = SigmaFlt[i]
+            SatCorrInfo["Uisd"] = Uisd[i]
+            SatCorrInfo["SigmaUire"] = SigmaUire[i]
+            SatCorrInfo["Std"] = Std[i]
+            SatCorrInfo["SigmaTropo"] = SigmaTropo[i]
+            SatCorrInfo["SigmaNoiseDiv"] = np.sqrt(SigmaNoiseDivSquare[i])
+            SatCorrInfo["SigmaMultipath"] = np.sqrt(SigmaMpSquare[i])
+            SatCorrInfo["SigmaAirborne"] = SigmaAirborne[i]
+            SatCorrInfo["SigmaUere"] = SigmaUere[i]
+            SatCorrInfo["CorrPsr"] = CorrPsr[i]
+            SatCorrInfo["GeomRange"] = GeomRange[i]
+            SatCorrInfo["RcvrClk"] = RcvrClk
+            SatCorrInfo["PsrResidual"] = PsrResidual[i] - RcvrClk
+            SatCorrInfo["EntGps"] = EntGpsMean
+
+        # Prepare output for the satellite
+        CorrInfo[SatLabel] = SatCorrInfo
+
+    return CorrInfo
@@ -18,20 +18,41 @@
 ########################################################################
 
 from collections import OrderedDict
-from math import sqrt
 import sys, os
 from pandas import unique
 from pandas import read_csv
 from InputOutput import CorrIdx, SatIdx, RcvrIdx
+from InputOutput import readPlotsData
+from InputOutput import CorrFmt
+from Aggregation import computeStatsPerKey
 sys.path.append(os.getcwd() + '/' + \
     os.path.dirname(sys.argv[0]) + '/' + 'COMMON')
 from COMMON import GnssConstants, Iono
-from COMMON.Plots import generatePlot
+from PlotQueue import queuePlot
 from COMMON.Coordinates import xyz2llh
 import numpy as np
 from ConPlots import ConfCorr
 import matplotlib.pyplot as plt
 
+# Columns read for each plot
+CORR_PLOT_COLS = OrderedDict({})
+CORR_PLOT_COLS["PLOT_SAT_TRACKS"] = ["SAT-X", "SAT-Y", "SAT-Z", "ELEV", "FLAG"]
+CORR_PLOT_COLS["PLOT_LTC"] = ["SOD", "ENTtoGPS", "FLAG"]
+CORR_PLOT_COLS["PLOT_ENT_GPS"] = ["SOD", "ENTtoGPS", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_FLT"] = ["PRN", "ELEV", "SFLT", "FLAG"]
+CORR_PLOT_COLS["PLOT_UIVD"] = ["SOD", "ELEV", "UISD", "FLAG"]
+CORR_PLOT_COLS["PLOT_UISD"] = ["IPPLON", "IPPLAT", "UISD", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_UIRE"] = ["PRN", "ELEV", "SUIRE", "FLAG"]
+CORR_PLOT_COLS["PLOT_STD"] = ["IPPLON", "IPPLAT", "STD", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_TROPO"] = ["PRN", "ELEV", "STROPO", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_MULTI"] = ["PRN", "ELEV", "SMP", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_NOISE"] = ["PRN", "ELEV", "SNOISEDIV", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_AIR"] = ["PRN", "ELEV", "SAIR", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_UERE"] = ["PRN", "ELEV", "SUERE", "FLAG"]
+CORR_PLOT_COLS["PLOT_RCVR_CLK"] = ["SOD", "RCVR-CLK", "FLAG"]
+CORR_PLOT_COLS["PLOT_RES"] = ["SOD", "PRN", "PSR-RES", "FLAG"]
+CORR_PLOT_COLS["PLOT_SIGMA_UERE_STATS"] = ["PRN", "SUERE", "FLAG"]
+
 def initPlot(CorrFile, PlotConf, Title, Label):
     
     # Compute information from PreproObsFile
@@ -163,8 +184,8 @@ def plotSatTracks(CorrFile, CorrData, RcvrInfo):
             PlotConf["yData"][Label] = Latitude
             PlotConf["zData"][Label] = CorrData[CorrIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot LTC Corrections
 def plotLtcCorr(CorrFile, CorrData, SatData):
@@ -202,8 +223,8 @@ def plotLtcCorr(CorrFile, CorrData, SatData):
             PlotConf["xData"][Label] = SatData[SatIdx["SOD"]] / GnssConstants.S_IN_H
             PlotConf["yData"][Label] = SatData[SatIdx[Label]]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot ENT-GPS Offset
 def plotEntGps(CorrFile, CorrData):
@@ -233,8 +254,8 @@ def plotEntGps(CorrFile, CorrData):
     PlotConf["xData"][Label] = CorrData[CorrIdx["SOD"]][FilterCond] / GnssConstants.S_IN_H
     PlotConf["yData"][Label] = CorrData[CorrIdx["ENTtoGPS"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma FLT
 def plotSigmaFlt(CorrFile, CorrData):
@@ -275,8 +296,8 @@ def plotSigmaFlt(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SFLT"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot UIVD
 def plotUivd(CorrFile, CorrData):
@@ -324,8 +345,8 @@ def plotUivd(CorrFile, CorrData):
     PlotConf["yData"][Label] = Uivd
     PlotConf["zData"][Label] = Elev
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot UISD
 def plotUisd(CorrFile, CorrData, RcvrInfo):
@@ -374,8 +395,8 @@ def plotUisd(CorrFile, CorrData, RcvrInfo):
     PlotConf["yData"][Label] = CorrData[CorrIdx["IPPLAT"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["UISD"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma UIRE
 def plotSigmaUire(CorrFile, CorrData):
@@ -416,8 +437,8 @@ def plotSigmaUire(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SUIRE"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot STD
 def plotStd(CorrFile, CorrData, RcvrInfo):
@@ -466,8 +487,8 @@ def plotStd(CorrFile, CorrData, RcvrInfo):
     PlotConf["yData"][Label] = CorrData[CorrIdx["IPPLAT"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["STD"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma TROPO
 def plotSigmaTropo(CorrFile, CorrData):
@@ -508,8 +529,8 @@ def plotSigmaTropo(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["STROPO"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma Multipath
 def plotSigmaMulti(CorrFile, CorrData):
@@ -550,8 +571,8 @@ def plotSigmaMulti(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SMP"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma Noise + Divergence
 def plotSigmaNoise(CorrFile, CorrData):
@@ -592,8 +613,8 @@ def plotSigmaNoise(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SNOISEDIV"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma Airborne
 def plotSigmaAir(CorrFile, CorrData):
@@ -634,8 +655,8 @@ def plotSigmaAir(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SAIR"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma UERE
 def plotSigmaUere(CorrFile, CorrData):
@@ -676,8 +697,8 @@ def plotSigmaUere(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["SUERE"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Receiver Clock
 def plotRcvrClock(CorrFile, CorrData):
@@ -707,8 +728,8 @@ def plotRcvrClock(CorrFile, CorrData):
     PlotConf["xData"][Label] = CorrData[CorrIdx["SOD"]][FilterCond] / GnssConstants.S_IN_H
     PlotConf["yData"][Label] = CorrData[CorrIdx["RCVR-CLK"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Pseudo-Range Residuals
 def plotRes(CorrFile, CorrData):
@@ -748,8 +769,8 @@ def plotRes(CorrFile, CorrData):
     PlotConf["yData"][Label] = CorrData[CorrIdx["PSR-RES"]][FilterCond]
     PlotConf["zData"][Label] = CorrData[CorrIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Sigma UERE Statistics
 def plotSigmaUereStats(CorrFile, CorrData):
@@ -770,36 +791,15 @@ def plotSigmaUereStats(CorrFile, CorrData):
 
     PlotConf["BarWidth"] = 0.5
 
-    # Prepare data to be plotted
-    MaxUere = []
-    MinUere = []
-    RMSUere = []
-    ConUere = []
-
-    FilterCond1 = CorrData[CorrIdx["FLAG"]] == 1
-    # Loop over all satellites
-    for Prn in range(1,33,1):
-        FilterCond2 = CorrData[CorrIdx["PRN"]] == Prn
-        SigmaUereSat = CorrData[CorrIdx["SUERE"]][FilterCond2][FilterCond1].to_numpy()
-        # Check if the satellite is in view
-        if len(SigmaUereSat) > 0:
-            # Compute maximum Sigma UERE
-            MaxUere.append(max(SigmaUereSat))
-            # Compute minimum sigma UERE
-            MinUere.append(min(SigmaUereSat))
-            # Compute RMS 
-            NSigma = 0
-            for Sigma in SigmaUereSat:
-                NSigma = NSigma + Sigma**2
-            RMSUere.append(sqrt(NSigma/len(SigmaUereSat)))
-            # Compute 95% confidence interval for Sigma UERE
-            ConfInter = np.percentile(SigmaUereSat, 95)
-            ConUere.append(ConfInter)
-        else:
-            MaxUere.append(0.0)
-            MinUere.append(0.0)
-            RMSUere.append(0.0)
-            ConUere.append(0.0)
+    # Prepare data to be plotted: statistics of every satellite in view
+    # (0.0 otherwise), computed in a single pass
+    FilterCond = CorrData[CorrIdx["FLAG"]] == 1
+    UereStats = computeStatsPerKey(CorrData[CorrIdx["PRN"]][FilterCond], \
+        CorrData[CorrIdx["SUERE"]][FilterCond], range(1,33,1), 95)
+    MaxUere = UereStats["Max"]
+    MinUere = UereStats["Min"]
+    RMSUere = UereStats["RMS"]
+    ConUere = UereStats["Pct"]
 
     PlotData = OrderedDict({})
     PlotData["Max"] = np.around(MaxUere, decimals = 2)
@@ -815,8 +815,8 @@ def plotSigmaUereStats(CorrFile, CorrData):
         PlotConf["xData"][Label] = np.arange(1,33,1)
         PlotConf["yData"][Label] = PlotData[Label]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     
@@ -834,14 +834,13 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Returns
     # =======
     # Nothing
+
+    # Read once the columns needed by all the activated plots
+    CorrData = readPlotsData(CorrFile, CorrIdx, CorrFmt, ConfCorr, CORR_PLOT_COLS)
     
     # Monitored Satellite Tracks
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SAT_TRACKS"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SAT-X"],CorrIdx["SAT-Y"],CorrIdx["SAT-Z"],CorrIdx["ELEV"],CorrIdx["FLAG"]])
-
         print( 'Plot Monitored Satellites Tracks vs Time ...')
       
         # Configure plot and call plot generation function
@@ -851,13 +850,9 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_LTC"] == 1):
         # Read the cols we need from SatFile file
-        SatData = read_csv(SatFile, delim_whitespace=True, skiprows=1, header=None,\
+        SatData = read_csv(SatFile, sep=r"\s+", skiprows=1, header=None,\
         usecols=[SatIdx["SOD"],SatIdx["LTC-X"],SatIdx["LTC-Y"],SatIdx["LTC-Z"],SatIdx["LTC-B"],SatIdx["FC"]])
 
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SOD"],CorrIdx["ENTtoGPS"],CorrIdx["FLAG"]])
-
         print( 'Plot LTC corrections vs Time ...')
       
         # Configure plot and call plot generation function
@@ -866,10 +861,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # ENT-GPS Offset
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_ENT_GPS"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SOD"],CorrIdx["ENTtoGPS"],CorrIdx["FLAG"]])
-
         print( 'Plot ENT-GPS Offset vs Time ...')
       
         # Configure plot and call plot generation function
@@ -878,10 +869,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma FLT
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_FLT"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SFLT"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma FLT vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -890,10 +877,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # UIVD
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_UIVD"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SOD"],CorrIdx["ELEV"],CorrIdx["UISD"],CorrIdx["FLAG"]])
-
         print( 'Plot UIVD vs Time ...')
       
         # Configure plot and call plot generation function
@@ -902,10 +885,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # UISD
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_UISD"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["IPPLON"],CorrIdx["IPPLAT"],CorrIdx["UISD"],CorrIdx["FLAG"]])
-
         print( 'Plot UISD vs Time ...')
       
         # Configure plot and call plot generation function
@@ -914,10 +893,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma UIRE
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_UIRE"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SUIRE"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma UIRE vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -926,10 +901,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # STD
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_STD"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["IPPLON"],CorrIdx["IPPLAT"],CorrIdx["STD"],CorrIdx["FLAG"]])
-
         print( 'Plot STD vs Time ...')
       
         # Configure plot and call plot generation function
@@ -938,10 +909,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma TROPO
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_TROPO"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["STROPO"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma TROPO vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -950,10 +917,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma Multipath
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_MULTI"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SMP"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma Multipath vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -962,10 +925,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma Noise + Divergence
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_NOISE"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SNOISEDIV"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma Noise + Divergence vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -974,10 +933,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma AIR
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_AIR"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SAIR"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma Airborne vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -986,10 +941,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma UERE
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_UERE"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["ELEV"],CorrIdx["SUERE"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma UERE vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -998,10 +949,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Receiver Clock
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_RCVR_CLK"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SOD"],CorrIdx["RCVR-CLK"],CorrIdx["FLAG"]])
-
         print( 'Plot Receiver Clock vs Time ...')
       
         # Configure plot and call plot generation function
@@ -1010,10 +957,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Residuals
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_RES"] == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["SOD"],CorrIdx["PRN"],CorrIdx["PSR-RES"],CorrIdx["FLAG"]])
-
         print( 'Plot Pseudo-Range Residuals vs Time ...')
       
         # Configure plot and call plot generation function
@@ -1022,10 +965,6 @@ def generateCorrPlots(CorrFile, SatFile, RcvrInfo):
     # Sigma UERE Statistics
     # ----------------------------------------------------------
     if(ConfCorr["PLOT_SIGMA_UERE_STATS"]  == 1):
-        # Read the cols we need from CorrFile file
-        CorrData = read_csv(CorrFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[CorrIdx["PRN"],CorrIdx["SUERE"],CorrIdx["FLAG"]])
-
         print( 'Plot Sigma UERE Statistics ...')
       
         # Configure plot and call plot generation function
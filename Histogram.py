@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/Histogram.py:
+# This is the Histogram Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           Histogram.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys
+import numpy as np
+from math import floor
+from statistics import NormalDist
+
+# Histogram internal parameters
+#-----------------------------------------------------------------------
+# Initial upper limit of the regular bins [m]. The bins are extended
+# when a larger value is added, so that no sample is left out
+HIST_INI_MAX = 100.0
+
+# Histogram main functions
+#-----------------------------------------------------------------------
+# A histogram is a dictionary with the counts of fixed resolution bins
+# covering [0, NBins*Res), preallocated in a NumPy array:
+#   Hist["Counts"][0]: underflow bin (values below 0)
+#   Hist["Counts"][1:]: regular bins, bin i covering [i*Res, (i+1)*Res)
+# The regular bins grow by doubling to cover the largest sample, so that
+# the histogram has no upper limit and its size does not depend on the
+# number of samples
+
+def initHist(Res, Max=HIST_INI_MAX):
+
+    # Purpose: initialize an empty histogram
+
+    # Parameters
+    # ==========
+    # Res: float
+    #      Bin resolution
+    # Max: float
+    #      Initial upper limit of the regular bins
+
+    # Returns
+    # =======
+    # Hist: dict
+    #       Histogram
+
+    NBins = max(int(np.ceil(Max / Res)), 1)
+
+    Hist = {
+        "Res": Res,                                     # Bin resolution
+        "NBins": NBins,                                 # Number of regular bins
+        "Counts": np.zeros(NBins + 1, dtype=np.int64),  # Counts per bin
+        "NSamples": 0,                                  # Number of samples
+    } # End of Hist
+
+    return Hist
+
+# End of initHist()
+
+def growHist(Hist, NBins):
+
+    # Purpose: extend the regular bins of the histogram to at least NBins
+    #          bins, doubling them not to extend them at every sample
+
+    if NBins <= Hist["NBins"]:
+        return
+
+    NBins = max(NBins, 2 * Hist["NBins"])
+    Hist["Counts"] = np.concatenate((Hist["Counts"],
+        np.zeros(NBins - Hist["NBins"], dtype=np.int64)))
+    Hist["NBins"] = NBins
+
+# End of growHist()
+
+def addHistValue(Hist, Value):
+
+    # Purpose: add one sample to the histogram
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram
+    # Value: float
+    #        Sample
+
+    # Returns
+    # =======
+    # Nothing
+
+    Idx = floor(Value / Hist["Res"]) + 1 if Value >= 0 else 0
+    growHist(Hist, Idx)
+
+    Hist["Counts"][Idx] += 1
+    Hist["NSamples"] = Hist["NSamples"] + 1
+
+# End of addHistValue()
+
+def addHistValues(Hist, Values):
+
+    # Purpose: add a batch of samples to the histogram
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram
+    # Values: array
+    #         Samples
+
+    # Returns
+    # =======
+    # Nothing
+
+    Values = np.asarray(Values, dtype=np.float64).ravel()
+    if Values.size == 0:
+        return
+
+    Idx = np.maximum(np.floor(Values / Hist["Res"]) + 1, 0).astype(np.int64)
+    growHist(Hist, int(Idx.max()))
+
+    Hist["Counts"] += np.bincount(Idx, minlength=Hist["NBins"] + 1)
+    Hist["NSamples"] = Hist["NSamples"] + Values.size
+
+# End of addHistValues()
+
+def mergeHist(Hist, OtherHist):
+
+    # Purpose: add the samples of another histogram with the same
+    #          resolution
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram to be updated
+    # OtherHist: dict
+    #            Histogram to be added
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Hist["Res"] != OtherHist["Res"]:
+        sys.stderr.write("ERROR: Histograms with different bins cannot be merged\n")
+        sys.exit(-1)
+
+    growHist(Hist, OtherHist["NBins"])
+
+    Hist["Counts"][:OtherHist["NBins"] + 1] += OtherHist["Counts"]
+    Hist["NSamples"] = Hist["NSamples"] + OtherHist["NSamples"]
+
+# End of mergeHist()
+
+def getHistBins(Hist):
+
+    # Purpose: get the non-empty regular bins of the histogram
+
+    # Returns
+    # =======
+    # BinMin: array
+    #         Lower limit of the non-empty bins, sorted
+    # Counts: array
+    #         Number of samples of the non-empty bins
+
+    Counts = Hist["Counts"][1:]
+    Idx = np.flatnonzero(Counts)
+
+    return Idx * Hist["Res"], Counts[Idx]
+
+# End of getHistBins()
+
+def computeHistCdf(Hist, NSamples=None):
+
+    # Purpose: compute the CDF at the upper limit of every bin
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram
+    # NSamples: int
+    #           Number of samples to normalize the CDF (by default, the
+    #           samples in the histogram)
+
+    # Returns
+    # =======
+    # Cdf: array
+    #      CDF of the bins, underflow included
+
+    if NSamples is None:
+        NSamples = Hist["NSamples"]
+
+    return np.cumsum(Hist["Counts"]) / NSamples
+
+# End of computeHistCdf()
+
+def computeHistPercentile(Hist, Percentile, NSamples=None):
+
+    # Purpose: compute a percentile of the histogram samples, as the
+    #          lower limit of the first bin reaching it (as the bins of
+    #          the performances histograms are reported)
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram
+    # Percentile: float
+    #             Percentile [%]
+    # NSamples: int
+    #           Number of samples to normalize the CDF
+
+    # Returns
+    # =======
+    # Value: float
+    #        Percentile value (0.0 if the histogram is empty)
+
+    if Hist["NSamples"] == 0:
+        return 0.0
+
+    Cdf = computeHistCdf(Hist, NSamples)
+    Idx = int(np.searchsorted(Cdf, Percentile / 100.0 - 1e-12))
+
+    # If the samples do not reach the percentile, take the last bin
+    Idx = min(Idx, Hist["NBins"])
+
+    # Bin Idx covers [(Idx - 1)*Res, Idx*Res), the underflow bin is reported as 0
+    return max(Idx - 1, 0) * Hist["Res"]
+
+# End of computeHistPercentile()
+
+def computeHistOverbound(Hist, Threshold, NSamples=None):
+
+    # Purpose: compute the sigma of the zero-mean Gaussian overbounding
+    #          the tails of the absolute values in the histogram, from
+    #          the bin starting at the threshold value on: the maximum
+    #          over the bins of BinMax / Q((1 + Cdf(BinMax))/2), Q being
+    #          the inverse of the standard normal CDF
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       Histogram
+    # Threshold: float
+    #            Lower limit of the tails (lower limit of a bin, as
+    #            computed by computeHistPercentile)
+    # NSamples: int
+    #           Number of samples to normalize the CDF
+
+    # Returns
+    # =======
+    # Sigma: float
+    #        Overbounding sigma (0.0 if the histogram is empty)
+
+    if Hist["NSamples"] == 0:
+        return 0.0
+
+    Cdf = computeHistCdf(Hist, NSamples)[1:]
+    BinMin = np.arange(Hist["NBins"]) * Hist["Res"]
+    BinMax = np.arange(1, Hist["NBins"] + 1) * Hist["Res"]
+
+    # Only the bins in the tails with a finite Gaussian quantile
+    Valid = (BinMin >= Threshold) & (Cdf > 0) & (Cdf < 1) & (Hist["Counts"][1:] > 0)
+    if not Valid.any():
+        return 0.0
+
+    Quantiles = np.array([NormalDist().inv_cdf((1 + P) / 2) for P in Cdf[Valid]])
+
+    return float(np.max(BinMax[Valid] / Quantiles))
+
+# End of computeHistOverbound()
+
+# 2D histograms
+#-----------------------------------------------------------------------
+# A 2D histogram counts the (X, Y) pairs of samples in a grid of fixed
+# resolution square cells covering [0, Max) in both axes, preallocated in
+# a NumPy array. The last row and column are the overflow bins (values
+# above Max), and the negative values are counted in the first bins
+
+def initHist2D(Res, Max):
+
+    # Purpose: initialize an empty 2D histogram
+
+    # Parameters
+    # ==========
+    # Res: float
+    #      Cell resolution
+    # Max: float
+    #      Upper limit of the regular bins in both axes
+
+    # Returns
+    # =======
+    # Hist: dict
+    #       2D histogram
+
+    NBins = int(np.ceil(Max / Res))
+
+    Hist = {
+        "Res": Res,                                                 # Cell resolution
+        "NBins": NBins,                                             # Number of regular bins per axis
+        "Counts": np.zeros((NBins + 1, NBins + 1), dtype=np.int64), # Counts per cell [X, Y]
+        "NSamples": 0,                                              # Number of samples
+    } # End of Hist
+
+    return Hist
+
+# End of initHist2D()
+
+def addHist2DValues(Hist, XValues, YValues):
+
+    # Purpose: add a batch of (X, Y) samples to the 2D histogram
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       2D histogram
+    # XValues: array
+    #          X of the samples
+    # YValues: array
+    #          Y of the samples
+
+    # Returns
+    # =======
+    # Nothing
+
+    XValues = np.asarray(XValues, dtype=np.float64).ravel()
+    YValues = np.asarray(YValues, dtype=np.float64).ravel()
+    if XValues.size == 0:
+        return
+
+    NCells = Hist["NBins"] + 1
+    XIdx = np.clip(np.floor(XValues / Hist["Res"]), 0, Hist["NBins"]).astype(np.int64)
+    YIdx = np.clip(np.floor(YValues / Hist["Res"]), 0, Hist["NBins"]).astype(np.int64)
+
+    Hist["Counts"] += np.bincount(XIdx * NCells + YIdx, \
+        minlength=NCells * NCells).reshape(NCells, NCells)
+    Hist["NSamples"] = Hist["NSamples"] + XValues.size
+
+# End of addHist2DValues()
+
+def mergeHist2D(Hist, OtherHist):
+
+    # Purpose: add the samples of another 2D histogram with the same cells
+
+    # Parameters
+    # ==========
+    # Hist: dict
+    #       2D histogram to be updated
+    # OtherHist: dict
+    #            2D histogram to be added
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Hist["Res"] != OtherHist["Res"] or Hist["NBins"] != OtherHist["NBins"]:
+        sys.stderr.write("ERROR: 2D histograms with different cells cannot be merged\n")
+        sys.exit(-1)
+
+    Hist["Counts"] += OtherHist["Counts"]
+    Hist["NSamples"] = Hist["NSamples"] + OtherHist["NSamples"]
+
+# End of mergeHist2D()
+
+def getHist2DCells(Hist):
+
+    # Purpose: get the non-empty cells of the 2D histogram
+
+    # Returns
+    # =======
+    # XCenter: array
+    #          X of the center of the non-empty cells
+    # YCenter: array
+    #          Y of the center of the non-empty cells
+    # Counts: array
+    #         Number of samples of the non-empty cells
+
+    XIdx, YIdx = np.nonzero(Hist["Counts"])
+
+    return (XIdx + 0.5) * Hist["Res"], (YIdx + 0.5) * Hist["Res"], Hist["Counts"][XIdx, YIdx]
+
+# End of getHist2DCells()
+
+########################################################################
+# END OF HISTOGRAM FUNCTIONS MODULE
+########################################################################
@@ -307,6 +307,33 @@ HistIdx["BINMAX"]=4
 HistIdx["NUMSAM"]=5
 HistIdx["BINFREQ"]=6
 
+# Default values of the optional configuration parameters
+CONF_DEFAULTS = OrderedDict({})
+CONF_DEFAULTS["PREPRO_ENGINE"]="SCALAR"
+CONF_DEFAULTS["CORR_ENGINE"]="SCALAR"
+CONF_DEFAULTS["OUT_FORMAT"]="TXT"
+CONF_DEFAULTS["OUT_FLUSH_EPOCHS"]=60
+CONF_DEFAULTS["SPVT_BATCH"]=1
+CONF_DEFAULTS["PIPELINE"]=0
+CONF_DEFAULTS["PIPE_BATCH_EPOCHS"]=300
+CONF_DEFAULTS["PIPE_MEM_MAX"]=0
+CONF_DEFAULTS["STAGE_CACHE"]=0
+CONF_DEFAULTS["PLOT_JOBS"]=0
+CONF_DEFAULTS["PROFILING"]=0
+CONF_DEFAULTS["READ_AHEAD"]=0
+CONF_DEFAULTS["WRITE_QUEUE"]=0
+
+# Output files extension per format
+OUTPUT_EXT = OrderedDict({})
+OUTPUT_EXT["TXT"]=".dat"
+OUTPUT_EXT["NPZ"]=".npz"
+
+# Number of rows buffered before packing them in typed columns (NPZ format)
+NPZ_PACK_ROWS = 65536
+
+# Output files columns kept in memory, per path
+OutputColumns = OrderedDict({})
+
 # Input functions
 #----------------------------------------------------------------------
 def checkConfParam(Key, Fields, MinFields, MaxFields, LowLim, UppLim):
@@ -884,6 +911,202 @@ def readConf(CfgFile):
                             # Increment number of read parameters
                             NReadParams = NReadParams + 1
 
+                        # Preprocessing engine [SCALAR|VECTOR]
+                        #-----------------------------------------------
+                        # SCALAR: per satellite processing (runPreProcMeas)
+                        # VECTOR: array-backed processing (runPreProcMeasVec)
+                        # Default: SCALAR
+                        #-----------------------------------------------
+                        elif Key== 'PREPRO_ENGINE': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [None], [None])
+
+                            # Check the selected engine
+                            if Conf[Key] not in ["SCALAR", "VECTOR"]:
+                                sys.stderr.write("ERROR: Wrong value for configuration parameter %s\n" % Key)
+                                sys.exit(-1)
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Corrections engine [SCALAR|VECTOR]
+                        #-----------------------------------------------
+                        # SCALAR: per satellite processing (runCorrectMeas)
+                        # VECTOR: array-backed processing (runCorrectMeasVec)
+                        # Default: SCALAR
+                        #-----------------------------------------------
+                        elif Key== 'CORR_ENGINE': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [None], [None])
+
+                            # Check the selected engine
+                            if Conf[Key] not in ["SCALAR", "VECTOR"]:
+                                sys.stderr.write("ERROR: Wrong value for configuration parameter %s\n" % Key)
+                                sys.exit(-1)
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Output files format [TXT|NPZ]
+                        #-----------------------------------------------
+                        # TXT: text files (.dat)
+                        # NPZ: binary columnar NumPy files (.npz), one
+                        #      array per column of the file
+                        # Default: TXT
+                        #-----------------------------------------------
+                        elif Key== 'OUT_FORMAT': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [None], [None])
+
+                            # Check the selected format
+                            if Conf[Key] not in OUTPUT_EXT:
+                                sys.stderr.write("ERROR: Wrong value for configuration parameter %s\n" % Key)
+                                sys.exit(-1)
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of epochs buffered before writing the
+                        # text output files
+                        #-----------------------------------------------
+                        # 0: rows are written only when closing the file
+                        # Default: 60
+                        #-----------------------------------------------
+                        elif Key== 'OUT_FLUSH_EPOCHS': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [Const.S_IN_D])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of epochs solved together by the SPVT
+                        #-----------------------------------------------
+                        # 1: epoch by epoch
+                        # N: batches of N epochs (batched WLSQ solver)
+                        # If NPA is activated, the batched solver is used
+                        # in all cases to share the PA and NPA geometry
+                        # 0: whole day in a single batch
+                        # Default: 1
+                        #-----------------------------------------------
+                        elif Key== 'SPVT_BATCH': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [Const.S_IN_D])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Streaming pipeline activation [0:OFF|1:ON]
+                        #-----------------------------------------------
+                        # 1: each day is processed by batches of epochs
+                        #    through the stages of Pipeline.py
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'PIPELINE': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [1])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of epochs per batch of the pipeline
+                        #-----------------------------------------------
+                        # Default: 300
+                        #-----------------------------------------------
+                        elif Key== 'PIPE_BATCH_EPOCHS': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [1], [Const.S_IN_D])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Memory ceiling of the pipeline: growth of the
+                        # resident memory while processing a receiver
+                        # day [MB]
+                        #-----------------------------------------------
+                        # 0: no ceiling
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'PIPE_MEM_MAX': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [1e6])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Skip the stages whose inputs did not change since
+                        # the previous run [0:OFF|1:ON]
+                        #-----------------------------------------------
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'STAGE_CACHE': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [1])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of processes rendering the plots
+                        #-----------------------------------------------
+                        # 0: plots rendered in the main process
+                        # N: plots queued to a pool of N processes,
+                        #    overlapping with the processing
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'PLOT_JOBS': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [256])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Profiling of the processing stages
+                        #-----------------------------------------------
+                        # 0: OFF
+                        # 1: time of each stage and epoch, written in
+                        #    OUT/PROF/PROF_<RCVR>_YyyDddd.json
+                        # 2: as 1, plus a cProfile dump of each stage
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'PROFILING': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [2])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of epochs of the OBS, SAT and LOS files
+                        # read ahead of the processing
+                        #-----------------------------------------------
+                        # 0: OFF
+                        # N: up to N epochs are read in a background
+                        #    thread while the previous ones are
+                        #    processed (not used with PIPELINE)
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'READ_AHEAD': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [Const.S_IN_D])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
+                        # Number of epochs of PREPRO, CORR and POS outputs
+                        # queued to be written
+                        #-----------------------------------------------
+                        # 0: outputs written in the processing loop
+                        # N: outputs formatted and written in a
+                        #    background thread, the processing waits
+                        #    when N epochs are pending (not used with
+                        #    PIPELINE)
+                        # Default: 0
+                        #-----------------------------------------------
+                        elif Key== 'WRITE_QUEUE': 
+                            # Check parameter and load it in Conf
+                            Conf[Key] = checkConfParam(Key, Fields, 1, 1, [0], [Const.S_IN_D])
+
+                            # Increment number of read parameters
+                            NReadParams = NReadParams + 1
+
                         # Service Level Specific Parameters
                         #------------------------------------------------------------
                         # ON/OFF: Service Level Selection [0:OFF|1:ON]
@@ -996,7 +1219,8 @@ def processConf(Conf):
     # =======
     # Conf: dict
     #       Dictionary containing configuration with
-    #       Julian Days
+    #       Julian Days and the default value of the
+    #       optional parameters not configured
     
     ConfCopy = Conf.copy()
     for Key in ConfCopy:
@@ -1007,6 +1231,11 @@ def processConf(Conf):
             # Compute Julian Day
             Conf[Key + "_JD"] = int(round(convertYearMonthDay2JulianDay(int(ParamSplit[2]), int(ParamSplit[1]), int(ParamSplit[0]))))
 
+    # Set the default value of the optional parameters
+    for Key, Value in CONF_DEFAULTS.items():
+        if Key not in Conf:
+            Conf[Key] = Value
+
     return Conf
 
 def readRcvr(RcvrFile):
@@ -1153,188 +1382,733 @@ def readObsEpoch(f):
 
 # End of readObsEpoch()
 
-def createOutputFile(Path, Hdr):
-    
-    # Purpose: open output file and write its header
-       
+def buildInputDtype(ColIdx):
+
+    # Purpose: build the NumPy record type used to load an input file
+    #          in typed columns
+
     # Parameters
     # ==========
-    # Path: str
-    #       Path to file
-    # Hdr: str
-    #      File header
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
 
     # Returns
     # =======
-    # f: File descriptor
-    #         Descriptor of output file
-    
-    # Display Message
-    print("INFO: Creating file: %s..." % Path)
+    # Dtype: numpy.dtype
+    #        Record type with one field per column, in file order.
+    #        CONST is kept as a one-character string, the rest as float
 
-    # Create output directory, if needed
-    if not os.path.exists(os.path.dirname(Path)):
-        os.makedirs(os.path.dirname(Path))
+    Fields = []
+    for Column in ColIdx:
+        if Column == "CONST":
+            Fields.append((Column, 'U1'))
+        else:
+            Fields.append((Column, 'f8'))
 
-    # Open PREPRO OBS file
-    f = open(Path, 'w')
+    return np.dtype(Fields)
 
-    # Write header
-    f.write(Hdr)
+# End of buildInputDtype()
 
-    return f
+def readObsFile(ObsFile):
 
-# End of createOutputFile()
+    # Purpose: read the whole OBS file in one pass into typed columns
+    #          and build the epoch index
 
-def generatePreproFile(fpreprobs, PreproObsInfo):
+    # Parameters
+    # ==========
+    # ObsFile: str
+    #          Path to OBS file
 
-    # Purpose: generate output file with Preprocessing results
+    # Returns
+    # =======
+    # ObsData: numpy.ndarray
+    #          Record array with one row per line of the OBS file.
+    #          Columns can be accessed by name (ObsData["SOD"]) and
+    #          each row can be indexed as the split lines returned
+    #          by readObsEpoch (ObsData[0][ObsIdx["PRN"]])
+    # EpochIdx: numpy.ndarray
+    #           Epoch index, one row per epoch: [SOD, START, END],
+    #           with START and END the first and last+1 rows of
+    #           the epoch in ObsData
+
+    # Load all the columns of the file in a single pass
+    ObsData = np.loadtxt(ObsFile, dtype=buildInputDtype(ObsIdx),
+    skiprows=1, usecols=range(len(ObsIdx)), ndmin=1)
+
+    return ObsData, buildObsEpochIdx(ObsData)
+
+# End of readObsFile()
+
+def buildObsEpochIdx(ObsData):
+
+    # Purpose: build the epoch index of OBS lines loaded in typed columns
 
     # Parameters
     # ==========
-    # fpreprobs: file descriptor
-    #            Descriptor for PREPRO OBS output file
-    # PreproObsInfo: dict
-    #                Dictionary containing Preprocessing info for the 
-    #                current epoch
+    # ObsData: numpy.ndarray
+    #          Record array with the OBS lines, sorted by SoD
 
     # Returns
     # =======
-    # Nothing
+    # EpochIdx: numpy.ndarray
+    #           Epoch index, one row per epoch: [SOD, START, END],
+    #           with START and END the first and last+1 rows of
+    #           the epoch in ObsData
 
-    # Loop over satellites
-    for SatLabel, SatPreproObs in PreproObsInfo.items():
-        # Prepare outputs
-        Outputs = OrderedDict({})
-        Outputs["SOD"] = SatPreproObs["Sod"]
-        Outputs["DOY"] = SatPreproObs["Doy"]
-        Outputs["CONST"] = SatLabel[0]
-        Outputs["PRN"] = int(SatLabel[1:])
-        Outputs["ELEV"] = SatPreproObs["Elevation"]
-        Outputs["AZIM"] = SatPreproObs["Azimuth"]
-        Outputs["VALID"] = SatPreproObs["ValidL1"]
-        Outputs["REJECT"] = SatPreproObs["RejectionCause"]
-        Outputs["STATUS"] = SatPreproObs["Status"]
-        Outputs["C1"] = SatPreproObs["C1"]
-        Outputs["C1SMOOTHED"] = SatPreproObs["SmoothC1"]
-        Outputs["L1"] = SatPreproObs["L1Meters"]
-        Outputs["S1"] = SatPreproObs["S1"]
-        Outputs["CODE RATE"] = SatPreproObs["RangeRateL1"]
-        Outputs["CODE ACC"] = SatPreproObs["RangeRateStepL1"]
-        Outputs["PHASE RATE"] = SatPreproObs["PhaseRateL1"]
-        Outputs["PHASE ACC"] = SatPreproObs["PhaseRateStepL1"]
-        Outputs["GEOM FREE"] = SatPreproObs["GeomFree"]
-        Outputs["VTEC RATE"] = SatPreproObs["VtecRate"]
-        Outputs["iAATR"] = SatPreproObs["iAATR"]
+    # If there are no lines, return an empty index
+    if len(ObsData) == 0:
+        return np.zeros((0, 3), dtype=int)
 
-        # Write line
-        for i, result in enumerate(Outputs):
-            fpreprobs.write(((PreproFmt[i] + " ") % Outputs[result]))
+    # Get the first row of each epoch, i.e. where the SoD changes
+    Sod = ObsData["SOD"]
+    EpochStart = np.concatenate(([0], np.flatnonzero(Sod[1:] != Sod[:-1]) + 1))
+    EpochEnd = np.append(EpochStart[1:], len(ObsData))
 
-        fpreprobs.write("\n")
+    # Build the epoch index
+    return np.column_stack((Sod[EpochStart].astype(int), EpochStart, EpochEnd))
 
-# End of generatePreproFile
+# End of buildObsEpochIdx()
+
+def readObsChunks(ObsFile, Control):
+
+    # Purpose: read the OBS file by chunks of whole epochs, so that only
+    #          one chunk is kept in memory at a time
 
-def openInputFile(Path):
-    
-    # Purpose: check existence and open input file
-       
     # Parameters
     # ==========
-    # Path: str
-    #       Path to file
+    # ObsFile: str
+    #          Path to OBS file
+    # Control: dict
+    #          Pipeline control: Control["BatchEpochs"] is the number of
+    #          epochs per chunk. It is read before each chunk, so it can
+    #          be changed while iterating
 
     # Returns
     # =======
-    # f: File descriptor
-    #         Descriptor of the input file
+    # ObsData: numpy.ndarray (yielded)
+    #          Record array with the lines of the chunk, as in readObsFile
+    # EpochIdx: numpy.ndarray (yielded)
+    #           Epoch index of the chunk, as in readObsFile
 
-    # Display Message
-    print("INFO: Reading file: %s..." % Path)
-
-    # Try to open the file
-    try:
-        # Open PREPRO OBS file
-        f = open(Path, 'r')
+    Dtype = buildInputDtype(ObsIdx)
 
-        # Read header line
+    with open(ObsFile, 'r') as f:
+        # Skip the header
         f.readline()
 
-    # If file could not be opened
-    except:
-        # Display error
-        sys.stderr.write("ERROR: In input file: %s...\n" % Path)
+        Lines = []
+        NEpochs = 0
+        PrevSod = None
+        for Line in f:
+            # Skip empty lines
+            Fields = Line.split(None, 1)
+            if len(Fields) == 0:
+                continue
 
-    return f
+            # If a new epoch starts
+            if Fields[0] != PrevSod:
+                # Yield the chunk if it is complete
+                if NEpochs >= Control["BatchEpochs"]:
+                    ObsData = np.loadtxt(Lines, dtype=Dtype, usecols=range(len(ObsIdx)), ndmin=1)
+                    yield ObsData, buildObsEpochIdx(ObsData)
+                    Lines = []
+                    NEpochs = 0
 
-# End of openInputFile()
+                NEpochs = NEpochs + 1
+                PrevSod = Fields[0]
 
-def readInputEpoch(f, ColIdx):
+            Lines.append(Line)
+
+        # End of for Line in f:
+
+        # Yield the last chunk
+        if len(Lines) > 0:
+            ObsData = np.loadtxt(Lines, dtype=Dtype, usecols=range(len(ObsIdx)), ndmin=1)
+            yield ObsData, buildObsEpochIdx(ObsData)
+
+# End of readObsChunks()
+
+def readObsEpochs(ObsData, EpochIdx):
+
+    # Purpose: iterate over the epochs of a loaded OBS file
+
+    # Parameters
+    # ==========
+    # ObsData: numpy.ndarray
+    #          OBS file loaded by readObsFile
+    # EpochIdx: numpy.ndarray
+    #           Epoch index built by readObsFile
+
+    # Returns
+    # =======
+    # EpochInfo: numpy.ndarray (yielded)
+    #            View on the rows of ObsData belonging to one epoch
+    #            (all the LoS). No data is copied
+
+    for Sod, Start, End in EpochIdx:
+        yield ObsData[Start:End]
+
+# End of readObsEpochs()
+
+def createOutputFile(Path, Hdr, Fmt, ColIdx, Conf, KeepColumns=False, SaveColumns=False):
     
-    # Purpose: read one epoch of inputs files (SAT and LOS)
+    # Purpose: open output file and write its header
        
     # Parameters
     # ==========
-    # f: file descriptor
-    #         input file
+    # Path: str
+    #       Path to file
+    # Hdr: str
+    #      File header
+    # Fmt: list
+    #      Format of each column of the file
     # ColIdx: dict
     #         Dictionary containing the column index for each parameter
+    # Conf: dict
+    #       Configuration dictionary
+    # KeepColumns: bool
+    #              If True, the rows are also kept in memory in typed
+    #              columns, that readOutputFile will use instead of
+    #              reading the file back
+    # SaveColumns: bool
+    #              If True in TXT format, the rows are also written with
+    #              full precision in NPZ format, in a file with the same
+    #              name and the NPZ extension
 
     # Returns
     # =======
-    # EpochInfo: dict
-    #            dictionary containing the split lines of the file
-    #            EpochInfo["G01"][1] is the second field of the 
-    #            line containing G01 info
-
-    EpochInfo = {}
+    # f: dict
+    #    Output file writer: file descriptor (TXT format) and/or
+    #    column buffers (NPZ format or KeepColumns)
     
-    # Read one line
-    Line = f.readline()
-    if(not Line):
-        return {}, -1
-    LineSplit = splitLine(Line)
-    Sod = LineSplit[ColIdx["SOD"]]
-    SodNext = Sod
+    # Display Message
+    print("INFO: Creating file: %s..." % Path)
 
-    while SodNext == Sod:
-        Label = LineSplit[ColIdx["CONST"]] + "%02d" % int(LineSplit[ColIdx["PRN"]])
-        EpochInfo[Label]=LineSplit
-        Pointer = f.tell()
-        Line = f.readline()
-        LineSplit = splitLine(Line)
-        try: 
-            SodNext = LineSplit[ColIdx["SOD"]]
+    # Create output directory, if needed
+    os.makedirs(os.path.dirname(Path) or '.', exist_ok=True)
+
+    f = {
+        "Format": Conf["OUT_FORMAT"],           # Output format
+        "Path": Path,                           # Path to file
+        "Fmt": Fmt,                             # Format of each column
+        "ColIdx": ColIdx,                       # Column index
+        "File": None,                           # File descriptor (TXT format)
+        "LineFmt": "".join(ColFmt + " " for ColFmt in Fmt[:len(ColIdx)]) + "\n",
+                                                # Line format (TXT format)
+        "Rows": [],                             # Values of the rows not yet written (TXT format)
+        "NRows": 0,                             # Number of rows not yet written (TXT format)
+        "NEpochs": 0,                           # Number of epochs not yet written (TXT format)
+        "FlushEpochs": Conf["OUT_FLUSH_EPOCHS"],# Number of epochs between flushes (TXT format)
+        "Keep": (Conf["OUT_FORMAT"] != "TXT") or KeepColumns or SaveColumns,
+                                                # Rows are kept in typed columns
+        "KeepColumns": KeepColumns,             # Columns are kept in memory on close
+        "SaveColumns": SaveColumns,             # Columns are written in NPZ format (TXT format)
+        "Columns": [[] for Col in ColIdx],      # Rows not yet packed in typed columns
+        "Chunks": [],                           # Packed columns
+        "Epoch": 0,                             # Index of the current epoch, among the ones with rows
+        "EpochRows": 0,                         # Number of rows of the current epoch
+        "Decim": 1,                             # One epoch out of Decim kept in the columns (KeepColumns)
+        "Epochs": [],                           # Epoch of the rows not yet packed (KeepColumns)
+        "ChunkEpochs": [],                      # Epoch of the rows of the packed columns (KeepColumns)
+    } # End of f
+
+    # If text format
+    if f["Format"] == "TXT":
+        # Open output file
+        f["File"] = open(Path, 'w')
+
+        # Write header
+        f["File"].write(Hdr)
 
-        except:
-            return EpochInfo, -1
+    return f
 
-    f.seek(Pointer)
+# End of createOutputFile()
 
-    return EpochInfo, int(Sod)
+def getFmtDtype(Fmt):
 
-# End of readInputEpoch()
+    # Purpose: get the NumPy type of a column from its output format
 
-def readCorrectInputs(fsat, flos, CurrentSod):
-    
-    # Purpose: read SAT and LOS info for current epoch
-       
     # Parameters
     # ==========
-    # fsat: File descriptor
-    #       Descriptor of the SAT input file
-    # flos: File descriptor
-    #       Descriptor of the LOS input file
-    # CurrentSod: int
-    #             Current epoch's SoD
+    # Fmt: str
+    #      Format of the column (e.g. "%8.3f")
 
     # Returns
     # =======
-    # SatInfo: dict
-    #          dictionary containing the split lines of the SAT file
-    #          SatInfo["G01"][1] is the second field of the line
-    #          containing G01 info
-    # LosInfo: dict
+    # Dtype: type
+    #        int, str or float
+
+    if Fmt.endswith("d"):
+        return np.int64
+
+    elif Fmt.endswith("s"):
+        return str
+
+    return np.float64
+
+# End of getFmtDtype()
+
+def packOutputColumns(f):
+
+    # Purpose: pack the rows buffered in an NPZ output file writer
+    #          into typed column arrays
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    if len(f["Columns"][0]) > 0:
+        f["Chunks"].append([np.array(Column, dtype=getFmtDtype(f["Fmt"][i])) \
+            for i, Column in enumerate(f["Columns"])])
+        f["Columns"] = [[] for Col in f["ColIdx"]]
+
+        if f["KeepColumns"]:
+            f["ChunkEpochs"].append(np.array(f["Epochs"], dtype=np.int64))
+            f["Epochs"] = []
+
+# End of packOutputColumns()
+
+def flushOutputRows(f):
+
+    # Purpose: format all the rows buffered in a TXT output file writer
+    #          with a single formatting operation and write them
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    if f["NRows"] > 0:
+        f["File"].write((f["LineFmt"] * f["NRows"]) % tuple(f["Rows"]))
+        f["Rows"] = []
+        f["NRows"] = 0
+
+    f["NEpochs"] = 0
+
+# End of flushOutputRows()
+
+def writeOutputLine(f, Values):
+
+    # Purpose: write one line (row) in an output file
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+    # Values: list
+    #         Values of the line in column order
+
+    # Returns
+    # =======
+    # Nothing
+
+    # If text format
+    if f["Format"] == "TXT":
+        # Buffer the values of the line
+        f["Rows"].extend(Values)
+        f["NRows"] = f["NRows"] + 1
+
+    f["EpochRows"] = f["EpochRows"] + 1
+
+    # If binary columnar format or columns kept in memory, unless the
+    # epoch is not kept for the plots
+    if f["Keep"] and f["Epoch"] % f["Decim"] == 0:
+        # Buffer the values of the line
+        for i, Value in enumerate(Values):
+            f["Columns"][i].append(Value)
+
+        if f["KeepColumns"]:
+            f["Epochs"].append(f["Epoch"])
+
+        # Pack the buffered rows in typed columns from time to time
+        if len(f["Columns"][0]) >= NPZ_PACK_ROWS:
+            packOutputColumns(f)
+
+# End of writeOutputLine()
+
+def endOutputEpoch(f):
+
+    # Purpose: notify the end of an epoch to an output file writer, so
+    #          that the buffered rows are written according to the
+    #          configured flush policy (OUT_FLUSH_EPOCHS)
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Count the epochs with rows
+    if f["EpochRows"] > 0:
+        f["Epoch"] = f["Epoch"] + 1
+        f["EpochRows"] = 0
+
+    # If text format
+    if f["Format"] == "TXT":
+        f["NEpochs"] = f["NEpochs"] + 1
+
+        # Flush every OUT_FLUSH_EPOCHS epochs (0: only at close)
+        if f["FlushEpochs"] > 0 and f["NEpochs"] >= f["FlushEpochs"]:
+            flushOutputRows(f)
+
+# End of endOutputEpoch()
+
+def closeOutputFile(f):
+
+    # Purpose: close an output file. In NPZ format, the file is
+    #          written at this point with one array per column, named
+    #          after the keys of the column index
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    # If text format
+    if f["Format"] == "TXT":
+        # Write the remaining rows
+        flushOutputRows(f)
+
+        f["File"].close()
+
+    # If binary columnar format or columns kept in memory
+    if f["Keep"]:
+        # Pack the remaining rows
+        packOutputColumns(f)
+
+        # Build the columns
+        Columns = OrderedDict({})
+        for i, Name in enumerate(f["ColIdx"]):
+            if len(f["Chunks"]) > 0:
+                Columns[Name] = np.concatenate([Chunk[i] for Chunk in f["Chunks"]])
+            else:
+                Columns[Name] = np.array([], dtype=getFmtDtype(f["Fmt"][i]))
+
+        f["Chunks"] = []
+
+        # If binary columnar format, write the file (or its NPZ version)
+        if f["Format"] == "NPZ" or f["SaveColumns"]:
+            with open(os.path.splitext(f["Path"])[0] + OUTPUT_EXT["NPZ"], 'wb') as fnpz:
+                np.savez(fnpz, **Columns)
+
+        # Keep the columns in memory for readOutputFile
+        if f["KeepColumns"]:
+            OutputColumns[f["Path"]] = Columns
+
+# End of closeOutputFile()
+
+def dropOutputColumns(f):
+
+    # Purpose: stop keeping in memory the columns of a TXT output file
+    #          writer, unless they are also written in NPZ format. The
+    #          file will be read back from disk instead
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    if f["Format"] == "TXT" and f["Keep"] and not f["SaveColumns"]:
+        f["Keep"] = False
+        f["KeepColumns"] = False
+        f["Columns"] = [[] for Col in f["ColIdx"]]
+        f["Chunks"] = []
+        f["Epochs"] = []
+        f["ChunkEpochs"] = []
+
+# End of dropOutputColumns()
+
+def decimateOutputColumns(f):
+
+    # Purpose: halve the columns kept in memory for the plots by a TXT
+    #          output file writer (unless they are also written in NPZ
+    #          format): only one epoch out of twice as many is kept, from
+    #          now on and in the rows already kept. The plots are
+    #          generated from the reduced columns
+
+    # Parameters
+    # ==========
+    # f: dict
+    #    Output file writer
+
+    # Returns
+    # =======
+    # Nothing
+
+    if f["Format"] == "TXT" and f["KeepColumns"] and not f["SaveColumns"]:
+        packOutputColumns(f)
+        f["Decim"] = 2 * f["Decim"]
+
+        for i, Epochs in enumerate(f["ChunkEpochs"]):
+            Kept = Epochs % f["Decim"] == 0
+            f["Chunks"][i] = [Column[Kept] for Column in f["Chunks"][i]]
+            f["ChunkEpochs"][i] = Epochs[Kept]
+
+# End of decimateOutputColumns()
+
+def releaseOutputColumns(Path):
+
+    # Purpose: release the columns of an output file kept in memory
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+
+    # Returns
+    # =======
+    # Nothing
+
+    OutputColumns.pop(Path, None)
+
+# End of releaseOutputColumns()
+
+def readOutputFile(Path, ColIdx, UseCols, Fmt=None):
+
+    # Purpose: read some columns of an output file, in text or NPZ format
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file (.npz extension for NPZ format)
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+    # UseCols: list
+    #          Index of the columns to read
+    # Fmt: list
+    #      Format of each column, to read the text files with explicit
+    #      types instead of guessing them
+
+    # Returns
+    # =======
+    # Data: pandas.DataFrame
+    #       Columns read, labelled with their column index as in
+    #       read_csv(..., header=None, usecols=UseCols)
+
+    from pandas import DataFrame, read_csv
+
+    # If the columns have been kept in memory
+    if Path in OutputColumns:
+        Names = list(ColIdx.keys())
+        return DataFrame(OrderedDict((Col, OutputColumns[Path][Names[Col]]) for Col in sorted(UseCols)))
+
+    # If binary columnar format
+    if Path.endswith(OUTPUT_EXT["NPZ"]):
+        Names = list(ColIdx.keys())
+        with np.load(Path) as Data:
+            return DataFrame(OrderedDict((Col, Data[Names[Col]]) for Col in sorted(UseCols)))
+
+    # Otherwise, text format
+    Dtype = None
+    if Fmt is not None:
+        Dtype = OrderedDict((Col, getFmtDtype(Fmt[Col])) for Col in UseCols)
+
+    return read_csv(Path, sep=r"\s+", skiprows=1, header=None, usecols=UseCols, dtype=Dtype)
+
+# End of readOutputFile()
+
+def readPlotsData(Path, ColIdx, Fmt, ConfPlots, PlotCols):
+
+    # Purpose: read once the columns of an output file needed by all the
+    #          activated plots
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+    # Fmt: list
+    #      Format of each column
+    # ConfPlots: dict
+    #            Plots configuration flags
+    # PlotCols: dict
+    #           Columns needed per plot configuration flag
+
+    # Returns
+    # =======
+    # Data: pandas.DataFrame
+    #       Columns read, labelled with their column index (None if no
+    #       plot is activated)
+
+    UseCols = set()
+    for Flag, Cols in PlotCols.items():
+        if ConfPlots[Flag] == 1:
+            UseCols.update(ColIdx[Col] for Col in Cols)
+
+    if len(UseCols) == 0:
+        return None
+
+    return readOutputFile(Path, ColIdx, sorted(UseCols), Fmt)
+
+# End of readPlotsData()
+
+def generatePreproFile(fpreprobs, PreproObsInfo):
+
+    # Purpose: generate output file with Preprocessing results
+
+    # Parameters
+    # ==========
+    # fpreprobs: dict
+    #            Descriptor for PREPRO OBS output file
+    # PreproObsInfo: dict
+    #                Dictionary containing Preprocessing info for the 
+    #                current epoch
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Loop over satellites
+    for SatLabel, SatPreproObs in PreproObsInfo.items():
+        # Prepare outputs
+        Outputs = OrderedDict({})
+        Outputs["SOD"] = SatPreproObs["Sod"]
+        Outputs["DOY"] = SatPreproObs["Doy"]
+        Outputs["CONST"] = SatLabel[0]
+        Outputs["PRN"] = int(SatLabel[1:])
+        Outputs["ELEV"] = SatPreproObs["Elevation"]
+        Outputs["AZIM"] = SatPreproObs["Azimuth"]
+        Outputs["VALID"] = SatPreproObs["ValidL1"]
+        Outputs["REJECT"] = SatPreproObs["RejectionCause"]
+        Outputs["STATUS"] = SatPreproObs["Status"]
+        Outputs["C1"] = SatPreproObs["C1"]
+        Outputs["C1SMOOTHED"] = SatPreproObs["SmoothC1"]
+        Outputs["L1"] = SatPreproObs["L1Meters"]
+        Outputs["S1"] = SatPreproObs["S1"]
+        Outputs["CODE RATE"] = SatPreproObs["RangeRateL1"]
+        Outputs["CODE ACC"] = SatPreproObs["RangeRateStepL1"]
+        Outputs["PHASE RATE"] = SatPreproObs["PhaseRateL1"]
+        Outputs["PHASE ACC"] = SatPreproObs["PhaseRateStepL1"]
+        Outputs["GEOM FREE"] = SatPreproObs["GeomFree"]
+        Outputs["VTEC RATE"] = SatPreproObs["VtecRate"]
+        Outputs["iAATR"] = SatPreproObs["iAATR"]
+
+        # Write line
+        writeOutputLine(fpreprobs, list(Outputs.values()))
+
+# End of generatePreproFile
+
+def openInputFile(Path):
+    
+    # Purpose: check existence and open input file
+       
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+
+    # Returns
+    # =======
+    # f: File descriptor
+    #         Descriptor of the input file
+
+    # Display Message
+    print("INFO: Reading file: %s..." % Path)
+
+    # Try to open the file
+    try:
+        # Open PREPRO OBS file
+        f = open(Path, 'r')
+
+        # Read header line
+        f.readline()
+
+    # If file could not be opened
+    except:
+        # Display error
+        sys.stderr.write("ERROR: In input file: %s...\n" % Path)
+
+    return f
+
+# End of openInputFile()
+
+def readInputEpoch(f, ColIdx):
+    
+    # Purpose: read one epoch of inputs files (SAT and LOS)
+       
+    # Parameters
+    # ==========
+    # f: file descriptor
+    #         input file
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+
+    # Returns
+    # =======
+    # EpochInfo: dict
+    #            dictionary containing the split lines of the file
+    #            EpochInfo["G01"][1] is the second field of the 
+    #            line containing G01 info
+
+    EpochInfo = {}
+    
+    # Read one line
+    Line = f.readline()
+    if(not Line):
+        return {}, -1
+    LineSplit = splitLine(Line)
+    Sod = LineSplit[ColIdx["SOD"]]
+    SodNext = Sod
+
+    while SodNext == Sod:
+        Label = LineSplit[ColIdx["CONST"]] + "%02d" % int(LineSplit[ColIdx["PRN"]])
+        EpochInfo[Label]=LineSplit
+        Pointer = f.tell()
+        Line = f.readline()
+        LineSplit = splitLine(Line)
+        try: 
+            SodNext = LineSplit[ColIdx["SOD"]]
+
+        except:
+            return EpochInfo, -1
+
+    f.seek(Pointer)
+
+    return EpochInfo, int(Sod)
+
+# End of readInputEpoch()
+
+def readCorrectInputs(fsat, flos, CurrentSod):
+    
+    # Purpose: read SAT and LOS info for current epoch
+       
+    # Parameters
+    # ==========
+    # fsat: File descriptor
+    #       Descriptor of the SAT input file
+    # flos: File descriptor
+    #       Descriptor of the LOS input file
+    # CurrentSod: int
+    #             Current epoch's SoD
+
+    # Returns
+    # =======
+    # SatInfo: dict
+    #          dictionary containing the split lines of the SAT file
+    #          SatInfo["G01"][1] is the second field of the line
+    #          containing G01 info
+    # LosInfo: dict
     #          dictionary containing the split lines of the LOS file
     #          SatInfo["G01"][1] is the second field of the line
     #          containing G01 info
@@ -1407,13 +2181,317 @@ def readCorrectInputs(fsat, flos, CurrentSod):
 
 # End of readCorrectInputs()
 
+def buildInputIndex(Path, ColIdx):
+
+    # Purpose: build the epoch index of an input file (SAT and LOS)
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+
+    # Returns
+    # =======
+    # Index: numpy.ndarray
+    #        Epoch index, one row per epoch: [SOD, OFFSET, NBYTES, NROWS],
+    #        with OFFSET the position in bytes of the first line of the
+    #        epoch, NBYTES the length in bytes of its lines and NROWS
+    #        the number of lines
+
+    Index = []
+    PrevSod = None
+
+    # Open the file in binary mode to get the byte offsets
+    with open(Path, 'rb') as f:
+        # Skip header line
+        Offset = len(f.readline())
+
+        # Loop over the lines of the file
+        for Line in f:
+            LineSplit = Line.split()
+
+            # Skip blank and comment lines
+            if LineSplit and not Line.startswith(b'#'):
+                Sod = int(float(LineSplit[ColIdx["SOD"]]))
+
+                # If a new epoch starts
+                if Sod != PrevSod:
+                    Index.append([Sod, Offset, 0, 0])
+                    PrevSod = Sod
+
+                # Count the line in the current epoch
+                Index[-1][3] = Index[-1][3] + 1
+
+            # Move to the next line
+            Offset = Offset + len(Line)
+            if Index:
+                Index[-1][2] = Offset - Index[-1][1]
+
+        # End of for Line in f:
+
+    return np.array(Index, dtype=np.int64).reshape(-1, 4)
+
+# End of buildInputIndex()
+
+def openIndexedInputFile(Path, ColIdx):
+
+    # Purpose: open an input file (SAT and LOS) for random access by SoD.
+    #          The epoch index is built on first open and persisted in a
+    #          sidecar file (Path + ".idx"), which is reused while it is
+    #          newer than the input file
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+
+    # Returns
+    # =======
+    # Input: dict
+    #        Indexed input file: file descriptor, record type and
+    #        epoch index (SoD -> [OFFSET, NBYTES, NROWS])
+
+    # Display Message
+    print("INFO: Reading file: %s..." % Path)
+
+    # Check existence of the file
+    if not os.path.isfile(Path):
+        sys.stderr.write("ERROR: In input file: %s...\n" % Path)
+        sys.exit(-1)
+
+    IdxPath = Path + ".idx"
+    Index = None
+
+    # Try to reuse the index of a previous run
+    if os.path.isfile(IdxPath) and \
+        os.path.getmtime(IdxPath) >= os.path.getmtime(Path):
+        try:
+            with open(IdxPath, 'rb') as fidx:
+                Index = np.load(fidx)
+
+            # Check the index covers the file
+            if len(Index) > 0 and \
+                Index[-1, 1] + Index[-1, 2] > os.path.getsize(Path):
+                Index = None
+
+        except:
+            Index = None
+
+    # Otherwise, build the index and persist it
+    if Index is None:
+        Index = buildInputIndex(Path, ColIdx)
+        try:
+            with open(IdxPath, 'wb') as fidx:
+                np.save(fidx, Index)
+
+        except:
+            sys.stderr.write("WARNING: Index of input file %s could not be saved\n" % Path)
+
+    Input = {
+        "Path": Path,                                   # Path to file
+        "File": open(Path, 'rb'),                       # File descriptor
+        "Dtype": buildInputDtype(ColIdx),               # Record type
+        "NCols": len(ColIdx),                           # Number of columns
+        "Index": dict((int(Row[0]), Row[1:].tolist()) for Row in Index),
+                                                        # Epoch index
+        "LastSod": int(Index[-1, 0]) if len(Index) > 0 else -1,
+                                                        # Last SoD in file
+    } # End of Input
+
+    return Input
+
+# End of openIndexedInputFile()
+
+def closeIndexedInputFile(Input):
+
+    # Purpose: close an input file opened with openIndexedInputFile
+
+    # Parameters
+    # ==========
+    # Input: dict
+    #        Indexed input file
+
+    # Returns
+    # =======
+    # Nothing
+
+    Input["File"].close()
+
+# End of closeIndexedInputFile()
+
+def readIndexedEpoch(Input, Sod):
+
+    # Purpose: read one epoch of an indexed input file (SAT and LOS)
+
+    # Parameters
+    # ==========
+    # Input: dict
+    #        Indexed input file
+    # Sod: int
+    #      SoD of the epoch to read
+
+    # Returns
+    # =======
+    # EpochData: numpy.ndarray
+    #            Record array with the lines of the epoch, empty if
+    #            the SoD is not in the file
+
+    # If the epoch is not in the file, return an empty array
+    if Sod not in Input["Index"]:
+        return np.zeros(0, dtype=Input["Dtype"])
+
+    # Read the lines of the epoch in one go
+    Offset, NBytes, NRows = Input["Index"][Sod]
+    Input["File"].seek(Offset)
+    Lines = Input["File"].read(NBytes).decode().splitlines()
+
+    return np.loadtxt(Lines, dtype=Input["Dtype"],
+    usecols=range(Input["NCols"]), ndmin=1)
+
+# End of readIndexedEpoch()
+
+def indexEpochByLabel(EpochData, ColIdx):
+
+    # Purpose: index the lines of one epoch by satellite label
+
+    # Parameters
+    # ==========
+    # EpochData: numpy.ndarray
+    #            Record array with the lines of the epoch
+    # ColIdx: dict
+    #         Dictionary containing the column index for each parameter
+
+    # Returns
+    # =======
+    # EpochInfo: dict
+    #            dictionary containing the lines of the epoch
+    #            EpochInfo["G01"][1] is the second field of the 
+    #            line containing G01 info
+
+    EpochInfo = {}
+    for Row in EpochData:
+        Label = Row[ColIdx["CONST"]] + "%02d" % int(Row[ColIdx["PRN"]])
+        EpochInfo[Label] = Row
+
+    return EpochInfo
+
+# End of indexEpochByLabel()
+
+def readIndexedCorrectEpochs(SatInput, LosInput, CurrentSod):
+
+    # Purpose: read SAT and LOS info for current epoch from the
+    #          indexed input files, without checking it (see
+    #          checkCorrectInputs)
+
+    # Parameters
+    # ==========
+    # SatInput: dict
+    #           Indexed SAT input file
+    # LosInput: dict
+    #           Indexed LOS input file
+    # CurrentSod: int
+    #             Current epoch's SoD
+
+    # Returns
+    # =======
+    # SatData: numpy.ndarray
+    #          Record array with the lines of the SAT file for the epoch
+    #          (empty in case of data gap, None if the file ended before
+    #          the epoch)
+    # LosData: numpy.ndarray
+    #          Record array with the lines of the LOS file for the epoch
+    #          (empty in case of data gap, None if the file ended before
+    #          the epoch)
+
+    # Loop over SAT and LOS files
+    Outputs = []
+    for Input in [SatInput, LosInput]:
+        # If file ended, nothing to read
+        if CurrentSod > Input["LastSod"]:
+            Outputs.append(None)
+
+        # Read the epoch
+        else:
+            Outputs.append(readIndexedEpoch(Input, CurrentSod))
+
+    return Outputs[0], Outputs[1]
+
+# End of readIndexedCorrectEpochs()
+
+def checkCorrectInputs(SatData, LosData, CurrentSod):
+
+    # Purpose: check SAT and LOS info read for current epoch: stop if
+    #          a file ended and warn the user about the data gaps
+
+    # Parameters
+    # ==========
+    # SatData: numpy.ndarray
+    #          SAT info of the epoch, as read by readIndexedCorrectEpochs
+    # LosData: numpy.ndarray
+    #          LOS info of the epoch, as read by readIndexedCorrectEpochs
+    # CurrentSod: int
+    #             Current epoch's SoD
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Loop over SAT and LOS files
+    for EpochData, Label in [(SatData, "SAT"), (LosData, "LOS")]:
+        # If file ended, raise error
+        if EpochData is None:
+            sys.stderr.write("ERROR: %s file ended before SoD %s\n" % (Label, CurrentSod))
+            sys.exit(-1)
+
+        # If current SoD was not found in file, warn the user
+        if len(EpochData) == 0:
+            sys.stderr.write("WARNING: Data gap at SoD %d in %s file\n" % (CurrentSod, Label))
+
+    # End of for EpochData, Label in [(SatData, "SAT"), (LosData, "LOS")]:
+
+# End of checkCorrectInputs()
+
+def readIndexedCorrectInputs(SatInput, LosInput, CurrentSod):
+
+    # Purpose: read SAT and LOS info for current epoch from the
+    #          indexed input files
+
+    # Parameters
+    # ==========
+    # SatInput: dict
+    #           Indexed SAT input file
+    # LosInput: dict
+    #           Indexed LOS input file
+    # CurrentSod: int
+    #             Current epoch's SoD
+
+    # Returns
+    # =======
+    # SatData: numpy.ndarray
+    #          Record array with the lines of the SAT file for the epoch
+    #          (empty in case of data gap)
+    # LosData: numpy.ndarray
+    #          Record array with the lines of the LOS file for the epoch
+    #          (empty in case of data gap)
+
+    SatData, LosData = readIndexedCorrectEpochs(SatInput, LosInput, CurrentSod)
+    checkCorrectInputs(SatData, LosData, CurrentSod)
+
+    return SatData, LosData
+
+# End of readIndexedCorrectInputs()
+
 def generateCorrFile(fcorr, CorrInfo):
 
     # Purpose: generate output file with Corrected results
 
     # Parameters
     # ==========
-    # fcorr: file descriptor
+    # fcorr: dict
     #        Descriptor for CORR output file
     # CorrInfo: dict
     #           Dictionary containing Corrected info for the 
@@ -1456,10 +2534,7 @@ def generateCorrFile(fcorr, CorrInfo):
         Outputs["ENTtoGPS"] = SatCorr["EntGps"]
 
         # Write line
-        for i, result in enumerate(Outputs):
-            fcorr.write(((CorrFmt[i] + " ") % Outputs[result]))
-
-        fcorr.write("\n")
+        writeOutputLine(fcorr, list(Outputs.values()))
 
 # End of generateCorrFile
 
@@ -1469,7 +2544,7 @@ def generatePosFile(fpos, PosInfo, Rcvr):
 
     # Parameters
     # ==========
-    # fpos: file descriptor
+    # fpos: dict
     #       Descriptor for POS output file
     # PosInfo: dict
     #          Dictionary containing Pos info for Rcvr in the 
@@ -1506,10 +2581,7 @@ def generatePosFile(fpos, PosInfo, Rcvr):
     Outputs["TDOP"] = PosInfo["Tdop"]
 
     # Write line
-    for i, result in enumerate(Outputs):
-        fpos.write(((PosFmt[i] + " ") % Outputs[result]))
-
-    fpos.write("\n")
+    writeOutputLine(fpos, list(Outputs.values()))
 
 # End of generatePosFile
 
@@ -1519,7 +2591,7 @@ def generatePerfFile(fperf, PerfInfoSer):
 
     # Parameters
     # ==========
-    # fperf: file descriptor
+    # fperf: dict
     #        Descriptor for Performances output file
     # PerfInfoSer: dict
     #              Dictionary containing Performances info for Rcvr 
@@ -1563,10 +2635,7 @@ def generatePerfFile(fperf, PerfInfoSer):
     Outputs["VDOPMAX"] = PerfInfoSer["VdopMax"]
 
     # Write line
-    for i, result in enumerate(Outputs):
-        fperf.write(((PerfFmt[i] + " ") % Outputs[result]))
-
-    fperf.write("\n")
+    writeOutputLine(fperf, list(Outputs.values()))
 
 # End of generatePerfFile
 
@@ -1576,7 +2645,7 @@ def generateHistFile(fhist, VpeHistInfo):
 
     # Parameters
     # ==========
-    # fhist: file descriptor
+    # fhist: dict
     #        Descriptor for VPE Histogram output file
     # VpeHistInfoSer: dict
     #                 Dictionary containing VPE Histogram info for LPV200 service level
@@ -1596,9 +2665,127 @@ def generateHistFile(fhist, VpeHistInfo):
     Outputs["BINFREQ"] = VpeHistInfo["BinFreq"]
 
     # Write line
-    for i, result in enumerate(Outputs):
-        fhist.write(((HistFmt[i] + " ") % Outputs[result]))
+    writeOutputLine(fhist, list(Outputs.values()))
+
+# End of generateHistFile
+
+def writePerfSummary(Path, PerfInfo):
+
+    # Purpose: write the performances summaries of all the service levels
+    #          of a receiver and day in NPZ format, with one array per
+    #          service level and field, named SERVICE/Field
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+    # PerfInfo: dict
+    #           Dictionary containing performances information per service level,
+    #           with the summary computed by computeFinalPerf
+
+    # Returns
+    # =======
+    # Nothing
+
+    Arrays = OrderedDict({})
+    for Service, PerfInfoSer in PerfInfo.items():
+        for Field, Value in PerfInfoSer["Summary"].items():
+            # Histograms: one array per histogram field
+            if isinstance(Value, dict):
+                for HistField, HistValue in Value.items():
+                    Arrays["%s/%s/%s" % (Service, Field, HistField)] = np.asarray(HistValue)
+            else:
+                Arrays["%s/%s" % (Service, Field)] = np.asarray(Value)
+
+    with open(Path, 'wb') as fnpz:
+        np.savez(fnpz, **Arrays)
+
+# End of writePerfSummary()
+
+def readPerfSummary(Path):
+
+    # Purpose: read the performances summaries written by writePerfSummary
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+
+    # Returns
+    # =======
+    # Summaries: dict
+    #            Performances summary per service level
+
+    Summaries = OrderedDict({})
+
+    with np.load(Path) as Arrays:
+        for Name in Arrays.files:
+            Keys = Name.split('/')
+            Summary = Summaries.setdefault(Keys[0], OrderedDict({}))
+            Value = Arrays[Name]
+            if Value.ndim == 0:
+                Value = Value.item()
+
+            # Histogram field
+            if len(Keys) == 3:
+                Summary.setdefault(Keys[1], {})[Keys[2]] = Value
+            else:
+                Summary[Keys[1]] = Value
+
+    return Summaries
+
+# End of readPerfSummary()
+
+def writeHist2D(Path, Hists):
+
+    # Purpose: write several 2D histograms in compressed NPZ format, with
+    #          one array per histogram and field, named NAME/Field
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+    # Hists: dict
+    #        2D histogram per name
+
+    # Returns
+    # =======
+    # Nothing
+
+    Arrays = OrderedDict({})
+    for Name, Hist in Hists.items():
+        for Field, Value in Hist.items():
+            Arrays["%s/%s" % (Name, Field)] = np.asarray(Value)
+
+    with open(Path, 'wb') as fnpz:
+        np.savez_compressed(fnpz, **Arrays)
+
+# End of writeHist2D()
+
+def readHist2D(Path):
+
+    # Purpose: read the 2D histograms written by writeHist2D
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to file
+
+    # Returns
+    # =======
+    # Hists: dict
+    #        2D histogram per name
+
+    Hists = OrderedDict({})
+
+    with np.load(Path) as Arrays:
+        for Key in Arrays.files:
+            Name, Field = Key.split('/')
+            Value = Arrays[Key]
+            if Value.ndim == 0:
+                Value = Value.item()
+            Hists.setdefault(Name, {})[Field] = Value
 
-    fhist.write("\n")
+    return Hists
 
-# End of generateHistFile
\ No newline at end of file
+# End of readHist2D()
@@ -21,7 +21,6 @@
 #----------------------------------------------------------------------
 import sys, os
 
-from scipy import stats
 # Add path to find all modules
 Common = os.path.dirname(os.path.dirname(
     os.path.abspath(sys.argv[0]))) + '/COMMON'
@@ -29,27 +28,107 @@ sys.path.insert(0, Common)
 from InputOutput import RcvrIdx
 from COMMON import Stats, GnssConstants
 from math import sqrt
-from collections import OrderedDict
+from collections import OrderedDict, deque
+import numpy as np
 from InputOutput import generateHistFile
+from Histogram import initHist, addHistValue, addHistValues, getHistBins, mergeHist
+from Histogram import computeHistPercentile, computeHistOverbound
 
 # Performances internal functions
 #-----------------------------------------------------------------------
 
+def initContBuff(CInt):
+
+    # Purpose: initialize a continuity buffer covering the last CInt epochs.
+    #          Only the epochs where the service was available are stored,
+    #          by their position in the sequence of epochs pushed to the
+    #          buffer, so that the number of available epochs in the window
+    #          is kept as a running count
+
+    # Parameters
+    # ==========
+    # CInt: int
+    #       Continuity interval [epochs]
+
+    # Returns
+    # =======
+    # ContBuff: dict
+    #           Continuity buffer
+
+    ContBuff = {
+        "Len": int(CInt),   # Length of the window [epochs]
+        "Pos": 0,           # Position of the last epoch pushed
+        "Avail": deque(),   # Positions of the available epochs in the window
+    } # End of ContBuff
+
+    return ContBuff
+
+# End of initContBuff
+
 def updateBuff(ContBuff, Status, Epochs):
 
-    # Function updating the continuity buffer per epoch
+    # Function updating the continuity buffer with Epochs epochs of the
+    # same status. The cost does not depend on the number of epochs, which
+    # may be a whole data gap
+
+    Epochs = int(Epochs)
+    if Epochs <= 0:
+        return
 
-    for Epoch in range(int(Epochs)):
-        ContBuff.pop(0)
-        ContBuff.append(Status)
+    ContBuff["Pos"] = ContBuff["Pos"] + Epochs
+
+    # Only the last Len epochs may be available
+    if Status == 1:
+        if Epochs >= ContBuff["Len"]:
+            ContBuff["Avail"].clear()
+        for Pos in range(max(ContBuff["Pos"] - Epochs, ContBuff["Pos"] - ContBuff["Len"]) + 1, \
+            ContBuff["Pos"] + 1):
+            ContBuff["Avail"].append(Pos)
+
+    # Drop the available epochs which left the window
+    Oldest = ContBuff["Pos"] - ContBuff["Len"]
+    while len(ContBuff["Avail"]) > 0 and ContBuff["Avail"][0] <= Oldest:
+        ContBuff["Avail"].popleft()
 
 # End of updateBuff
 
+def sumBuff(ContBuff):
+
+    # Function returning the number of available epochs in the continuity
+    # buffer
+
+    return len(ContBuff["Avail"])
+
+# End of sumBuff
+
+def resetBuff(ContBuff):
+
+    # Function resetting the continuity buffer to non-available epochs
+
+    ContBuff["Avail"].clear()
+
+# End of resetBuff
+
+# Performances summary identification: receiver, day and service level
+PERF_SUM_IDS = ["Rcvr", "Lon", "Lat", "Year", "Doy", "Service"]
+
+# Service level thresholds, to be the same in the merged summaries
+PERF_SUM_THRESHOLDS = ["Hal", "Val", "Cint"]
+
+# Mergeable performances information, per merge operation
+PERF_SUM_FIELDS = OrderedDict({})
+PERF_SUM_FIELDS["SUM"] = ["SamSol", "SamNoSol", "Avail", "NotAvail", "ContEvent", \
+    "HpeRms", "VpeRms", "Nmi", "Nhmi"]
+PERF_SUM_FIELDS["MIN"] = ["NsvMin", "HplMin", "VplMin"]
+PERF_SUM_FIELDS["MAX"] = ["NsvMax", "HplMax", "VplMax", "HsiMax", "VsiMax", \
+    "HpeMax", "VpeMax", "PdopMax", "HdopMax", "VdopMax"]
+PERF_SUM_FIELDS["HIST"] = ["HpeHist", "VpeHist"]
+
 # ----------------------------------------------------------------------
 # Performances main functions
 #-----------------------------------------------------------------------
 
-def initializePerfInfo(Conf, Services, Rcvr, RcvrInfo, Doy, PerfInfo, VpeHistInfo):
+def initializePerfInfo(Conf, Services, Rcvr, RcvrInfo, Year, Doy, PerfInfo, VpeHistInfo):
 
     # Purpose: Initialize PerInfo for a given receiver for all activated service levels
     #          Initialize LPV200 VpeHistInfo for a given receiver
@@ -64,6 +143,8 @@ def initializePerfInfo(Conf, Services, Rcvr, RcvrInfo, Doy, PerfInfo, VpeHistInf
     #       Receiver acronym
     # RcvrInfo: list
     #           List containing receiver information: position, masking angle...
+    # Year: int
+    #       Year
     # Doy: int
     #      Day of the year
     # PerInfo: dict
@@ -88,13 +169,17 @@ def initializePerfInfo(Conf, Services, Rcvr, RcvrInfo, Doy, PerfInfo, VpeHistInf
                 "Rcvr": Rcvr,                                       # Receiver acronym
                 "Lon": float(RcvrInfo[RcvrIdx["LON"]]),             # Receiver reference longitude
                 "Lat": float(RcvrInfo[RcvrIdx["LAT"]]),             # Receiver reference latitude
+                "Year": Year,                                       # Year
                 "Doy": Doy,                                         # Day of year
                 "Service": Service,                                 # Service level
+                "Hal": float(Conf[Service][Idx["HAL"]]),            # Horizontal Alert Limit
+                "Val": float(Conf[Service][Idx["VAL"]]),            # Vertical Alert Limit
+                "Cint": float(Conf[Service][Idx["CINT"]]),          # Continuity risk interval
                 "SamSol": 86400 // int(Conf["SAMPLING_RATE"]),      # Number of total samples processed
                 "SamNoSol": 86400 // int(Conf["SAMPLING_RATE"]),    # Number of samples with no SBAS solution
                 "Avail": 0,                                         # Availability percentage
                 "ContRisk": 0.0,                                    # Continuity risk
-                "ContBuff": [0] * int(Conf[Service][Idx["CINT"]]),  # Continuity risk buffer
+                "ContBuff": initContBuff(Conf[Service][Idx["CINT"]]), # Continuity risk buffer
                 "PrevStatus": 0,                                    # Previous availability status
                 "PrevSod": 0.0,                                     # Previous computed epoch
                 "ContEvent": 0,                                     # Number of discontinuity events                                 
@@ -104,9 +189,9 @@ def initializePerfInfo(Conf, Services, Rcvr, RcvrInfo, Doy, PerfInfo, VpeHistInf
                 "HpeRms": 0.0,                                      # HPE RMS
                 "VpeRms": 0.0,                                      # VPE RMS
                 "Hpe95": 0.0,                                       # HPE 95% percentile
-                "HpeHist": {},                                      # HPE Histogram
+                "HpeHist": initHist(GnssConstants.HIST_RES),        # HPE Histogram
                 "Vpe95": 0.0,                                       # VPE 95% percentile
-                "VpeHist": {},                                      # VPE Histogram                       
+                "VpeHist": initHist(GnssConstants.HIST_RES),        # VPE Histogram
                 "HpeMax": 0.0,                                      # Maximum HPE
                 "VpeMax": 0.0,                                      # Maximum VPE
                 "ExtVpe": 0.0,                                      # Extrapolated VPE
@@ -169,7 +254,6 @@ def updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer):
     # Nothing
 
     # Initialize internal variables
-    HistRes = GnssConstants.HIST_RES
     AvailStatus = 0
     Idx = {"FLAG": 0, "HAL": 1, "VAL": 2, "HPE95": 3, "VPE95": 4, "VPE1E7": 5, "AVAI": 6, "CONT": 7, "CINT": 8}
     
@@ -235,9 +319,9 @@ def updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer):
             # Update HPE and VPE histograms 
             # ---------------------------------------------------------------------- 
             # Update HPE95 histogram
-            Stats.updateHist(PerfInfoSer["HpeHist"], abs(PosInfo["Hpe"]), HistRes)
+            addHistValue(PerfInfoSer["HpeHist"], abs(PosInfo["Hpe"]))
             # Update VPE95 histogram
-            Stats.updateHist(PerfInfoSer["VpeHist"], abs(PosInfo["Vpe"]), HistRes)
+            addHistValue(PerfInfoSer["VpeHist"], abs(PosInfo["Vpe"]))
 
             # Update maximum HPE and VPE values
             # ----------------------------------------------------------------------
@@ -268,17 +352,17 @@ def updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer):
     # ---------------------------------------------------------------------- 
     # Update number of discontinuity events if jump from available to non-available status detected
     if AvailStatus == 0 and PerfInfoSer["PrevStatus"] == 1:
-        PerfInfoSer["ContEvent"] = PerfInfoSer["ContEvent"] + sum(PerfInfoSer["ContBuff"])
+        PerfInfoSer["ContEvent"] = PerfInfoSer["ContEvent"] + sumBuff(PerfInfoSer["ContBuff"])
     # Update number of discontinuity events if data gap in performances information detected
     gap = PosInfo["Sod"] - PerfInfoSer["PrevSod"]
     if PerfInfoSer["PrevSod"] != 0.0 and gap > int(Conf["SAMPLING_RATE"]):
-        PerfInfoSer["ContEvent"] = PerfInfoSer["ContEvent"] + sum(PerfInfoSer["ContBuff"])
+        PerfInfoSer["ContEvent"] = PerfInfoSer["ContEvent"] + sumBuff(PerfInfoSer["ContBuff"])
         # Include gap in the continuity buffer if the Hatch Filter has not been reset
         if gap < int(Conf["HATCH_GAP_TH"]):
             updateBuff(PerfInfoSer["ContBuff"], 0, gap)
         # Reset the continuity buffer if the Hatch Filter has been reset
         elif gap >= int(Conf["HATCH_GAP_TH"]):
-            PerfInfoSer["ContBuff"] = [0] * int(Conf[Service][Idx["CINT"]])
+            resetBuff(PerfInfoSer["ContBuff"])
     
     # Update continuity buffer with current availability status
     updateBuff(PerfInfoSer["ContBuff"], AvailStatus, 1)
@@ -288,6 +372,140 @@ def updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer):
 
 # End of updatePerfEpoch:
 
+def updatePerfEpochs(Conf, Service, PosData, PerfInfoSer):
+
+    # Purpose: Update PerfInfo for a sequence of epochs and a service level,
+    #          all of them together. The result is the same as calling
+    #          updatePerfEpoch for every epoch in order
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration information dictionary
+    # Service: str
+    #          Selected service level
+    # PosData: dict
+    #          Position information of the epochs, one array per PosInfo
+    #          field: Sod, Sol, NumSatSol, Hpe, Vpe, Hpl, Vpl, Hsi, Vsi,
+    #          Pdop, Hdop and Vdop
+    # PerfInfoSer: dict
+    #              Dictionary containing performances information per service level
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Initialize internal variables
+    Idx = {"FLAG": 0, "HAL": 1, "VAL": 2, "HPE95": 3, "VPE95": 4, "VPE1E7": 5, "AVAI": 6, "CONT": 7, "CINT": 8}
+    Sod = np.asarray(PosData["Sod"], dtype=np.float64)
+    NEpochs = len(Sod)
+
+    if NEpochs == 0:
+        return
+
+    Hpe = np.asarray(PosData["Hpe"], dtype=np.float64)
+    Vpe = np.asarray(PosData["Vpe"], dtype=np.float64)
+    Hpl = np.asarray(PosData["Hpl"], dtype=np.float64)
+    Vpl = np.asarray(PosData["Vpl"], dtype=np.float64)
+    Hsi = np.asarray(PosData["Hsi"], dtype=np.float64)
+    Vsi = np.asarray(PosData["Vsi"], dtype=np.float64)
+    AvailStatus = np.zeros(NEpochs, dtype=np.int64)
+
+    # Epochs where SBAS solution has been achieved
+    Sol = np.asarray(PosData["Sol"]) != 0
+
+    if Sol.any():
+        # Update total number of samples with no SBAS solution
+        # ----------------------------------------------------------------------
+        PerfInfoSer["SamNoSol"] = PerfInfoSer["SamNoSol"] - int(Sol.sum())
+
+        # Update number of satellites, HPL, VPL, HSI, VSI and DOPS
+        # ----------------------------------------------------------------------
+        for Field, Values in [("Nsv", PosData["NumSatSol"]), ("Hpl", Hpl), ("Vpl", Vpl)]:
+            Values = np.asarray(Values)[Sol]
+            PerfInfoSer[Field + "Min"] = Stats.updateMin(PerfInfoSer[Field + "Min"], Values.min().item())
+            PerfInfoSer[Field + "Max"] = Stats.updateMax(PerfInfoSer[Field + "Max"], Values.max().item())
+
+        for Field, Values in [("Hsi", np.abs(Hsi)), ("Vsi", np.abs(Vsi)), \
+            ("Pdop", PosData["Pdop"]), ("Hdop", PosData["Hdop"]), ("Vdop", PosData["Vdop"])]:
+            Values = np.asarray(Values)[Sol]
+            PerfInfoSer[Field + "Max"] = Stats.updateMax(PerfInfoSer[Field + "Max"], Values.max().item())
+
+        # Update availability
+        # ----------------------------------------------------------------------
+        HRatio = Hpl / Conf[Service][Idx["HAL"]]
+        VRatio = Vpl / Conf[Service][Idx["VAL"]]
+        NotAvail = Sol & ((HRatio > 1) | (VRatio > 1))
+        Avail = Sol & ~NotAvail & (HRatio < 1) & (VRatio < 1)
+        AvailStatus[Avail] = 1
+        PerfInfoSer["NotAvail"] = PerfInfoSer["NotAvail"] + int(NotAvail.sum())
+        PerfInfoSer["Avail"] = PerfInfoSer["Avail"] + int(Avail.sum())
+
+        if Avail.any():
+            # Update HPE and VPE RMS, adding the epochs in order
+            # ----------------------------------------------------------------------
+            PerfInfoSer["HpeRms"] = float(np.cumsum(np.append(PerfInfoSer["HpeRms"], Hpe[Avail]*Hpe[Avail]))[-1])
+            PerfInfoSer["VpeRms"] = float(np.cumsum(np.append(PerfInfoSer["VpeRms"], Vpe[Avail]*Vpe[Avail]))[-1])
+
+            # Update HPE and VPE histograms
+            # ----------------------------------------------------------------------
+            addHistValues(PerfInfoSer["HpeHist"], np.abs(Hpe[Avail]))
+            addHistValues(PerfInfoSer["VpeHist"], np.abs(Vpe[Avail]))
+
+            # Update maximum HPE and VPE values
+            # ----------------------------------------------------------------------
+            PerfInfoSer["HpeMax"] = Stats.updateMax(PerfInfoSer["HpeMax"], Hpe[Avail].max().item())
+            PerfInfoSer["VpeMax"] = Stats.updateMax(PerfInfoSer["VpeMax"], Vpe[Avail].max().item())
+
+            # Update misleading information events
+            # ----------------------------------------------------------------------
+            Si = Avail & ((Hsi >= 1) | (np.abs(Vsi) >= 1))
+            InBounds = (Hpe < Conf[Service][Idx["HAL"]]) & (np.abs(Vpe) < Conf[Service][Idx["VAL"]])
+            OutBounds = (Hpe >= Conf[Service][Idx["HAL"]]) | (np.abs(Vpe) >= Conf[Service][Idx["VAL"]])
+            PerfInfoSer["Nmi"] = PerfInfoSer["Nmi"] + int((Si & InBounds).sum())
+            PerfInfoSer["Nhmi"] = PerfInfoSer["Nhmi"] + int((Si & ~InBounds & OutBounds).sum())
+
+        # End of if Avail.any():
+
+    # End of if Sol.any():
+
+    # Update continuity risk
+    # ----------------------------------------------------------------------
+    # Every epoch pushed to the continuity buffer gets a position, counting
+    # the gaps included in the buffer. A reset of the buffer is equivalent
+    # to pushing a whole window of non-available epochs
+    ContBuff = PerfInfoSer["ContBuff"]
+    PrevSod = np.append(PerfInfoSer["PrevSod"], Sod[:-1])
+    PrevStatus = np.append(PerfInfoSer["PrevStatus"], AvailStatus[:-1])
+    Gap = Sod - PrevSod
+    GapEvent = (PrevSod != 0.0) & (Gap > int(Conf["SAMPLING_RATE"]))
+    Push = np.ones(NEpochs, dtype=np.int64)
+    InGap = GapEvent & (Gap < int(Conf["HATCH_GAP_TH"]))
+    Push[InGap] = Push[InGap] + np.trunc(Gap[InGap]).astype(np.int64)
+    Push[GapEvent & ~InGap] = Push[GapEvent & ~InGap] + ContBuff["Len"]
+    Pos = ContBuff["Pos"] + np.cumsum(Push)
+    PrevPos = Pos - Push
+
+    # Number of available epochs in the buffer before every epoch is pushed
+    AvailPos = np.append(np.array(ContBuff["Avail"], dtype=np.int64), Pos[AvailStatus == 1])
+    BuffSum = np.searchsorted(AvailPos, PrevPos, side="right") - \
+        np.searchsorted(AvailPos, PrevPos - ContBuff["Len"], side="right")
+
+    # Update number of discontinuity events at every jump from available
+    # to non-available status and at every data gap
+    Events = ((AvailStatus == 0) & (PrevStatus == 1)).astype(np.int64) + GapEvent
+    PerfInfoSer["ContEvent"] = PerfInfoSer["ContEvent"] + int(np.sum(BuffSum * Events))
+
+    # Update continuity buffer with the last epochs
+    ContBuff["Pos"] = int(Pos[-1])
+    ContBuff["Avail"] = deque(AvailPos[AvailPos > Pos[-1] - ContBuff["Len"]].tolist())
+
+    # Update previous availabilty status and previous computed epoch
+    PerfInfoSer["PrevStatus"] = int(AvailStatus[-1])
+    PerfInfoSer["PrevSod"] = Sod[-1].item()
+
+# End of updatePerfEpochs:
+
 def computeFinalPerf(PerfInfoSer):
 
     # Purpose: Compute final PerfInfo per service level
@@ -301,6 +519,10 @@ def computeFinalPerf(PerfInfoSer):
     # =======
     # Nothing
 
+    # Keep the mergeable performances information
+    # ----------------------------------------------------------------------
+    PerfInfoSer["Summary"] = buildPerfSummary(PerfInfoSer)
+
     # Compute final number of non-available samples
     # ----------------------------------------------------------------------
     PerfInfoSer["NotAvail"] = PerfInfoSer["NotAvail"] + PerfInfoSer["SamNoSol"]
@@ -318,16 +540,14 @@ def computeFinalPerf(PerfInfoSer):
         # Compute final HPE95 and VPE95 values
         # ----------------------------------------------------------------------
         # Compute final HPE95
-        Cdf, Sigmas = Stats.computeCdfFromHistogram(PerfInfoSer["HpeHist"], PerfInfoSer["Avail"])
-        PerfInfoSer["Hpe95"] = Stats.computePercentile(Cdf, 95)
+        PerfInfoSer["Hpe95"] = computeHistPercentile(PerfInfoSer["HpeHist"], 95, PerfInfoSer["Avail"])
         # Compute final VPE95
-        Cdf, Sigmas = Stats.computeCdfFromHistogram(PerfInfoSer["VpeHist"], PerfInfoSer["Avail"])
-        PerfInfoSer["Vpe95"] = Stats.computePercentile(Cdf, 95)
+        PerfInfoSer["Vpe95"] = computeHistPercentile(PerfInfoSer["VpeHist"], 95, PerfInfoSer["Avail"])
     
         # Compute final extrapolated VPE value
         # ----------------------------------------------------------------------
-        ThresholdBin = Stats.computePercentile(Cdf, 60)
-        PerfInfoSer["ExtVpe"] = 5.33 * Stats.computeOverbound(Sigmas, ThresholdBin)
+        ThresholdBin = computeHistPercentile(PerfInfoSer["VpeHist"], 60, PerfInfoSer["Avail"])
+        PerfInfoSer["ExtVpe"] = 5.33 * computeHistOverbound(PerfInfoSer["VpeHist"], ThresholdBin, PerfInfoSer["Avail"])
     
         # Compute continuity risk
         # ----------------------------------------------------------------------
@@ -370,28 +590,123 @@ def computeVpeHist(fhist, PerfLPV200, VpeHistInfo):
     # =======
     # Nothing
 
-    # Initialize internal variables
-    BinId = 0
-    HistRes = GnssConstants.HIST_RES
-
-    # Sort LPV200 VPE histogram
-    SortedHist = OrderedDict({})
-    for key in sorted(PerfLPV200["VpeHist"].keys()):
-        SortedHist[key] = PerfLPV200["VpeHist"][key]
+    # Get the non-empty bins of LPV200 VPE histogram, sorted
+    HistRes = PerfLPV200["VpeHist"]["Res"]
+    BinMin, BinNumSam = getHistBins(PerfLPV200["VpeHist"])
 
     # Loop over the bins in VpeHist
-    for Bin, Samples in SortedHist.items():
+    for BinId in range(len(BinMin)):
         # Compute VPE histogram statistics
         VpeHistInfo["BinId"] = BinId
-        VpeHistInfo["BinNumSam"] = Samples
+        VpeHistInfo["BinNumSam"] = int(BinNumSam[BinId])
         VpeHistInfo["BinFreq"] = VpeHistInfo["BinNumSam"]/(PerfLPV200["SamSol"] - PerfLPV200["NotAvail"])
-        VpeHistInfo["BinMin"] = Bin
-        VpeHistInfo["BinMax"] = (Bin//HistRes + 1) * HistRes
-        # Update Bin ID
-        BinId = BinId + 1
+        VpeHistInfo["BinMin"] = float(BinMin[BinId])
+        VpeHistInfo["BinMax"] = VpeHistInfo["BinMin"] + HistRes
         # Generate output file
         generateHistFile(fhist, VpeHistInfo)
 
-    # End of for(Bin, Samples in SortedHist.items()):
+    # End of for BinId in range(len(BinMin)):
 
 # End of computeVpeHist:
+
+def buildPerfSummary(PerfInfoSer):
+
+    # Purpose: Build the mergeable performances summary of a service level,
+    #          before the final performances are computed: number of
+    #          samples, RMS sums, min/max values, histograms and
+    #          continuity events
+
+    # Parameters
+    # ==========
+    # PerfInfoSer: dict
+    #              Dictionary containing performances information per service level
+
+    # Returns
+    # =======
+    # Summary: dict
+    #          Performances summary
+
+    Summary = OrderedDict({})
+    for Field in PERF_SUM_IDS + PERF_SUM_THRESHOLDS:
+        Summary[Field] = PerfInfoSer[Field]
+
+    for Fields in PERF_SUM_FIELDS.values():
+        for Field in Fields:
+            Summary[Field] = PerfInfoSer[Field]
+
+    return Summary
+
+# End of buildPerfSummary:
+
+def mergePerfSummary(Summary, OtherSummary):
+
+    # Purpose: Add the performances summary of another receiver or day
+    #          of the same service level, computed with the same thresholds
+
+    # Parameters
+    # ==========
+    # Summary: dict
+    #          Performances summary to be updated
+    # OtherSummary: dict
+    #               Performances summary to be added
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Summary["Service"] != OtherSummary["Service"]:
+        sys.stderr.write("ERROR: Performances of different service levels cannot be merged\n")
+        sys.exit(-1)
+
+    for Field in PERF_SUM_THRESHOLDS:
+        if Summary[Field] != OtherSummary[Field]:
+            sys.stderr.write("ERROR: Performances of service level %s computed with different %s (%g and %g) cannot be merged\n" % \
+                (Summary["Service"], Field.upper(), Summary[Field], OtherSummary[Field]))
+            sys.exit(-1)
+
+    for Field in PERF_SUM_FIELDS["SUM"]:
+        Summary[Field] = Summary[Field] + OtherSummary[Field]
+
+    for Field in PERF_SUM_FIELDS["MIN"]:
+        Summary[Field] = Stats.updateMin(Summary[Field], OtherSummary[Field])
+
+    for Field in PERF_SUM_FIELDS["MAX"]:
+        Summary[Field] = Stats.updateMax(Summary[Field], OtherSummary[Field])
+
+    for Field in PERF_SUM_FIELDS["HIST"]:
+        mergeHist(Summary[Field], OtherSummary[Field])
+
+# End of mergePerfSummary:
+
+def initPerfFromSummary(Summary):
+
+    # Purpose: Build the performances information of a service level from
+    #          a (merged) performances summary, so that the final
+    #          performances can be computed with computeFinalPerf
+
+    # Parameters
+    # ==========
+    # Summary: dict
+    #          Performances summary
+
+    # Returns
+    # =======
+    # PerfInfoSer: dict
+    #              Dictionary containing performances information per service level
+
+    PerfInfoSer = OrderedDict({})
+    for Field, Value in Summary.items():
+        PerfInfoSer[Field] = Value
+
+    # Copy the histograms, since the summary may be merged again
+    for Field in PERF_SUM_FIELDS["HIST"]:
+        PerfInfoSer[Field] = dict(Summary[Field])
+        PerfInfoSer[Field]["Counts"] = Summary[Field]["Counts"].copy()
+
+    # Final performances
+    for Field in ["ContRisk", "Hpe95", "Vpe95", "ExtVpe"]:
+        PerfInfoSer[Field] = 0.0
+
+    return PerfInfoSer
+
+# End of initPerfFromSummary:
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+########################################################################
+# PerfMerge.py:
+# This is the Performances Merging Module of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           PerfMerge.py
+#  Date(YY/MM/DD): 01/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   PerfMerge.py $OUT_FILE RCVR|DOY|ALL $PERF_SUM_FILE [$PERF_SUM_FILE ...]
+#
+#   Merges the performances summaries (PERF_SUM_*.npz files written by
+#   Petrus.py) of different receivers and/or days, computed with the same
+#   service level thresholds, and writes the resulting performances in
+#   PERF format:
+#     RCVR: one line per receiver and service level (e.g. receiver-month)
+#     DOY:  one line per day and service level, all receivers together
+#           (network-day)
+#     ALL:  one line per service level, all receivers and days together
+#           (e.g. network-month)
+#   The receiver acronym of the merged receivers is NET, with their mean
+#   position, and the day of the merged days is 0
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys
+from collections import OrderedDict
+from InputOutput import CONF_DEFAULTS
+from InputOutput import createOutputFile, closeOutputFile
+from InputOutput import readPerfSummary
+from InputOutput import generatePerfFile
+from InputOutput import PerfHdr, PerfFmt, PerfIdx
+from Perf import PERF_SUM_IDS, PERF_SUM_THRESHOLDS
+from Perf import mergePerfSummary, initPerfFromSummary, computeFinalPerf
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Merging modes
+MERGE_MODES = ["RCVR", "DOY", "ALL"]
+
+def displayUsage():
+    sys.stderr.write("ERROR: Please provide the output file, the merging mode and the summary files\n")
+    sys.stderr.write("Usage: PerfMerge.py $OUT_FILE RCVR|DOY|ALL $PERF_SUM_FILE [$PERF_SUM_FILE ...]\n")
+
+def getMergeKey(Summary, Mode):
+
+    # Purpose: get the group of a performances summary in a merging mode
+
+    if Mode == "RCVR":
+        return (Summary["Rcvr"], Summary["Service"])
+
+    elif Mode == "DOY":
+        return (Summary["Year"], Summary["Doy"], Summary["Service"])
+
+    return (Summary["Service"],)
+
+# End of getMergeKey()
+
+def mergePerfSummaries(SumFiles, Mode):
+
+    # Purpose: merge the performances summaries of several files
+
+    # Parameters
+    # ==========
+    # SumFiles: list
+    #           Paths to the performances summary files
+    # Mode: str
+    #       Merging mode (RCVR, DOY or ALL)
+
+    # Returns
+    # =======
+    # Merged: dict
+    #         Merged performances summary per group, in order of appearance
+    # Positions: dict
+    #            Receiver positions (Lon, Lat) per group and receiver
+
+    Merged = OrderedDict({})
+    Positions = OrderedDict({})
+    Sources = OrderedDict({})
+
+    for SumFile in SumFiles:
+        for Service, Summary in readPerfSummary(SumFile).items():
+            # Summaries written by former versions cannot be checked
+            Missing = [Field for Field in PERF_SUM_IDS + PERF_SUM_THRESHOLDS if Field not in Summary]
+            if len(Missing) > 0:
+                sys.stderr.write("ERROR: Fields %s missing in performances summary file %s. Please run PETRUS again\n" % \
+                    (", ".join(Missing), SumFile))
+                sys.exit(-1)
+
+            # Each receiver day is merged once
+            Source = (Summary["Rcvr"], Summary["Year"], Summary["Doy"], Service)
+            if Source in Sources:
+                sys.stderr.write("ERROR: Performances of receiver %s, year %d, day %d and service level %s in both %s and %s\n" % \
+                    (Source + (Sources[Source], SumFile)))
+                sys.exit(-1)
+            Sources[Source] = SumFile
+
+            Key = getMergeKey(Summary, Mode)
+
+            if Key not in Merged:
+                Merged[Key] = Summary
+                Positions[Key] = OrderedDict({})
+            else:
+                mergePerfSummary(Merged[Key], Summary)
+
+            Positions[Key][Summary["Rcvr"]] = (Summary["Lon"], Summary["Lat"])
+
+        # End of for Service, Summary in readPerfSummary(SumFile).items():
+
+    # End of for SumFile in SumFiles:
+
+    # Label the merged receivers and days
+    for Key, Summary in Merged.items():
+        if len(Positions[Key]) > 1:
+            Summary["Rcvr"] = "NET"
+            Summary["Lon"] = sum(Pos[0] for Pos in Positions[Key].values()) / len(Positions[Key])
+            Summary["Lat"] = sum(Pos[1] for Pos in Positions[Key].values()) / len(Positions[Key])
+
+        if Mode != "DOY":
+            Summary["Doy"] = 0
+
+    return Merged, Positions
+
+# End of mergePerfSummaries()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    # Check the arguments
+    if len(sys.argv) < 4 or sys.argv[2] not in MERGE_MODES:
+        displayUsage()
+        sys.exit()
+
+    OutFile = sys.argv[1]
+    Mode = sys.argv[2]
+    SumFiles = sys.argv[3:]
+
+    # Merge the performances summaries, each file once
+    SumFiles = list(OrderedDict.fromkeys(SumFiles))
+    Merged, Positions = mergePerfSummaries(SumFiles, Mode)
+
+    # Compute the final performances and write them
+    fperf = createOutputFile(OutFile, PerfHdr, PerfFmt, PerfIdx, CONF_DEFAULTS)
+
+    for Key, Summary in Merged.items():
+        PerfInfoSer = initPerfFromSummary(Summary)
+        computeFinalPerf(PerfInfoSer)
+        generatePerfFile(fperf, PerfInfoSer)
+
+    closeOutputFile(fperf)
+
+    print("INFO: %d summaries merged in %d performances lines: %s" % \
+        (len(SumFiles), len(Merged), OutFile))
+
+#######################################################
+# End of PerfMerge.py
+#######################################################
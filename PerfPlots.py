@@ -18,12 +18,12 @@
 ########################################################################
 
 import sys, os
-from pandas import read_csv
+from InputOutput import readOutputFile
 from pandas import DataFrame
 sys.path.append(os.getcwd() + '/' + \
     os.path.dirname(sys.argv[0]) + '/' + 'COMMON')
 from COMMON import GnssConstants
-from COMMON.Plots import generatePlot
+from PlotQueue import queuePlot
 from InputOutput import HistIdx, PerfIdx
 from ConPlots import ConfPerf
 import numpy as np
@@ -104,8 +104,8 @@ def plotAvailability(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Avail
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot continuity risk map
 def plotContRisk(Service, PerfFilesList, PerfData):
@@ -150,8 +150,8 @@ def plotContRisk(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Cont
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot HPE 95% map
 def plotHPE95(Service, PerfFilesList, PerfData):
@@ -195,8 +195,8 @@ def plotHPE95(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Hpe95
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot VPE 95% map
 def plotVPE95(Service, PerfFilesList, PerfData):
@@ -240,8 +240,8 @@ def plotVPE95(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Vpe95
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot extrapolated VPE map
 def plotExtVPE(Service, PerfFilesList, PerfData):
@@ -285,8 +285,8 @@ def plotExtVPE(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = ExtVpe
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum HSI map
 def plotMaxHSI(Service, PerfFilesList, PerfData):
@@ -330,8 +330,8 @@ def plotMaxHSI(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Hsi
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum VSI map
 def plotMaxVSI(Service, PerfFilesList, PerfData):
@@ -375,8 +375,8 @@ def plotMaxVSI(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Vsi
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot minimum HPL map
 def plotMinHPL(Service, PerfFilesList, PerfData):
@@ -420,8 +420,8 @@ def plotMinHPL(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Hpl
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot minimum VPL map
 def plotMinVPL(Service, PerfFilesList, PerfData):
@@ -465,8 +465,8 @@ def plotMinVPL(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Vpl
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum HPL map
 def plotMaxHPL(Service, PerfFilesList, PerfData):
@@ -510,8 +510,8 @@ def plotMaxHPL(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Hpl
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum VPL map
 def plotMaxVPL(Service, PerfFilesList, PerfData):
@@ -555,8 +555,8 @@ def plotMaxVPL(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Vpl
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot minimum number of satellites map
 def plotMinSats(Service, PerfFilesList, PerfData):
@@ -601,8 +601,8 @@ def plotMinSats(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = MinSats
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum number of satellites map
 def plotMaxSats(Service, PerfFilesList, PerfData):
@@ -647,8 +647,8 @@ def plotMaxSats(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = MaxSats
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum HDOP map
 def plotMaxHDOP(Service, PerfFilesList, PerfData):
@@ -692,8 +692,8 @@ def plotMaxHDOP(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Hdop
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot maximum VDOP map
 def plotMaxVDOP(Service, PerfFilesList, PerfData):
@@ -737,8 +737,8 @@ def plotMaxVDOP(Service, PerfFilesList, PerfData):
     PlotConf["zData"] = Vdop
     PlotConf["nData"] = Rcvr
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # PerfPlots main functions
 # ----------------------------------------------------------
@@ -762,8 +762,8 @@ def generateHistPlot(LPV200ExtVpe, HistFile):
     # ----------------------------------------------------------
     if(ConfPerf["PLOT_VPE_HISTOGRAM"] == 1):
         # Read the cols we need from HistFile file
-        HistData = read_csv(HistFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[HistIdx["BINMIN"], HistIdx["BINMAX"],HistIdx["BINFREQ"]])
+        HistData = readOutputFile(HistFile, HistIdx,\
+        UseCols=[HistIdx["BINMIN"], HistIdx["BINMAX"],HistIdx["BINFREQ"]])
 
         print( 'Plot LPV200 VPE Histogram ...')
       
@@ -812,8 +812,8 @@ def generateHistPlot(LPV200ExtVpe, HistFile):
         PlotConf["x2Data"] = xOverbound
         PlotConf["y2Data"] = yOverbound
 
-        # Call generatePlot from Plots library
-        generatePlot(PlotConf)
+        # Queue generatePlot from Plots library
+        queuePlot(PlotConf)
 
 # End of generateHistPlot:
 
@@ -837,8 +837,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["AVAIL"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["AVAIL"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["AVAIL"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -854,8 +854,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["CONTRISK"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["CONTRISK"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["CONTRISK"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -871,8 +871,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPE95"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPE95"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPE95"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -888,8 +888,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPE95"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPE95"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPE95"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -905,8 +905,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["EXTVPE"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["EXTVPE"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["EXTVPE"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -922,8 +922,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HSIMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HSIMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HSIMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -939,8 +939,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VSIMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VSIMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VSIMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -956,8 +956,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMIN"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMIN"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMIN"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -973,8 +973,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMIN"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMIN"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMIN"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -990,8 +990,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HPLMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -1007,8 +1007,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VPLMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -1024,8 +1024,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMIN"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMIN"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMIN"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -1041,8 +1041,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["NSVMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -1058,8 +1058,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HDOPMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HDOPMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["HDOPMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -1075,8 +1075,8 @@ def generatePerfPlots(Service, PerfFilesList):
         PerfData = DataFrame(columns = [PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VDOPMAX"]])
         # Read the cols we need from all PerfFile files
         for PerfFile in PerfFilesList:
-            NewData = read_csv(PerfFile, delim_whitespace=True, skiprows=1, header=None,\
-            usecols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VDOPMAX"]])
+            NewData = readOutputFile(PerfFile, PerfIdx,\
+            UseCols=[PerfIdx["RCVR"],PerfIdx["LON"],PerfIdx["LAT"],PerfIdx["SERVICE"],PerfIdx["VDOPMAX"]])
             # Append information to PerfData
             PerfData = PerfData.append(NewData, ignore_index = True)
 
@@ -16,384 +16,1062 @@
 # -----------------------------------------------------------------
 #
 # Usage:
-#   Petrus.py $SCEN_PATH
+#   Petrus.py $SCEN_PATH [--jobs N] [--perf-only]
+#
+#   --jobs N: process the (receiver, day) work units with a pool of
+#             N processes (default: 1, serial processing)
+#   --perf-only: compute only the performances, from the POS files of a
+#             previous run (e.g. to tune the service levels thresholds)
 ########################################################################
 
 
 # Import External and Internal functions and Libraries
 #----------------------------------------------------------------------
-from datetime import date
 import sys, os
+import io
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
 from collections import OrderedDict
-from yaml import dump
+import numpy as np
 from COMMON import GnssConstants as Const
 from InputOutput import readConf
 from InputOutput import processConf
 from InputOutput import readRcvr
-from InputOutput import createOutputFile
-from InputOutput import openInputFile
-from InputOutput import readObsEpoch
-from InputOutput import readCorrectInputs
+from InputOutput import createOutputFile, closeOutputFile
+from InputOutput import releaseOutputColumns, readOutputFile
+from InputOutput import openIndexedInputFile, closeIndexedInputFile
+from InputOutput import readObsFile
+from InputOutput import readObsEpochs
+from InputOutput import readIndexedCorrectInputs, indexEpochByLabel
+from InputOutput import checkCorrectInputs
 from InputOutput import generatePreproFile
 from InputOutput import generateCorrFile
 from InputOutput import generatePosFile
-from InputOutput import generatePerfFile
+from InputOutput import generatePerfFile, writePerfSummary
 from InputOutput import PreproHdr, CorrHdr, PosHdr, PerfHdr, HistHdr
+from InputOutput import PreproFmt, CorrFmt, PosFmt, PerfFmt, HistFmt
+from InputOutput import PreproIdx, CorrIdx, PosIdx, PerfIdx, HistIdx
+from InputOutput import OUTPUT_EXT
 from InputOutput import CSNEPOCHS
-from InputOutput import ObsIdx
-from Preprocessing import runPreProcMeas
-from Corrections import runCorrectMeas
-from Spvt import computeSpvtSolution
-from Perf import initializePerfInfo, updatePerfEpoch, computeFinalPerf, computeVpeHist
+from InputOutput import ObsIdx, SatIdx, LosIdx
+from Preprocessing import runPreProcMeas, runPreProcMeasVec, initPreproState
+from Corrections import runCorrectMeas, runCorrectMeasVec
+from Spvt import computeSpvtEpochs
+from Pipeline import runPipeline
+from ReadAhead import readAheadEpochs
+from WriteQueue import openWriteQueue, queueWrite, endWriteEpoch, closeWriteQueue
+from Perf import initializePerfInfo, updatePerfEpoch, updatePerfEpochs
+from Perf import computeFinalPerf, computeVpeHist
 from COMMON.Dates import convertJulianDay2YearMonthDay
 from COMMON.Dates import convertYearMonthDay2Doy
-from PreprocessingPlots import generatePreproPlots
-from CorrectionsPlots import generateCorrPlots
-from PosPlots import generatePosPlots
-from PerfPlots import generateHistPlot, generatePerfPlots
+from ConPlots import ConfPrepro, ConfCorr, ConfPos
+from Cache import openStageCache, closeStageCache
+from PlotQueue import openPlotQueue, closePlotQueue
+from PlotQueue import openPlotGroup, closePlotGroup
+from Profiling import startProfiling, stopProfiling, profileStage, markProfilingEpochs
+from Cache import computeStageFingerprint, isStageCached, updateStageCache
+from Cache import getCachedOutputs
 
 #----------------------------------------------------------------------
 # INTERNAL FUNCTIONS
 #----------------------------------------------------------------------
 
+# Available service levels
+SERVICES = ["OS", "APVI", "LPV200", "CATI", "NPA", "MARITIME", "CUSTOM"]
+
 def displayUsage():
-    sys.stderr.write("ERROR: Please provide path to SCENARIO as a unique argument\n")
+    sys.stderr.write("ERROR: Please provide path to SCENARIO as first argument\n")
+    sys.stderr.write("Usage: Petrus.py $SCEN_PATH [--jobs N] [--perf-only]\n")
+
+def readArguments(Argv):
+
+    # Purpose: read the command line arguments
+
+    # Parameters
+    # ==========
+    # Argv: list
+    #       Command line arguments (sys.argv)
+
+    # Returns
+    # =======
+    # Scen: str
+    #       Path to SCENARIO
+    # NJobs: int
+    #        Number of processes to run the (receiver, day) work units
+    # PerfOnly: bool
+    #           Compute only the performances from the existing POS files
+
+    # Check the number of arguments
+    if len(Argv) < 2:
+        displayUsage()
+        sys.exit()
+
+    # Extract the arguments
+    Scen = Argv[1]
+    NJobs = 1
+    PerfOnly = False
+
+    # Check the optional arguments
+    Args = Argv[2:]
+    while len(Args) > 0:
+        if Args[0] == "--jobs" and len(Args) > 1 and Args[1].isdigit() and int(Args[1]) >= 1:
+            NJobs = int(Args[1])
+            Args = Args[2:]
+
+        elif Args[0] == "--perf-only":
+            PerfOnly = True
+            Args = Args[1:]
+
+        else:
+            displayUsage()
+            sys.exit()
+
+    return Scen, NJobs, PerfOnly
+
+# End of readArguments()
+
+def runSpvtEpochs(Conf, RcvrInfo, Rcvr, CorrInfoBatch, PerfInfo, fpos, Writer):
+
+    # Purpose: compute the spvt solution and the intermediate performances
+    #          of a batch of epochs, in PA and (if activated) NPA modes
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: list
+    #           Receiver information: position, masking angle...
+    # Rcvr: str
+    #       Receiver acronym
+    # CorrInfoBatch: list
+    #                Corrected information of each epoch of the batch
+    # PerfInfo: dict
+    #           Performances information per service level
+    # fpos: dict
+    #       Descriptor for POS output file (None if not requested)
+    # Writer: dict
+    #         Write queue of the outputs (None if not activated)
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Compute spvt solution of all the epochs
+    with profileStage("SPVT"):
+        PosInfoBatch = computeSpvtEpochs(Conf, RcvrInfo, CorrInfoBatch)
+
+    # Loop over the epochs in the original order
+    for Epoch in range(len(CorrInfoBatch)):
+        for Mode in PosInfoBatch:
+            PosInfo = PosInfoBatch[Mode][Epoch]
+
+            # If Position information available
+            if len(PosInfo) > 0:
+                # Compute intermediate performances for the services of the mode
+                with profileStage("PERF"):
+                    for Service, PerfInfoSer in PerfInfo.items():
+                        if (Service == "NPA") == (Mode == "NPA"):
+                            updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer)
+
+                # If SPVT outputs are requested
+                if Conf["SPVT_OUT"] == 1:
+                    # Generate output file
+                    with profileStage("WRITE_POS"):
+                        queueWrite(Writer, generatePosFile, fpos, PosInfo, Rcvr)
+
+# End of runSpvtEpochs()
+
+def getDayFiles(Scen, Conf, Rcvr, Year, Doy):
+
+    # Purpose: get the full path and name to the input and output files of
+    #          one receiver and day
+
+    # Returns
+    # =======
+    # DayFiles: dict
+    #           Path to each input and output file
+
+    # Get the extension of the output files
+    OutExt = OUTPUT_EXT[Conf["OUT_FORMAT"]]
+    Day = "%s_Y%02dD%03d" % (Rcvr, Year % 100, Doy)
+
+    DayFiles = OrderedDict({})
+    DayFiles["RCVR"] = Scen + '/INP/RCVR/' + Conf["RCVR_FILE"]
+    DayFiles["OBS"] = Scen + '/INP/OBS/' + "OBS_%s.dat" % Day
+    DayFiles["SAT"] = Scen + '/OUT/SAT/' + "SAT_%s.dat" % Day
+    DayFiles["LOS"] = Scen + '/OUT/LOS/' + "LOS_%s.dat" % Day
+    DayFiles["PREPRO"] = Scen + '/OUT/PPVE/' + "PREPRO_OBS_%s%s" % (Day, OutExt)
+    DayFiles["CORR"] = Scen + '/OUT/CORR/' + "CORR_%s%s" % (Day, OutExt)
+    DayFiles["POS"] = Scen + '/OUT/SPVT/' + "POS_%s%s" % (Day, OutExt)
+    # POS file in NPZ format, also written with the text outputs, so that
+    # the performances can be computed again from the full precision values
+    DayFiles["POS_NPZ"] = Scen + '/OUT/SPVT/' + "POS_%s%s" % (Day, OUTPUT_EXT["NPZ"])
+    DayFiles["STANFORD_PA"] = Scen + '/OUT/SPVT/' + "STANFORD_PA_%s.npz" % Day
+    DayFiles["STANFORD_NPA"] = Scen + '/OUT/SPVT/' + "STANFORD_NPA_%s.npz" % Day
+    DayFiles["PERF"] = Scen + '/OUT/PERF/' + "PERF_%s%s" % (Day, OutExt)
+    DayFiles["PERF_SUM"] = Scen + '/OUT/PERF/' + "PERF_SUM_%s.npz" % Day
+    DayFiles["VPE_HIST"] = Scen + '/OUT/PERF/' + "VPE_HIST_%s%s" % (Day, OutExt)
+    DayFiles["PROF"] = Scen + '/OUT/PROF/' + "PROF_%s.json" % Day
+
+    return DayFiles
+
+# End of getDayFiles()
+
+def getStageOutputs(Conf, DayFiles, Stage):
+
+    # Purpose: get the output files generated by a stage, according to the
+    #          activated outputs
+
+    StageOutputs = OrderedDict({})
+    StageOutputs["CHAIN"] = [("PREPRO", "PREPRO_OUT"), ("CORR", "CORR_OUT"), ("POS", "SPVT_OUT"),
+        ("POS_NPZ", "SPVT_OUT")]
+    StageOutputs["PERF"] = [("PERF", "PERF_OUT"), ("PERF_SUM", "PERF_OUT"), ("VPE_HIST", "VPEHIST_OUT")]
+
+    # The POS file is its NPZ version in NPZ format
+    Outputs = []
+    for Output, Flag in StageOutputs[Stage]:
+        if Conf[Flag] == 1 and DayFiles[Output] not in Outputs:
+            Outputs.append(DayFiles[Output])
+
+    return Outputs
+
+# End of getStageOutputs()
+
+def getPerfInputs(DayFiles):
+
+    # Purpose: get the input files of the performances stage: the POS
+    #          file and its full precision NPZ version
+
+    return sorted(set([DayFiles["POS"], DayFiles["POS_NPZ"]]))
+
+# End of getPerfInputs()
+
+def runPlotStage(Cache, Conf, Name, PlotFile, InputFiles, Outputs, ConfPlots, generatePlots):
+
+    # Purpose: generate the plots of an output file, unless they are up to
+    #          date according to the stage cache
+
+    # Parameters
+    # ==========
+    # Cache: dict
+    #        Stage cache of the receiver day
+    # Conf: dict
+    #       Configuration dictionary
+    # Name: str
+    #       Name of the plotted output (PREPRO, CORR or POS)
+    # PlotFile: str
+    #           Path to the plotted output file
+    # InputFiles: list
+    #             Paths to all the files read by the plots
+    # Outputs: list
+    #          Paths to the data files written with the plots (the
+    #          figures are added to them)
+    # ConfPlots: dict
+    #            Plots configuration flags
+    # generatePlots: function
+    #                Function generating the plots
+
+    # Returns
+    # =======
+    # Nothing
+
+    Stage = Name + "_PLOTS"
+    Fingerprint = computeStageFingerprint(Cache, Stage, Conf, InputFiles, ConfPlots)
+
+    # The figures are the ones generated in the previous run, since the
+    # plots configuration is part of the fingerprint
+    Figures = [Path for Path in getCachedOutputs(Cache, Stage) if Path not in Outputs]
+    if isStageCached(Cache, Stage, Fingerprint, Outputs + Figures):
+        print("INFO: %s figures of %s up to date" % (Name, PlotFile))
+        return
 
-#######################################################
-# MAIN BODY
-#######################################################
+    # Display Message
+    print("INFO: Reading file: %s and generating %s figures..." % (PlotFile, Name))
+
+    def recordPlotStage(Figures):
+        # The stage cache of the receiver day may already be closed when
+        # the queued plots are rendered: it is written again
+        updateStageCache(Cache, Stage, Fingerprint, Outputs + Figures)
+        closeStageCache(Cache)
+
+    # Generate the plots, recorded once all of them are rendered
+    openPlotGroup()
+    with profileStage("PLOTS_" + Name):
+        generatePlots()
+    closePlotGroup(recordPlotStage)
+
+# End of runPlotStage()
+
+def generateChainPlots(Cache, Conf, RcvrInfo, DayFiles):
+
+    # Purpose: generate the plots of the PREPRO, CORR and POS outputs of
+    #          one receiver and day, and release their columns kept in
+    #          memory
+
+    # The plots modules (and their plotting libraries) are only imported
+    # when their outputs are requested, not to slow down the start of the
+    # runs without plots
+
+    # If PREPRO outputs are requested
+    if Conf["PREPRO_OUT"] == 1:
+        # Generate Preprocessing plots
+        from PreprocessingPlots import generatePreproPlots
+        runPlotStage(Cache, Conf, "PREPRO", DayFiles["PREPRO"], [DayFiles["PREPRO"]], [], ConfPrepro,
+            lambda: generatePreproPlots(DayFiles["PREPRO"]))
+        releaseOutputColumns(DayFiles["PREPRO"])
+
+    # If CORR outputs are requested
+    if Conf["CORR_OUT"] == 1:
+        # Generate CORR plots
+        from CorrectionsPlots import generateCorrPlots
+        runPlotStage(Cache, Conf, "CORR", DayFiles["CORR"], [DayFiles["CORR"], DayFiles["SAT"]], [],
+            [ConfCorr, RcvrInfo], lambda: generateCorrPlots(DayFiles["CORR"], DayFiles["SAT"], RcvrInfo))
+        releaseOutputColumns(DayFiles["CORR"])
+
+    # If SPVT outputs are requested
+    if Conf["SPVT_OUT"] == 1:
+        # Generate POS plots
+        from PosPlots import generatePosPlots
+        Modes = ["PA", "NPA"] if Conf["NPA"][0] == 1 else ["PA"]
+
+        def generatePosModesPlots():
+            # If only PA mode activated, else NPA mode also activated
+            for Mode in Modes:
+                generatePosPlots(DayFiles["POS"], Mode = Mode,
+                    StanfordFile = DayFiles["STANFORD_" + Mode])
+
+        # Standford diagrams grids written with the plots
+        StanfordFiles = []
+        if ConfPos["PLOT_HOR_STANDFORD"] == 1 or ConfPos["PLOT_VER_STANDFORD"] == 1:
+            StanfordFiles = [DayFiles["STANFORD_" + Mode] for Mode in Modes]
+
+        runPlotStage(Cache, Conf, "POS", DayFiles["POS"], [DayFiles["POS"]], StanfordFiles,
+            [ConfPos, Conf["NPA"][0]], generatePosModesPlots)
+        releaseOutputColumns(DayFiles["POS"])
+
+# End of generateChainPlots()
+
+def runPerfStage(Scen, Conf, RcvrInfo, Rcvr, Year, Doy, Cache):
+
+    # Purpose: compute the performances of one receiver and day from its
+    #          POS output file, unless they are up to date according to
+    #          the stage cache
+
+    # Parameters
+    # ==========
+    # Scen: str
+    #       Path to SCENARIO
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: dict
+    #           Receivers information
+    # Rcvr: str
+    #       Receiver acronym
+    # Year: int
+    #       Year
+    # Doy: int
+    #      Day of year
+    # Cache: dict
+    #        Stage cache of the receiver day
+
+    # Returns
+    # =======
+    # Same as processRcvrDay
+
+    DayFiles = getDayFiles(Scen, Conf, Rcvr, Year, Doy)
+    PosFile = DayFiles["POS"]
+
+    if not os.path.isfile(PosFile):
+        sys.stderr.write("ERROR: POS file %s not found. Please run PETRUS with SPVT_OUT activated first\n" % \
+            PosFile)
+        sys.exit(-1)
+
+    # If the performances outputs are up to date, nothing to do
+    PerfOutputs = getStageOutputs(Conf, DayFiles, "PERF")
+    PerfPrint = computeStageFingerprint(Cache, "PERF", Conf, getPerfInputs(DayFiles))
+
+    if isStageCached(Cache, "PERF", PerfPrint, PerfOutputs):
+        print("INFO: PERF outputs of %s up to date" % PosFile)
+        PerfFile = DayFiles["PERF"] if Conf["PERF_OUT"] == 1 else None
+        return PerfFile, [Service for Service in SERVICES if int(Conf[Service][0]) == 1]
 
-# Check InputOutput Arguments
-if len(sys.argv) != 2:
-    displayUsage()
-    sys.exit()
+    # Display Message
+    print("INFO: Reading file: %s..." % PosFile)
 
-# Extract the arguments
-Scen = sys.argv[1]
+    # Read the POS file
+    with profileStage("READ_POS"):
+        PosData = readPosModes(PosFile, Conf["NPA"][0] == 1)
 
-# Select the Configuratiun file name
-CfgFile = Scen + '/CFG/petrus.cfg'
+    # Initialize performances
+    PerfInfo = OrderedDict({})
+    VpeHistInfo = OrderedDict({})
+    initializePerfInfo(Conf, SERVICES, Rcvr, RcvrInfo[Rcvr], Year, Doy, PerfInfo, VpeHistInfo)
 
-# Read conf file
-Conf = readConf(CfgFile)
-# print(dump(Conf))
+    # Compute intermediate performances of all the epochs
+    # ----------------------------------------------------------
+    with profileStage("PERF"):
+        for Service, PerfInfoSer in PerfInfo.items():
+            Mode = "NPA" if Service == "NPA" else "PA"
+            updatePerfEpochs(Conf, Service, PosData[Mode], PerfInfoSer)
+
+    markProfilingEpochs(len(PosData["PA"]["Sod"]), Batch = True)
+
+    # Compute final performances and generate their outputs
+    # ----------------------------------------------------------
+    with profileStage("PERF_OUTPUTS"):
+        PerfFile = computePerfOutputs(Scen, Conf, Rcvr, Year, Doy, PerfInfo, VpeHistInfo)
+    updateStageCache(Cache, "PERF", PerfPrint, PerfOutputs)
+
+    return PerfFile, list(PerfInfo.keys())
+
+# End of runPerfStage()
+
+def computePerfOutputs(Scen, Conf, Rcvr, Year, Doy, PerfInfo, VpeHistInfo):
+
+    # Purpose: compute the final performances of one receiver and day and
+    #          generate the PERF and LPV200 VPE histogram outputs and plots
+
+    # Parameters
+    # ==========
+    # Scen: str
+    #       Path to SCENARIO
+    # Conf: dict
+    #       Configuration dictionary
+    # Rcvr: str
+    #       Receiver acronym
+    # Year: int
+    #       Year
+    # Doy: int
+    #      Day of year
+    # PerfInfo: dict
+    #           Performances information per service level
+    # VpeHistInfo: dict
+    #              VPE histogram information for LPV200 service level
+
+    # Returns
+    # =======
+    # PerfFile: str
+    #           Path to the PERF output file (None if not generated)
+
+    DayFiles = getDayFiles(Scen, Conf, Rcvr, Year, Doy)
+    PerfFile = None
+
+    # If Performances outputs are activated
+    if Conf["PERF_OUT"] == 1:
+        # Define the full path and name to the output PERF file
+        PerfFile = DayFiles["PERF"]
+
+        # Create output file
+        fperf = createOutputFile(PerfFile, PerfHdr, PerfFmt, PerfIdx, Conf)
+
+    # Compute final performances
+    # ----------------------------------------------------------
+    for Service, PerfInfoSer in PerfInfo.items():
+        computeFinalPerf(PerfInfoSer)
 
-# Process Configuration Parameters
-Conf = processConf(Conf)
+        # If PERF outputs are requested
+        if Conf["PERF_OUT"] == 1:
+            # Generate output file
+            generatePerfFile(fperf, PerfInfoSer)
 
-# Select the RCVR Positions file name
-RcvrFile = Scen + '/INP/RCVR/' + Conf["RCVR_FILE"]
+    # If PERF outputs are requested
+    if Conf["PERF_OUT"] == 1:
+        # Close PERF output file
+        closeOutputFile(fperf)
 
-# Read RCVR Positions file
-RcvrInfo = readRcvr(RcvrFile)
+        # Write the mergeable performances summary (see PerfMerge.py)
+        writePerfSummary(DayFiles["PERF_SUM"], PerfInfo)
 
-# Print header
-print( '------------------------------------')
-print( '--> RUNNING PETRUS:')
-print( '------------------------------------')
+    # If LPV200 VPE Histogram outputs are requested 
+    if Conf["VPEHIST_OUT"] == 1:
+        # Check if LPV200 service level is activated
+        if "LPV200" not in PerfInfo.keys():
+            sys.stderr.write("ERROR: Please activate LPV200 service level for LPV200 VPE histogram computation \n")
+            sys.exit(1)
 
-# Initialize Variables
-PerfFilesList = []
+        # Define the full path and name to the output HIST file
+        HistFile = DayFiles["VPE_HIST"]
 
-# Loop over RCVRs
-#-----------------------------------------------------------------------
-for Rcvr in RcvrInfo.keys():
-    # Display Message
-    print( '\n***-----------------------------***')
-    print( '*** Processing receiver: ' + Rcvr + '   ***')
-    print( '***-----------------------------***')
+        # Create output file
+        fhist = createOutputFile(HistFile, HistHdr, HistFmt, HistIdx, Conf)
 
-    # Loop over Julian Days in simulation
-    #-----------------------------------------------------------------------
-    for Jd in range(Conf["INI_DATE_JD"], Conf["END_DATE_JD"] + 1):
-        # Compute Year, Month and Day in order to build input file name
-        Year, Month, Day = convertJulianDay2YearMonthDay(Jd)
+        # Compute VPE Histogram and generate output file for LPV200 service level
+        computeVpeHist(fhist, PerfInfo["LPV200"], VpeHistInfo)
         
-        # Compute the Day of Year (DoY)
-        Doy = convertYearMonthDay2Doy(Year, Month, Day)
+        # Close PERF output file
+        closeOutputFile(fhist)
 
         # Display Message
-        print( '\n*** Processing Day of Year: ' + str(Doy) + ' ... ***')
+        print("INFO: Reading file: %s and generating VPE Histogram..." % HistFile)
+
+        # Generate VPE Histogram plots
+        from PerfPlots import generateHistPlot
+        generateHistPlot(PerfInfo["LPV200"]["ExtVpe"], HistFile)
+
+    return PerfFile
+
+# End of computePerfOutputs()
+
+def processRcvrDay(Scen, Conf, RcvrInfo, Rcvr, Jd):
+
+    # Purpose: process one receiver for one day: preprocessing,
+    #          corrections, spvt and performances, with their outputs
+    #          and plots. With STAGE_CACHE, the stages whose inputs did
+    #          not change since the previous run are skipped
+
+    # Parameters
+    # ==========
+    # Scen: str
+    #       Path to SCENARIO
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: dict
+    #           Receivers information
+    # Rcvr: str
+    #       Receiver acronym
+    # Jd: int
+    #     Julian Day
+
+    # Returns
+    # =======
+    # PerfFile: str
+    #           Path to the PERF output file (None if not generated)
+    # Services: list
+    #           Service levels processed
+
+    # Display Message at the first day of the receiver
+    if Jd == Conf["INI_DATE_JD"]:
+        print( '\n***-----------------------------***')
+        print( '*** Processing receiver: ' + Rcvr + '   ***')
+        print( '***-----------------------------***')
+
+    # Compute Year, Month and Day in order to build input file name
+    Year, Month, Day = convertJulianDay2YearMonthDay(Jd)
+    
+    # Compute the Day of Year (DoY)
+    Doy = convertYearMonthDay2Doy(Year, Month, Day)
 
-        # Define the full path and name to the OBS INFO file to read
-        ObsFile = Scen + '/INP/OBS/' + "OBS_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
+    # Display Message
+    print( '\n*** Processing Day of Year: ' + str(Doy) + ' ... ***')
 
-        # Display Message
-        print("INFO: Reading file: %s..." % ObsFile)
+    # Define the full path and name to the input and output files
+    DayFiles = getDayFiles(Scen, Conf, Rcvr, Year, Doy)
+
+    # Start the profiling of the receiver day, if activated
+    startProfiling(Conf)
+
+    # Open the stage cache of the receiver day
+    Cache = openStageCache(Scen, Conf, Rcvr, Year, Doy)
+    ChainOutputs = getStageOutputs(Conf, DayFiles, "CHAIN")
+    ChainPrint = computeStageFingerprint(Cache, "CHAIN", Conf,
+        [DayFiles["RCVR"], DayFiles["OBS"], DayFiles["SAT"], DayFiles["LOS"]], Conf["NPA"][0])
 
-        # If Preprocessing outputs are activated
-        if Conf["PREPRO_OUT"] == 1:
-            # Define the full path and name to the output PREPRO OBS file
-            PreproObsFile = Scen + '/OUT/PPVE/' + "PREPRO_OBS_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
+    # If the PREPRO, CORR and POS outputs are up to date, only generate
+    # the plots and the performances from them
+    if Conf["SPVT_OUT"] == 1 and isStageCached(Cache, "CHAIN", ChainPrint, ChainOutputs):
+        print("INFO: PREPRO, CORR and POS outputs up to date")
+        generateChainPlots(Cache, Conf, RcvrInfo[Rcvr], DayFiles)
+        Result = runPerfStage(Scen, Conf, RcvrInfo, Rcvr, Year, Doy, Cache)
+        closeStageCache(Cache)
+        stopProfiling(DayFiles["PROF"], Rcvr, Year, Doy)
 
-            # Create output file
-            fpreprobs = createOutputFile(PreproObsFile, PreproHdr)
+        return Result
 
-        # If Corrected outputs are activated
-        if Conf["CORR_OUT"] == 1:
-            # Define the full path and name to the output CORR file
-            CorrFile = Scen + '/OUT/CORR/' + "CORR_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
+    # Define the full path and name to the OBS INFO file to read
+    ObsFile = DayFiles["OBS"]
 
-            # Create output file
-            fcorr = createOutputFile(CorrFile, CorrHdr)
+    # Display Message
+    print("INFO: Reading file: %s..." % ObsFile)
+
+    # Output files written at every epoch
+    EpochOutputFiles = []
+    fpreprobs = None
+    fcorr = None
+    fpos = None
+
+    # Keep the PREPRO, CORR and POS outputs in memory for the plots in
+    # pipeline mode, instead of reading the files back
+    KeepColumns = (Conf["PIPELINE"] == 1)
+
+    # If Preprocessing outputs are activated
+    if Conf["PREPRO_OUT"] == 1:
+        # Define the full path and name to the output PREPRO OBS file
+        PreproObsFile = DayFiles["PREPRO"]
+
+        # Create output file
+        fpreprobs = createOutputFile(PreproObsFile, PreproHdr, PreproFmt, PreproIdx, Conf, KeepColumns)
+        EpochOutputFiles.append(fpreprobs)
+
+    # If Corrected outputs are activated
+    if Conf["CORR_OUT"] == 1:
+        # Define the full path and name to the output CORR file
+        CorrFile = DayFiles["CORR"]
+
+        # Create output file
+        fcorr = createOutputFile(CorrFile, CorrHdr, CorrFmt, CorrIdx, Conf, KeepColumns)
+        EpochOutputFiles.append(fcorr)
+
+    # If Position outputs are activated
+    if Conf["SPVT_OUT"] == 1:
+        # Define the full path and name to the output POS file
+        PosFile = DayFiles["POS"]
+
+        # Create output file
+        # Also written in NPZ format, for the performances (see readPosModes)
+        fpos = createOutputFile(PosFile, PosHdr, PosFmt, PosIdx, Conf, KeepColumns, SaveColumns=True)
+        EpochOutputFiles.append(fpos)
+
+    # Define the full path and name to the SAT file to read and open the file
+    SatFile = DayFiles["SAT"]
+    SatInput = openIndexedInputFile(SatFile, SatIdx)
+
+    # Define the full path and name to the LOS file to read
+    LosFile = DayFiles["LOS"]
+    LosInput = openIndexedInputFile(LosFile, LosIdx)
+
+    # Initialize Variables
+    # If the array-backed preprocessing engine is selected
+    if Conf["PREPRO_ENGINE"] == "VECTOR":
+        PreproState = initPreproState(Conf)
+
+    PrevPreproObsInfo = {}
+    for prn in range(1, Const.MAX_NUM_SATS_CONSTEL + 1):
+        PrevPreproObsInfo["G%02d" % prn] = {
+        "L1_n_1": 0.0,                                          # t-1 Carrier Phase in L1
+        "L1_n_2": 0.0,                                          # t-2 Carrier Phase in L1
+        "L1_n_3": 0.0,                                          # t-3 Carrier Phase in L1
+        "t_n_1": 0.0,                                           # t-1 epoch
+        "t_n_2": 0.0,                                           # t-2 epoch
+        "t_n_3": 0.0,                                           # t-3 epoch
+        "CsBuff": [0] * int(Conf["MIN_NCS_TH"][CSNEPOCHS]),     # Number of consecutive epochs for CS
+        "CsIdx": 0,                                             # Index of CS detector buffer
+        "ResetHatchFilter": 1,                                  # Flag to reset Hatch filter
+        "Ksmooth": 0,                                           # Hatch filter K
+        "PrevEpoch": 86400,                                     # Previous SoD
+        "PrevL1": 0.0,                                          # Previous L1
+        "PrevSmoothC1": 0.0,                                    # Previous Smoothed C1
+        "PrevRangeRateL1": 0.0,                                 # Previous Code Rate
+        "PrevPhaseRateL1": 0.0,                                 # Previous Phase Rate
+        "PrevGeomFree": 0.0,                                    # Previous Geometry-Free Observable
+        "PrevGeomFreeEpoch": 0.0,                               # Previous Geometry-Free Observable
+        "PrevRej": 0,                                           # Previous Rejection flag
+                                                                # ...
+    } # End of SatPreproObsInfo
+    PerfInfo = OrderedDict({})
+    VpeHistInfo = OrderedDict({})
+    initializePerfInfo(Conf, SERVICES, Rcvr, RcvrInfo[Rcvr], Year, Doy, PerfInfo, VpeHistInfo)
+
+    # If the streaming pipeline is activated
+    if Conf["PIPELINE"] == 1:
+        # Process the day by batches of epochs
+        # ----------------------------------------------------------
+        if Conf["PREPRO_ENGINE"] == "VECTOR":
+            PipeState = PreproState
+        else:
+            PipeState = PrevPreproObsInfo
 
-        # If Position outputs are activated
-        if Conf["SPVT_OUT"] == 1:
-            # Define the full path and name to the output POS file
-            PosFile = Scen + '/OUT/SPVT/' + "POS_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
+        runPipeline(Conf, RcvrInfo[Rcvr], Rcvr, ObsFile, PipeState, SatInput, LosInput, PerfInfo,
+        {"PREPRO": fpreprobs, "CORR": fcorr, "POS": fpos})
 
-            # Create output file
-            fpos = createOutputFile(PosFile, PosHdr)
+    # Otherwise, process the whole day in memory
+    else:
+        # Corrected information pending of SPVT computation
+        CorrInfoBatch = []
 
-        # If Performances outputs are activated
-        if Conf["PERF_OUT"] == 1:
-            # Define the full path and name to the output PERF file
-            PerfFile = Scen + '/OUT/PERF/' + "PERF_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
-
-            # Create output file
-            fperf = createOutputFile(PerfFile, PerfHdr)
-
-        # If LPV200 VPE Histogram outputs are activated
-        if Conf["VPEHIST_OUT"] == 1:
-            # Define the full path and name to the output HIST file
-            HistFile = Scen + '/OUT/PERF/' + "VPE_HIST_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
-
-            # Create output file
-            fhist = createOutputFile(HistFile, HistHdr)
-
-        # Define the full path and name to the SAT file to read and open the file
-        SatFile = Scen + '/OUT/SAT/' + "SAT_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
-        fsat = openInputFile(SatFile)
-
-        # Define the full path and name to the LOS file to read
-        LosFile = Scen + '/OUT/LOS/' + "LOS_%s_Y%02dD%03d.dat" % (Rcvr, Year % 100, Doy)
-        flos = openInputFile(LosFile)
-
-        # Initialize Variables
-        EndOfFile = False
-        ObsInfo = [None]
-        PrevPreproObsInfo = {}
-        for prn in range(1, Const.MAX_NUM_SATS_CONSTEL + 1):
-            PrevPreproObsInfo["G%02d" % prn] = {
-            "L1_n_1": 0.0,                                          # t-1 Carrier Phase in L1
-            "L1_n_2": 0.0,                                          # t-2 Carrier Phase in L1
-            "L1_n_3": 0.0,                                          # t-3 Carrier Phase in L1
-            "t_n_1": 0.0,                                           # t-1 epoch
-            "t_n_2": 0.0,                                           # t-2 epoch
-            "t_n_3": 0.0,                                           # t-3 epoch
-            "CsBuff": [0] * int(Conf["MIN_NCS_TH"][CSNEPOCHS]),     # Number of consecutive epochs for CS
-            "CsIdx": 0,                                             # Index of CS detector buffer
-            "ResetHatchFilter": 1,                                  # Flag to reset Hatch filter
-            "Ksmooth": 0,                                           # Hatch filter K
-            "PrevEpoch": 86400,                                     # Previous SoD
-            "PrevL1": 0.0,                                          # Previous L1
-            "PrevSmoothC1": 0.0,                                    # Previous Smoothed C1
-            "PrevRangeRateL1": 0.0,                                 # Previous Code Rate
-            "PrevPhaseRateL1": 0.0,                                 # Previous Phase Rate
-            "PrevGeomFree": 0.0,                                    # Previous Geometry-Free Observable
-            "PrevGeomFreeEpoch": 0.0,                               # Previous Geometry-Free Observable
-            "PrevRej": 0,                                           # Previous Rejection flag
-                                                                    # ...
-        } # End of SatPreproObsInfo
-        Services = ["OS", "APVI", "LPV200", "CATI", "NPA", "MARITIME", "CUSTOM"]
-        PerfInfo = OrderedDict({})
-        VpeHistInfo = OrderedDict({})
-        initializePerfInfo(Conf, Services, Rcvr, RcvrInfo[Rcvr], Doy, PerfInfo, VpeHistInfo)
-        SodInputs = -1
-
-        # Open OBS file
-        with open(ObsFile, 'r') as fobs:
-            # Read header line of OBS file
-            fobs.readline()
-
-            # LOOP over all Epochs of OBS file
-            # ----------------------------------------------------------
-            while not EndOfFile:
+        # Start the thread writing the outputs, if activated
+        Writer = openWriteQueue(Conf)
 
-                # If ObsInfo is not empty
-                if ObsInfo != []:
+        # If the read ahead is activated, read the epochs of OBS file
+        # and the SAT and LOS info in a background thread
+        if Conf["READ_AHEAD"] > 0:
+            InputEpochs = readAheadEpochs(Conf, ObsFile, SatInput, LosInput)
 
-                    # Read Only One Epoch
-                    ObsInfo = readObsEpoch(fobs)
+        # Otherwise, SAT and LOS info is read when the epoch is processed
+        else:
+            # Load OBS file in typed columns and build the epoch index
+            with profileStage("READ_OBS"):
+                ObsData, ObsEpochIdx = readObsFile(ObsFile)
 
-                    # If ObsInfo is empty, exit loop
-                    if ObsInfo == []:
-                        break
+            InputEpochs = ((ObsInfo, None, None) for ObsInfo in readObsEpochs(ObsData, ObsEpochIdx))
 
-                    # Preprocess OBS measurements
-                    # ----------------------------------------------------------
+        # LOOP over all Epochs of OBS file
+        # ----------------------------------------------------------
+        for ObsInfo, SatData, LosData in InputEpochs:
+
+            # Preprocess OBS measurements
+            # ----------------------------------------------------------
+            with profileStage("PREPRO"):
+                if Conf["PREPRO_ENGINE"] == "VECTOR":
+                    PreproObsInfo = runPreProcMeasVec(Conf, RcvrInfo[Rcvr], ObsInfo, PreproState)
+                else:
                     PreproObsInfo = runPreProcMeas(Conf, RcvrInfo[Rcvr], ObsInfo, PrevPreproObsInfo)
 
-                    # If PREPRO outputs are requested
-                    if Conf["PREPRO_OUT"] == 1:
-                        # Generate output file
-                        generatePreproFile(fpreprobs, PreproObsInfo)
+            # If PREPRO outputs are requested
+            if Conf["PREPRO_OUT"] == 1:
+                # Generate output file
+                with profileStage("WRITE_PREPRO"):
+                    queueWrite(Writer, generatePreproFile, fpreprobs, PreproObsInfo)
+
+            # Get SoD
+            Sod = int(float(ObsInfo[0][ObsIdx["SOD"]]))
+
+            # The rest of te analyses are executed every configured sampling rate
+            if(Sod % Conf["SAMPLING_RATE"] == 0):
+                # Read SAT and LOS info of the epoch, or check the info read ahead
+                with profileStage("READ_CORR_INPUTS"):
+                    if Conf["READ_AHEAD"] > 0:
+                        checkCorrectInputs(SatData, LosData, Sod)
+                    else:
+                        SatData, LosData = readIndexedCorrectInputs(SatInput, LosInput, Sod)
+
+                # Correct measurements and estimate the variances with SBAS information
+                # ----------------------------------------------------------
+                with profileStage("CORR"):
+                    if Conf["CORR_ENGINE"] == "VECTOR":
+                        CorrInfo = runCorrectMeasVec(Conf, RcvrInfo[Rcvr], PreproObsInfo, SatData, LosData)
+                    else:
+                        SatInfo = indexEpochByLabel(SatData, SatIdx)
+                        LosInfo = indexEpochByLabel(LosData, LosIdx)
+                        CorrInfo = runCorrectMeas(Conf, RcvrInfo[Rcvr], PreproObsInfo, SatInfo, LosInfo)
+        
+                # If CORR outputs are requested
+                if Conf["CORR_OUT"] == 1:
+                    # Generate output file
+                    with profileStage("WRITE_CORR"):
+                        queueWrite(Writer, generateCorrFile, fcorr, CorrInfo)
+
+                # Compute spvt solution and intermediate performances
+                # ----------------------------------------------------------
+                # Buffer the corrected information until a SPVT batch is complete
+                CorrInfoBatch.append(CorrInfo)
+
+                if len(CorrInfoBatch) == Conf["SPVT_BATCH"]:
+                    runSpvtEpochs(Conf, RcvrInfo[Rcvr], Rcvr, CorrInfoBatch, PerfInfo, fpos, Writer)
+                    CorrInfoBatch = []
+
+            # Write the buffered output rows according to the flush policy
+            with profileStage("WRITE_FLUSH"):
+                endWriteEpoch(Writer, EpochOutputFiles)
+
+            markProfilingEpochs()
+
+        # End of for ObsInfo, SatData, LosData in InputEpochs:
+
+        # Compute spvt solution and intermediate performances of the remaining epochs
+        if len(CorrInfoBatch) > 0:
+            runSpvtEpochs(Conf, RcvrInfo[Rcvr], Rcvr, CorrInfoBatch, PerfInfo, fpos, Writer)
+
+        # Wait until all the outputs are written
+        with profileStage("WRITE_FLUSH"):
+            closeWriteQueue(Writer)
+
+    # Outputs and Plotting
+    # ----------------------------------------------------------
+    # Close the output files written at every epoch
+    for fout in EpochOutputFiles:
+        closeOutputFile(fout)
+
+    updateStageCache(Cache, "CHAIN", ChainPrint, ChainOutputs)
+
+    # Generate PREPRO, CORR and POS plots
+    generateChainPlots(Cache, Conf, RcvrInfo[Rcvr], DayFiles)
+
+    # Compute final performances and generate their outputs
+    # ----------------------------------------------------------
+    with profileStage("PERF_OUTPUTS"):
+        PerfFile = computePerfOutputs(Scen, Conf, Rcvr, Year, Doy, PerfInfo, VpeHistInfo)
+
+    # Record the performances computed from the POS file
+    if Conf["SPVT_OUT"] == 1:
+        PerfPrint = computeStageFingerprint(Cache, "PERF", Conf, getPerfInputs(DayFiles))
+        updateStageCache(Cache, "PERF", PerfPrint, getStageOutputs(Conf, DayFiles, "PERF"))
+
+    closeStageCache(Cache)
+
+    # Close input files
+    closeIndexedInputFile(SatInput)
+    closeIndexedInputFile(LosInput)
+
+    # Write the profiling report of the receiver day
+    stopProfiling(DayFiles["PROF"], Rcvr, Year, Doy)
+
+    return PerfFile, list(PerfInfo.keys())
+
+# End of processRcvrDay()
+
+def readPosModes(PosFile, NpaActive):
+
+    # Purpose: read a POS output file and split its epochs into PA and
+    #          NPA modes. Every epoch has a PA line followed, when NPA
+    #          mode is activated, by a NPA line. The NPZ version of the
+    #          file is read when available, since it keeps the full
+    #          precision of the values
+
+    # Parameters
+    # ==========
+    # PosFile: str
+    #          Path to POS output file
+    # NpaActive: bool
+    #            NPA mode activated when the POS file was generated
+
+    # Returns
+    # =======
+    # PosData: dict
+    #          Position information per mode, one array per PosInfo field
+
+    # PosInfo fields read from the POS file
+    PosCols = OrderedDict({})
+    PosCols["Sod"] = PosIdx["SOD"]
+    PosCols["Sol"] = PosIdx["SOL"]
+    PosCols["NumSatSol"] = PosIdx["NVS-SOL"]
+    PosCols["Hpe"] = PosIdx["HPE"]
+    PosCols["Vpe"] = PosIdx["VPE"]
+    PosCols["Hpl"] = PosIdx["HPL"]
+    PosCols["Vpl"] = PosIdx["VPL"]
+    PosCols["Hsi"] = PosIdx["HSI"]
+    PosCols["Vsi"] = PosIdx["VSI"]
+    PosCols["Hdop"] = PosIdx["HDOP"]
+    PosCols["Vdop"] = PosIdx["VDOP"]
+    PosCols["Pdop"] = PosIdx["PDOP"]
+
+    # Read the NPZ version of the file, if it is up to date
+    NpzFile = os.path.splitext(PosFile)[0] + OUTPUT_EXT["NPZ"]
+    FullPrecision = os.path.isfile(NpzFile) and \
+        os.path.getmtime(NpzFile) >= os.path.getmtime(PosFile)
+    if FullPrecision:
+        PosFile = NpzFile
+
+    PosFileData = readOutputFile(PosFile, PosIdx, UseCols=list(PosCols.values()), Fmt=PosFmt)
+    Sod = PosFileData[PosIdx["SOD"]].to_numpy()
+    Sol = PosFileData[PosIdx["SOL"]].to_numpy()
+
+    # The NPA lines are the ones with NPA solution and, without
+    # solution, the second lines of their epochs
+    IsNpa = np.zeros(len(Sod), dtype=bool)
+    if NpaActive:
+        IsNpa = Sol == 2
+        IsNpa[1:] |= (Sol[1:] == 0) & (Sod[1:] == Sod[:-1]) & (Sol[:-1] != 2)
+
+    PosData = OrderedDict({})
+    for Mode, Mask in [("PA", ~IsNpa), ("NPA", IsNpa)]:
+        PosData[Mode] = OrderedDict({})
+        for Field, Col in PosCols.items():
+            PosData[Mode][Field] = PosFileData[Col].to_numpy()[Mask]
+
+        # The safety indexes written in text format are too rounded to
+        # check them against 1: recompute them from the errors and the
+        # protection levels (also rounded, so the check is approximate)
+        if not FullPrecision:
+            for Si, Pe, Pl in [("Hsi", "Hpe", "Hpl"), ("Vsi", "Vpe", "Vpl")]:
+                Pe = PosData[Mode][Pe].astype(np.float64)
+                Pl = PosData[Mode][Pl].astype(np.float64)
+                PosData[Mode][Si] = np.divide(Pe, Pl, out=np.zeros(len(Pe)), where=Pl > 0)
+
+    if not FullPrecision:
+        sys.stderr.write("WARNING: Performances computed from the rounded values of text file %s: " \
+            "the integrity events may differ from the ones of the full run\n" % PosFile)
+
+    return PosData
+
+# End of readPosModes()
+
+def processRcvrDayPerf(Scen, Conf, RcvrInfo, Rcvr, Jd):
+
+    # Purpose: compute the performances of one receiver for one day from
+    #          its existing POS output file, without running the
+    #          preprocessing, corrections and spvt (--perf-only mode)
+
+    # Parameters
+    # ==========
+    # Same as processRcvrDay
+
+    # Returns
+    # =======
+    # Same as processRcvrDay
+
+    # Display Message at the first day of the receiver
+    if Jd == Conf["INI_DATE_JD"]:
+        print( '\n***-----------------------------***')
+        print( '*** Processing receiver: ' + Rcvr + '   ***')
+        print( '***-----------------------------***')
+
+    # Compute Year, Month and Day in order to build input file name
+    Year, Month, Day = convertJulianDay2YearMonthDay(Jd)
+    
+    # Compute the Day of Year (DoY)
+    Doy = convertYearMonthDay2Doy(Year, Month, Day)
 
-                    # Get SoD
-                    Sod = int(float(ObsInfo[0][ObsIdx["SOD"]]))
+    # Display Message
+    print( '\n*** Processing Day of Year: ' + str(Doy) + ' ... ***')
 
-                    # The rest of te analyses are executed every configured sampling rate
-                    if(Sod % Conf["SAMPLING_RATE"] == 0):
-                        # Check if SoD have not already been read
-                        if(SodInputs < Sod):
-                            # Read SAT and LOS info
-                            SatInfo, LosInfo, SodInputs = readCorrectInputs(fsat, flos, Sod)
+    # Compute the performances from the POS file
+    startProfiling(Conf)
+    Cache = openStageCache(Scen, Conf, Rcvr, Year, Doy)
+    Result = runPerfStage(Scen, Conf, RcvrInfo, Rcvr, Year, Doy, Cache)
+    closeStageCache(Cache)
+    stopProfiling(getDayFiles(Scen, Conf, Rcvr, Year, Doy)["PROF"], Rcvr, Year, Doy)
 
-                        # If data is not available, continue to next epoch
-                        if(SatInfo == [] or LosInfo == []):
-                            continue
+    return Result
 
-                        # Correct measurements and estimate the variances with SBAS information
-                        # ----------------------------------------------------------
-                        CorrInfo = runCorrectMeas(Conf, RcvrInfo[Rcvr], PreproObsInfo, SatInfo, LosInfo)
-                    
-                        # If CORR outputs are requested
-                        if Conf["CORR_OUT"] == 1:
-                            # Generate output file
-                            generateCorrFile(fcorr, CorrInfo)
-
-                        # Compute spvt solution and intermediate performances
-                        # ----------------------------------------------------------
-                        # If only PA mode activated
-                        PosInfo = computeSpvtSolution(Conf, RcvrInfo[Rcvr], CorrInfo, Mode = "PA")
-
-                        # If Position information available
-                        if len(PosInfo) > 0:
-                            # Compute intermediate performances for PA services
-                            for Service, PerfInfoSer in PerfInfo.items():
-                                if Service != "NPA":
-                                    updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer)
-
-                            # If SPVT outputs are requested
-                            if Conf["SPVT_OUT"] == 1:
-                                # Generate output file
-                                generatePosFile(fpos, PosInfo, Rcvr)
-
-                        # If NPA mode activated
-                        if Conf["NPA"][0] == 1:
-                            PosInfo = computeSpvtSolution(Conf, RcvrInfo[Rcvr], CorrInfo, Mode = "NPA")
-
-                            # If position information available
-                            if len(PosInfo) > 0:
-                                # Compute intermediate performances for NPA services
-                                for Service, PerfInfoSer in PerfInfo.items():
-                                    if Service == "NPA":
-                                        updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer)
-
-                                # If SPVT outputs are requested
-                                if Conf["SPVT_OUT"] == 1:
-                                    # Generate output file
-                                    generatePosFile(fpos, PosInfo, Rcvr)
-
-                # End if ObsInfo != []:
-                else:
-                    EndOfFile = True
+# End of processRcvrDayPerf()
 
-                # End of if ObsInfo != []:
-                
-            # End of while not EndOfFile:
-    
-        # End of with open(ObsFile, 'r') as f:
+def runWorkUnit(WorkUnit):
 
-        # Compute final performances
-        # ----------------------------------------------------------
-        for Service, PerfInfoSer in PerfInfo.items():
-            computeFinalPerf(PerfInfoSer)
+    # Purpose: run processRcvrDay for one (receiver, day) work unit in a
+    #          worker process, capturing its console messages so that
+    #          they can be displayed in order by the main process
 
-            # If PERF outputs are requested
-            if Conf["PERF_OUT"] == 1:
-                # Generate output file
-                generatePerfFile(fperf, PerfInfoSer)
+    # Parameters
+    # ==========
+    # WorkUnit: tuple
+    #           Processing function (processRcvrDay or processRcvrDayPerf)
+    #           and its arguments: (Function, Scen, Conf, RcvrInfo, Rcvr, Jd)
 
-        # Outputs and Plotting
-        # ----------------------------------------------------------
+    # Returns
+    # =======
+    # Result: tuple
+    #         Processing function outputs (None if the unit failed)
+    # OutLog: str
+    #         Messages written to the standard output
+    # ErrLog: str
+    #         Messages written to the standard error
+    # ExitCode: int
+    #           Exit code requested by the unit (None if it succeeded)
 
-        # If PREPRO outputs are requested
-        if Conf["PREPRO_OUT"] == 1:
-            # Close PREPRO output file
-            fpreprobs.close()
+    Result = None
+    ExitCode = None
+    OutLog = io.StringIO()
+    ErrLog = io.StringIO()
 
-            # Display Message
-            print("INFO: Reading file: %s and generating PREPRO figures..." % PreproObsFile)
+    # Process the work unit capturing the messages
+    with redirect_stdout(OutLog), redirect_stderr(ErrLog):
+        try:
+            Result = WorkUnit[0](*WorkUnit[1:])
 
-            # Generate Preprocessing plots
-            generatePreproPlots(PreproObsFile)
+        except SystemExit as Error:
+            ExitCode = Error.code
 
-        # If CORR outputs are requested
-        if Conf["CORR_OUT"] == 1:
-            # Close CORR output file
-            fcorr.close()
+        except Exception:
+            traceback.print_exc()
+            ExitCode = -1
 
-            # Display Message
-            print("INFO: Reading file: %s and generating CORR figures..." % CorrFile)
+    return Result, OutLog.getvalue(), ErrLog.getvalue(), ExitCode
 
-            # Generate CORR plots
-            generateCorrPlots(CorrFile, SatFile, RcvrInfo[Rcvr])
+# End of runWorkUnit()
 
-        # If SPVT outputs are requested
-        if Conf["SPVT_OUT"] == 1:
-            # Close POS output file
-            fpos.close()
+#######################################################
+# MAIN BODY
+#######################################################
 
-            # Display Message
-            print("INFO: Reading file: %s and generating POS figures..." % PosFile)
+if __name__ == "__main__":
 
-            # Generate POS plots
-            # If only PA mode activated
-            generatePosPlots(PosFile, Mode = "PA")
+    # Check InputOutput Arguments and extract them
+    Scen, NJobs, PerfOnly = readArguments(sys.argv)
 
-            # If NPA mode also activated
-            if Conf["NPA"][0] == 1:
-                generatePosPlots(PosFile, Mode = "NPA")
+    # Select the Configuratiun file name
+    CfgFile = Scen + '/CFG/petrus.cfg'
 
-        # If PERF outputs are requested
-        if Conf["PERF_OUT"] == 1:
-        # Close PERF output file
-            fperf.close()
+    # Read conf file
+    Conf = readConf(CfgFile)
+    # print(dump(Conf))
+
+    # Process Configuration Parameters
+    Conf = processConf(Conf)
+
+    # Select the RCVR Positions file name
+    RcvrFile = Scen + '/INP/RCVR/' + Conf["RCVR_FILE"]
+
+    # Read RCVR Positions file
+    RcvrInfo = readRcvr(RcvrFile)
+
+    # Print header
+    print( '------------------------------------')
+    print( '--> RUNNING PETRUS:')
+    print( '------------------------------------')
+
+    # Initialize Variables
+    PerfFilesList = []
+    Services = []
+
+    # Build the (receiver, day) work units
+    #-----------------------------------------------------------------------
+    # Select the processing of the work units
+    if PerfOnly:
+        ProcessDay = processRcvrDayPerf
+    else:
+        ProcessDay = processRcvrDay
+
+    WorkUnits = []
+    for Rcvr in RcvrInfo.keys():
+        for Jd in range(Conf["INI_DATE_JD"], Conf["END_DATE_JD"] + 1):
+            WorkUnits.append((ProcessDay, Scen, Conf, RcvrInfo, Rcvr, Jd))
+
+    # If only one process is requested
+    if NJobs == 1:
+        # Render the plots in a pool of processes, overlapping with the
+        # processing of the next work units. With several processes, the
+        # plots of every work unit are rendered in its own process
+        openPlotQueue(int(Conf["PLOT_JOBS"]))
+
+        # Loop over RCVRs and Julian Days in simulation
+        for WorkUnit in WorkUnits:
+            PerfFile, Services = WorkUnit[0](*WorkUnit[1:])
 
             # Append file to PerFilesList
-            PerfFilesList.append(PerfFile)
-        
-        # If LPV200 VPE Histogram outputs are requested 
-        if Conf["VPEHIST_OUT"] == 1:
-            # Check if LPV200 service level is activated
-            if "LPV200" not in PerfInfo.keys():
-                sys.stderr.write("ERROR: Please activate LPV200 service level for LPV200 VPE histogram computation \n")
-                sys.exit(1)
+            if PerfFile is not None:
+                PerfFilesList.append(PerfFile)
 
-            # Compute VPE Histogram and generate output file for LPV200 service level
-            computeVpeHist(fhist, PerfInfo["LPV200"], VpeHistInfo)
-            
-            # Close PERF output file
-            fhist.close()
+    else:
+        # Farm out the work units to a pool of processes.
+        # Results are gathered in submission order, so that the output
+        # files, the PerfFilesList and the console messages are the
+        # same as in the serial processing
+        with ProcessPoolExecutor(max_workers = NJobs) as Pool:
+            for Result, OutLog, ErrLog, ExitCode in Pool.map(runWorkUnit, WorkUnits):
+                # Display the messages of the work unit
+                sys.stdout.write(OutLog)
+                sys.stdout.flush()
+                sys.stderr.write(ErrLog)
+                sys.stderr.flush()
 
-            # Display Message
-            print("INFO: Reading file: %s and generating VPE Histogram..." % HistFile)
+                # If the work unit failed, stop the processing
+                if ExitCode is not None:
+                    Pool.shutdown(wait = True, cancel_futures = True)
+                    sys.exit(ExitCode)
 
-            # Generate VPE Histogram plots
-            generateHistPlot(PerfInfo["LPV200"]["ExtVpe"], HistFile)
+                PerfFile, Services = Result
 
-        # Close input files
-        fsat.close()
-        flos.close()
+                # Append file to PerFilesList
+                if PerfFile is not None:
+                    PerfFilesList.append(PerfFile)
 
-    # End of JD loop
+            # End of for Result, OutLog, ErrLog, ExitCode in Pool.map(...):
 
-# End of RCVR loop
+        # End of with ProcessPoolExecutor(max_workers = NJobs) as Pool:
 
-# If PERF outputs are requested 
-if Conf["PERF_OUT"] == 1:           
-    # Display Message
-    print( '\n------------------------------------')
-    print("INFO: Reading PerfFilesList and generating PERF figures for all receivers...")
+    # End of if NJobs == 1:
 
-    # Generate PERF plots
-    for Service in PerfInfo.keys():
-        generatePerfPlots(Service, PerfFilesList)
+    # If PERF outputs are requested 
+    if Conf["PERF_OUT"] == 1:           
+        # Display Message
+        print( '\n------------------------------------')
+        print("INFO: Reading PerfFilesList and generating PERF figures for all receivers...")
 
-print( '\n------------------------------------')
-print( '--> END OF PETRUS ANALYSIS')
-print( '------------------------------------')
+        # Generate PERF plots
+        from PerfPlots import generatePerfPlots
+        for Service in Services:
+            generatePerfPlots(Service, PerfFilesList)
+
+    # Wait for all the queued plots
+    NFailedPlots = closePlotQueue()
+    if NFailedPlots > 0:
+        sys.stderr.write("ERROR: %d plots could not be generated\n" % NFailedPlots)
+        sys.exit(-1)
+
+    print( '\n------------------------------------')
+    print( '--> END OF PETRUS ANALYSIS')
+    print( '------------------------------------')
 
 #######################################################
 # End of Petrus.py
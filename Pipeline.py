@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/Pipeline.py:
+# This is the Pipeline Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           Pipeline.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+Common = os.path.dirname(os.path.dirname(
+    os.path.abspath(sys.argv[0]))) + '/COMMON'
+sys.path.insert(0, Common)
+import gc
+from InputOutput import ObsIdx
+from InputOutput import readObsChunks, readObsEpochs
+from InputOutput import readIndexedCorrectInputs, indexEpochByLabel
+from InputOutput import SatIdx, LosIdx
+from InputOutput import generatePreproFile, generateCorrFile, generatePosFile
+from InputOutput import endOutputEpoch, flushOutputRows, dropOutputColumns
+from InputOutput import decimateOutputColumns
+from Preprocessing import runPreProcMeas, runPreProcMeasVec
+from Corrections import runCorrectMeas, runCorrectMeasVec
+from Spvt import computeSpvtEpochs
+from Perf import updatePerfEpoch
+from Profiling import profileStage, markProfilingEpochs
+
+# Pipeline internal parameters
+#-----------------------------------------------------------------------
+# Growth of the memory since the last release, as a fraction of the
+# ceiling, needed to release it again, not to release it at every batch
+PIPE_MEM_HYST = 0.1
+
+# Maximum reduction of the plot data kept in memory (one epoch out of
+# PIPE_PLOT_DECIM_MAX). Beyond it, the plot data is dropped and the plots
+# read the output files back
+PIPE_PLOT_DECIM_MAX = 64
+
+# Pipeline internal functions
+#-----------------------------------------------------------------------
+
+def getMemoryUsage():
+
+    # Purpose: get the memory currently used by the process [MB]
+
+    # Returns
+    # =======
+    # Memory: float
+    #         Resident memory of the process. If it cannot be read
+    #         (non Linux systems), the peak resident memory is returned
+
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+# End of getMemoryUsage()
+
+def initPipelineControl(Conf):
+
+    # Purpose: initialize the pipeline control
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+
+    # Returns
+    # =======
+    # Control: dict
+    #          Pipeline control, shared by all the stages
+
+    Control = {
+        "BatchEpochs": Conf["PIPE_BATCH_EPOCHS"],   # Number of epochs per batch
+        "BatchIni": Conf["PIPE_BATCH_EPOCHS"],      # Configured number of epochs per batch
+        "MemMax": Conf["PIPE_MEM_MAX"],             # Memory growth ceiling [MB] (0: none)
+        "MemBase": 0.0,                             # Memory at the start of the pipeline [MB]
+        "MemReleased": 0.0,                         # Memory growth after the last release [MB]
+        "Governed": Conf["PIPE_MEM_MAX"] > 0,       # Memory ceiling still enforced
+    } # End of Control
+
+    # The ceiling applies to the memory used by the pipeline, not to the
+    # memory already used by the process (e.g. libraries and inputs)
+    if Control["Governed"]:
+        Control["MemBase"] = getMemoryUsage()
+
+    return Control
+
+# End of initPipelineControl()
+
+def governMemory(Control, Writers):
+
+    # Purpose: keep the memory used by the pipeline (growth of the
+    #          memory since its start) under the configured ceiling. When
+    #          it is exceeded, the buffered output rows are written, the
+    #          output columns kept in memory for the plots are halved (or
+    #          dropped beyond PIPE_PLOT_DECIM_MAX, the plots then reading
+    #          the files back) and the number of epochs per batch is
+    #          halved. The memory is only released again when it has
+    #          grown by PIPE_MEM_HYST of the ceiling since the last
+    #          release, and the ceiling is given up (with the configured
+    #          batches) when it cannot be met with batches of 1 epoch
+
+    # Parameters
+    # ==========
+    # Control: dict
+    #          Pipeline control
+    # Writers: list
+    #          Output file writers fed by the pipeline
+
+    # Returns
+    # =======
+    # Nothing
+
+    # If no memory ceiling, nothing to do
+    if not Control["Governed"]:
+        return
+
+    Memory = getMemoryUsage() - Control["MemBase"]
+    if Memory <= Control["MemMax"] or \
+        Memory <= Control["MemReleased"] + PIPE_MEM_HYST * Control["MemMax"]:
+        return
+
+    # Release the memory held by the output writers
+    for f in Writers:
+        if f["Format"] == "TXT":
+            flushOutputRows(f)
+
+        # Reduce the plot data kept in memory
+        if f["Decim"] < PIPE_PLOT_DECIM_MAX:
+            decimateOutputColumns(f)
+        else:
+            dropOutputColumns(f)
+
+    # Reduce the batches
+    Control["BatchEpochs"] = max(Control["BatchEpochs"] // 2, 1)
+    print("INFO: Memory growth %.0f MB above PIPE_MEM_MAX: processing batches of %d epochs, " \
+        "plots of 1 epoch out of %d" % (Memory, Control["BatchEpochs"], max([f["Decim"] for f in Writers] + [1])))
+
+    gc.collect()
+    Control["MemReleased"] = getMemoryUsage() - Control["MemBase"]
+
+    # If the ceiling cannot be met, warn and stop enforcing it: the
+    # batches are not reduced in vain
+    if Control["BatchEpochs"] == 1 and Control["MemReleased"] > Control["MemMax"]:
+        Control["BatchEpochs"] = Control["BatchIni"]
+        sys.stderr.write("WARNING: Memory growth above PIPE_MEM_MAX (%d MB) with batches of 1 epoch: " \
+            "processing batches of %d epochs again\n" % (Control["MemMax"], Control["BatchEpochs"]))
+        Control["Governed"] = False
+
+# End of governMemory()
+
+# Pipeline stages
+#-----------------------------------------------------------------------
+# Every stage consumes an iterator of epoch batches and yields them back,
+# after adding its own outputs:
+#   Batch["Obs"]: OBS info of each epoch (readStage)
+#   Batch["Prepro"]: PreproObsInfo of each epoch (preproStage)
+#   Batch["Corr"]: CorrInfo of each epoch, None if not sampled (corrStage)
+#   Batch["Pos"]: PosInfo of each sampled epoch, per mode (spvtStage)
+
+def readStage(ObsFile, Control):
+
+    # Purpose: read the OBS file by batches of epochs
+
+    for ObsData, EpochIdx in readObsChunks(ObsFile, Control):
+        with profileStage("READ_OBS"):
+            Batch = {"Obs": list(readObsEpochs(ObsData, EpochIdx))}
+
+        yield Batch
+
+# End of readStage()
+
+def preproStage(Conf, RcvrInfo, Batches, PreproState):
+
+    # Purpose: preprocess the OBS measurements of each batch. PreproState
+    #          is the state of the selected preprocessing engine: the
+    #          arrays of initPreproState (VECTOR) or the previous
+    #          preprocessing info per satellite (SCALAR)
+
+    for Batch in Batches:
+        with profileStage("PREPRO"):
+            if Conf["PREPRO_ENGINE"] == "VECTOR":
+                Batch["Prepro"] = [runPreProcMeasVec(Conf, RcvrInfo, ObsInfo, PreproState) \
+                    for ObsInfo in Batch["Obs"]]
+            else:
+                Batch["Prepro"] = [runPreProcMeas(Conf, RcvrInfo, ObsInfo, PreproState) \
+                    for ObsInfo in Batch["Obs"]]
+
+        yield Batch
+
+# End of preproStage()
+
+def corrStage(Conf, RcvrInfo, Batches, SatInput, LosInput):
+
+    # Purpose: correct the preprocessed measurements of the epochs of each
+    #          batch at the configured sampling rate
+
+    for Batch in Batches:
+        Batch["Corr"] = []
+
+        for ObsInfo, PreproObsInfo in zip(Batch["Obs"], Batch["Prepro"]):
+            CorrInfo = None
+
+            # Get SoD
+            Sod = int(float(ObsInfo[0][ObsIdx["SOD"]]))
+
+            # The rest of te analyses are executed every configured sampling rate
+            if(Sod % Conf["SAMPLING_RATE"] == 0):
+                # Read SAT and LOS info of the epoch
+                with profileStage("READ_CORR_INPUTS"):
+                    SatData, LosData = readIndexedCorrectInputs(SatInput, LosInput, Sod)
+
+                # Correct measurements and estimate the variances with SBAS information
+                with profileStage("CORR"):
+                    if Conf["CORR_ENGINE"] == "VECTOR":
+                        CorrInfo = runCorrectMeasVec(Conf, RcvrInfo, PreproObsInfo, SatData, LosData)
+                    else:
+                        SatInfo = indexEpochByLabel(SatData, SatIdx)
+                        LosInfo = indexEpochByLabel(LosData, LosIdx)
+                        CorrInfo = runCorrectMeas(Conf, RcvrInfo, PreproObsInfo, SatInfo, LosInfo)
+
+            Batch["Corr"].append(CorrInfo)
+
+        yield Batch
+
+# End of corrStage()
+
+def spvtStage(Conf, RcvrInfo, Batches):
+
+    # Purpose: compute the spvt solution of the sampled epochs of each
+    #          batch, all of them together
+
+    for Batch in Batches:
+        CorrInfoList = [CorrInfo for CorrInfo in Batch["Corr"] if CorrInfo is not None]
+        with profileStage("SPVT"):
+            Batch["Pos"] = computeSpvtEpochs(Conf, RcvrInfo, CorrInfoList)
+
+        yield Batch
+
+# End of spvtStage()
+
+def perfStage(Conf, Batches, PerfInfo):
+
+    # Purpose: update the intermediate performances with the spvt solution
+    #          of each batch, in the epochs order and PA before NPA
+
+    for Batch in Batches:
+        PosInfoBatch = Batch["Pos"]
+        NEpochs = len(PosInfoBatch["PA"])
+
+        with profileStage("PERF"):
+            for Epoch in range(NEpochs):
+                for Mode in PosInfoBatch:
+                    PosInfo = PosInfoBatch[Mode][Epoch]
+
+                    # If Position information available
+                    if len(PosInfo) > 0:
+                        for Service, PerfInfoSer in PerfInfo.items():
+                            if (Service == "NPA") == (Mode == "NPA"):
+                                updatePerfEpoch(Conf, Service, PosInfo, PerfInfoSer)
+
+        yield Batch
+
+# End of perfStage()
+
+def sinkStage(Conf, Batches, Rcvr, Sinks, Control):
+
+    # Purpose: write the outputs of each batch (PREPRO, CORR and POS
+    #          files, and their columns kept for the plots) and keep the
+    #          memory under control before the next batch is read
+
+    # Sinks["PREPRO"], Sinks["CORR"] and Sinks["POS"] are the output file
+    # writers, None if the output is not requested
+    Writers = [f for f in Sinks.values() if f is not None]
+
+    for Batch in Batches:
+        # PREPRO and CORR outputs
+        with profileStage("WRITE_PREPRO_CORR"):
+            for PreproObsInfo, CorrInfo in zip(Batch["Prepro"], Batch["Corr"]):
+                if Sinks["PREPRO"] is not None:
+                    generatePreproFile(Sinks["PREPRO"], PreproObsInfo)
+
+                if Sinks["CORR"] is not None and CorrInfo is not None:
+                    generateCorrFile(Sinks["CORR"], CorrInfo)
+
+                # Write the buffered output rows according to the flush policy
+                for f in Writers:
+                    endOutputEpoch(f)
+
+        # POS outputs
+        if Sinks["POS"] is not None:
+            with profileStage("WRITE_POS"):
+                PosInfoBatch = Batch["Pos"]
+                for Epoch in range(len(PosInfoBatch["PA"])):
+                    for Mode in PosInfoBatch:
+                        if len(PosInfoBatch[Mode][Epoch]) > 0:
+                            generatePosFile(Sinks["POS"], PosInfoBatch[Mode][Epoch], Rcvr)
+
+        # Check the memory before reading the next batch
+        governMemory(Control, Writers)
+
+        # The epochs of the batch are timed together
+        markProfilingEpochs(len(Batch["Obs"]), Batch = True)
+
+        yield Batch
+
+# End of sinkStage()
+
+# Pipeline main function
+#-----------------------------------------------------------------------
+
+def runPipeline(Conf, RcvrInfo, Rcvr, ObsFile, PreproState, SatInput, LosInput, PerfInfo, Sinks):
+
+    # Purpose: process one receiver day as a chain of generator stages
+    #          over batches of epochs:
+    #          read -> prepro -> corr -> spvt -> perf -> sinks
+    #          Only one batch is kept in memory at a time, and the
+    #          batches are reduced when the memory goes above the
+    #          configured ceiling (PIPE_MEM_MAX)
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: list
+    #           Receiver information: position, masking angle...
+    # Rcvr: str
+    #       Receiver acronym
+    # ObsFile: str
+    #          Path to OBS file
+    # PreproState: dict
+    #              State of the preprocessing engine
+    # SatInput: dict
+    #           Indexed SAT input file
+    # LosInput: dict
+    #           Indexed LOS input file
+    # PerfInfo: dict
+    #           Performances information per service level
+    # Sinks: dict
+    #        Output file writers per output (PREPRO, CORR, POS)
+
+    # Returns
+    # =======
+    # Nothing
+
+    Control = initPipelineControl(Conf)
+
+    # Chain the stages
+    Batches = readStage(ObsFile, Control)
+    Batches = preproStage(Conf, RcvrInfo, Batches, PreproState)
+    Batches = corrStage(Conf, RcvrInfo, Batches, SatInput, LosInput)
+    Batches = spvtStage(Conf, RcvrInfo, Batches)
+    Batches = perfStage(Conf, Batches, PerfInfo)
+    Batches = sinkStage(Conf, Batches, Rcvr, Sinks, Control)
+
+    # Drain the pipeline
+    for Batch in Batches:
+        pass
+
+# End of runPipeline()
+
+########################################################################
+# END OF PIPELINE FUNCTIONS MODULE
+########################################################################
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/PlotQueue.py:
+# This is the Plot Queue Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           PlotQueue.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+Common = os.path.dirname(os.path.dirname(
+    os.path.abspath(sys.argv[0]))) + '/COMMON'
+sys.path.insert(0, Common)
+from concurrent.futures import ProcessPoolExecutor
+from Profiling import profileStage
+
+# Plot queue internal parameters
+#-----------------------------------------------------------------------
+# Plot jobs queued per rendering process before waiting for the oldest
+# one, not to keep the data of too many plots in memory
+PLOT_JOBS_PER_PROC = 4
+
+# Plot queue of the process: pool of rendering processes (None if the
+# plots are rendered when they are queued), its number of processes,
+# pending plot jobs and group of the plots being queued (None if not
+# grouped)
+PlotQueue = {"Pool": None, "NProcs": 0, "Jobs": [], "NFailed": 0, "Group": None}
+
+# Plot queue internal functions
+#-----------------------------------------------------------------------
+
+def initPlotProc():
+
+    # Purpose: initialize a rendering process with a non-interactive
+    #          backend
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.switch_backend("Agg")
+
+# End of initPlotProc()
+
+def endPlotGroup(Group):
+
+    # Purpose: notify the end of a group of plots, once it is closed and
+    #          all its plots are rendered, if none of them failed
+
+    if Group["OnDone"] is not None and Group["NPending"] == 0 and Group["NFailed"] == 0:
+        OnDone = Group["OnDone"]
+        Group["OnDone"] = None
+        OnDone(Group["Paths"])
+
+# End of endPlotGroup()
+
+def waitPlotJob():
+
+    # Purpose: wait for the oldest pending plot job and report its errors
+
+    Path, Job, Group = PlotQueue["Jobs"].pop(0)
+
+    try:
+        Job.result()
+
+    except Exception as Error:
+        sys.stderr.write("ERROR: Plot %s could not be generated: %s\n" % (Path, Error))
+        PlotQueue["NFailed"] = PlotQueue["NFailed"] + 1
+        if Group is not None:
+            Group["NFailed"] = Group["NFailed"] + 1
+
+    if Group is not None:
+        Group["NPending"] = Group["NPending"] - 1
+        endPlotGroup(Group)
+
+# End of waitPlotJob()
+
+# Plot queue main functions
+#-----------------------------------------------------------------------
+
+def openPlotQueue(NProcs):
+
+    # Purpose: start the pool of processes rendering the plots
+
+    # Parameters
+    # ==========
+    # NProcs: int
+    #         Number of rendering processes (0: the plots are rendered
+    #         when they are queued, in the calling process)
+
+    # Returns
+    # =======
+    # Nothing
+
+    if NProcs > 0:
+        PlotQueue["Pool"] = ProcessPoolExecutor(max_workers = NProcs, initializer = initPlotProc)
+        PlotQueue["NProcs"] = NProcs
+
+# End of openPlotQueue()
+
+def queuePlot(PlotConf, PlotFunc=None):
+
+    # Purpose: queue the generation of a plot to the rendering processes,
+    #          or generate it if there are no rendering processes
+
+    # Parameters
+    # ==========
+    # PlotConf: dict
+    #           Plot configuration, with the data to be plotted
+    # PlotFunc: function
+    #           Module-level function generating the plot from PlotConf
+    #           (by default, generatePlot from Plots library)
+
+    # Returns
+    # =======
+    # Nothing
+
+    # Plots library imported with the first plot
+    if PlotFunc is None:
+        from COMMON.Plots import generatePlot
+        PlotFunc = generatePlot
+
+    # Plots timed by the name of their figures directory
+    Name = "PLOT " + (os.path.basename(os.path.dirname(PlotConf["Path"])) or \
+        os.path.basename(PlotConf["Path"]))
+
+    Group = PlotQueue["Group"]
+    if Group is not None:
+        Group["Paths"].append(PlotConf["Path"])
+
+    if PlotQueue["Pool"] is None:
+        with profileStage(Name):
+            PlotFunc(PlotConf)
+        return
+
+    # Bound the number of pending plot jobs
+    if len(PlotQueue["Jobs"]) >= PLOT_JOBS_PER_PROC * PlotQueue["NProcs"]:
+        waitPlotJob()
+
+    # Only the submission of the plot is timed when it is queued
+    with profileStage(Name):
+        PlotQueue["Jobs"].append((PlotConf["Path"], PlotQueue["Pool"].submit(PlotFunc, PlotConf), Group))
+
+    if Group is not None:
+        Group["NPending"] = Group["NPending"] + 1
+
+# End of queuePlot()
+
+def openPlotGroup():
+
+    # Purpose: start a group of plots: the plots queued until the group is
+    #          closed are part of it
+
+    # Returns
+    # =======
+    # Nothing
+
+    PlotQueue["Group"] = {
+        "Paths": [],                                # Paths to the figures
+        "NPending": 0,                              # Plots not rendered yet
+        "NFailed": 0,                               # Plots which failed
+        "OnDone": None,                             # Function called at the end
+    } # End of PlotQueue["Group"]
+
+# End of openPlotGroup()
+
+def closePlotGroup(OnDone):
+
+    # Purpose: close the current group of plots. OnDone is called with the
+    #          paths to its figures when all of them are rendered (at once
+    #          if there are no rendering processes), unless some failed
+
+    # Parameters
+    # ==========
+    # OnDone: function
+    #         Function called with the list of paths to the figures
+
+    # Returns
+    # =======
+    # Nothing
+
+    Group = PlotQueue["Group"]
+    PlotQueue["Group"] = None
+
+    Group["OnDone"] = OnDone
+    endPlotGroup(Group)
+
+# End of closePlotGroup()
+
+def closePlotQueue():
+
+    # Purpose: wait for all the queued plots and stop the rendering
+    #          processes
+
+    # Returns
+    # =======
+    # NFailed: int
+    #          Number of plots which could not be generated
+
+    while len(PlotQueue["Jobs"]) > 0:
+        waitPlotJob()
+
+    if PlotQueue["Pool"] is not None:
+        PlotQueue["Pool"].shutdown(wait = True)
+        PlotQueue["Pool"] = None
+        PlotQueue["NProcs"] = 0
+
+    return PlotQueue["NFailed"]
+
+# End of closePlotQueue()
+
+########################################################################
+# END OF PLOT QUEUE FUNCTIONS MODULE
+########################################################################
@@ -18,15 +18,31 @@
 ########################################################################
 
 import sys, os
-from pandas import read_csv
-from InputOutput import PosIdx
+from InputOutput import readPlotsData
+from InputOutput import PosIdx, PosFmt
+from InputOutput import writeHist2D
+from Histogram import initHist2D, addHist2DValues, getHist2DCells
 sys.path.append(os.getcwd() + '/' + \
     os.path.dirname(sys.argv[0]) + '/' + 'COMMON')
 from COMMON import GnssConstants
-from COMMON.Plots import generatePlot
+from PlotQueue import queuePlot
 from ConPlots import ConfPos
 import numpy as np
-from scipy.stats import gaussian_kde
+from collections import OrderedDict
+
+# Columns read for each plot
+POS_PLOT_COLS = OrderedDict({})
+POS_PLOT_COLS["PLOT_DOP"] = ["SOD", "NVS-SOL", "HDOP", "VDOP", "PDOP", "TDOP", "SOL"]
+POS_PLOT_COLS["PLOT_ERR_vs_LIM"] = ["SOD", "HPE", "VPE", "HPL", "VPL", "SOL"]
+POS_PLOT_COLS["PLOT_ERROR"] = ["SOD", "HPE", "VPE", "SOL"]
+POS_PLOT_COLS["PLOT_HPE_vs_HDOP"] = ["EPE", "NPE", "HDOP", "SOL"]
+POS_PLOT_COLS["PLOT_SAF_INDEX"] = ["SOD", "HSI", "VSI", "SOL"]
+POS_PLOT_COLS["PLOT_HOR_STANDFORD"] = ["HPE", "HPL", "SOL"]
+POS_PLOT_COLS["PLOT_VER_STANDFORD"] = ["VPE", "VPL", "SOL"]
+
+# Standford diagrams grids: cell resolution and upper limit per mode [m]
+STANFORD_RES = {"PA": 0.1, "NPA": 1.0}
+STANFORD_MAX = {"PA": 100.0, "NPA": 1000.0}
 
 def initPlot(PosFile, PlotConf, Title, Label, Sol):
     
@@ -85,8 +101,8 @@ def plotDops(PosFile, PosData, Sol):
             PlotConf["xData"][Label] = PosData[PosIdx["SOD"]] / GnssConstants.S_IN_H
             PlotConf["yData"][Label] = PosData[PosIdx[Label]]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Position Errors vs Position Limits
 def plotErrorVsLimit(PosFile, PosData, Sol):
@@ -117,8 +133,8 @@ def plotErrorVsLimit(PosFile, PosData, Sol):
         PlotConf["xData"][Label] = PosData[PosIdx["SOD"]][FilterCond] / GnssConstants.S_IN_H
         PlotConf["yData"][Label] = abs(PosData[PosIdx[Label]][FilterCond].to_numpy())
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Position Errors
 def plotErrors(PosFile, PosData, Sol):
@@ -149,8 +165,8 @@ def plotErrors(PosFile, PosData, Sol):
         PlotConf["xData"][Label] = PosData[PosIdx["SOD"]][FilterCond] / GnssConstants.S_IN_H
         PlotConf["yData"][Label] = PosData[PosIdx[Label]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot HPE vs HDOP
 def plotHorizontalPE(PosFile, PosData, Sol):
@@ -187,8 +203,8 @@ def plotHorizontalPE(PosFile, PosData, Sol):
     PlotConf["yData"][Label] = PosData[PosIdx["NPE"]][FilterCond]
     PlotConf["zData"][Label] = PosData[PosIdx["HDOP"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Safety Index
 def plotSafeIndex(PosFile, PosData, Sol):
@@ -220,15 +236,78 @@ def plotSafeIndex(PosFile, PosData, Sol):
         PlotConf["xData"][Label] = PosData[PosIdx["SOD"]][FilterCond] / GnssConstants.S_IN_H
         PlotConf["yData"][Label] = abs(PosData[PosIdx[Label]][FilterCond].to_numpy())
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
-# Plot Horizontal Standford Diagram
-def plotHorStand(PosFile, PosData, Sol):
+def computeStanfordGrids(PosData, Sol):
 
-    # Graph settings definition
-    PlotConf = {}
-    initPlot(PosFile, PlotConf, "Horizontal Standford Diagram", "HOR_STANDFORD_DIAGRAM", Sol[0])
+    # Purpose: count the epochs of the solution in the cells of the
+    #          activated Standford diagrams
+
+    # Parameters
+    # ==========
+    # PosData: pandas.DataFrame
+    #          POS columns
+    # Sol: list
+    #      Solution mode and SOL flag
+
+    # Returns
+    # =======
+    # Grids: dict
+    #        2D histogram (error, protection level) per diagram (HOR, VER)
+
+    FilterCond = PosData[PosIdx["SOL"]] == Sol[1]
+    Grids = OrderedDict({})
+
+    if(ConfPos["PLOT_HOR_STANDFORD"] == 1):
+        Grids["HOR"] = initHist2D(STANFORD_RES[Sol[0]], STANFORD_MAX[Sol[0]])
+        addHist2DValues(Grids["HOR"], PosData[PosIdx["HPE"]][FilterCond].to_numpy(),
+            PosData[PosIdx["HPL"]][FilterCond].to_numpy())
+
+    if(ConfPos["PLOT_VER_STANDFORD"] == 1):
+        Grids["VER"] = initHist2D(STANFORD_RES[Sol[0]], STANFORD_MAX[Sol[0]])
+        addHist2DValues(Grids["VER"], abs(PosData[PosIdx["VPE"]][FilterCond].to_numpy()),
+            PosData[PosIdx["VPL"]][FilterCond].to_numpy())
+
+    return Grids
+
+# End of computeStanfordGrids()
+
+def plotStanfordGrid(PlotConf, Grid):
+
+    # Purpose: plot the non-empty cells of a Standford diagram grid,
+    #          colored by their number of samples in log scale
+
+    # Processing data to be plotted
+    XData, YData, Counts = getHist2DCells(Grid)
+    # Sort cells by number of samples, so the densest ones are on top
+    idx = Counts.argsort()
+    XData, YData, ZData = XData[idx], YData[idx], np.log10(Counts[idx])
+
+    # Colorbar definition
+    PlotConf["ColorBar"] = "gnuplot"
+    PlotConf["ColorBarLabel"] = "Log10 Number of Samples per Cell (Number of Samples : " + \
+        str(Grid["NSamples"]) + ")"
+    PlotConf["ColorBarMin"] = min(ZData) if len(ZData) > 0 else 0.0
+    PlotConf["ColorBarMax"] = max(ZData) if len(ZData) > 0 else 1.0
+    PlotConf["ColorBarTicks"] = None
+
+    # Plotting
+    PlotConf["xData"] = {}
+    PlotConf["yData"] = {}
+    PlotConf["zData"] = {}
+    Label = 0
+    PlotConf["xData"][Label] = XData
+    PlotConf["yData"][Label] = YData
+    PlotConf["zData"][Label] = ZData
+
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
+
+# End of plotStanfordGrid()
+
+# Horizontal Standford Diagram settings
+def initHorStand(PlotConf, Sol):
 
     PlotConf["Type"] = "Lines"
     PlotConf["FigSize"] = (8.4,7.6)
@@ -252,45 +331,21 @@ def plotHorStand(PosFile, PosData, Sol):
 
     PlotConf["Grid"] = True
     
-    PlotConf["Marker"] = '.'
+    PlotConf["Marker"] = 's'
     PlotConf["LineWidth"] = 1.5
 
-    # Processing data to be plotted
-    FilterCond = PosData[PosIdx["SOL"]] == Sol[1]
-    Hpe = PosData[PosIdx["HPE"]][FilterCond].to_numpy()
-    Hpl = PosData[PosIdx["HPL"]][FilterCond].to_numpy()
-    # Get point density data
-    Den = np.vstack([Hpe,Hpl])
-    ZData = gaussian_kde(Den)(Den)
-    # Sort data by point density values
-    idx = ZData.argsort()
-    Hpe, Hpl, ZData = Hpe[idx], Hpl[idx], ZData[idx]
-
-    # Colorbar definition
-    PlotConf["ColorBar"] = "gnuplot"
-    PlotConf["ColorBarLabel"] = "Point Density (Number of Samples : " + str(len(Hpe)) + ")"
-    PlotConf["ColorBarMin"] = min(ZData)
-    PlotConf["ColorBarMax"] = max(ZData)
-    PlotConf["ColorBarTicks"] = None
-
-    # Plotting
-    PlotConf["xData"] = {}
-    PlotConf["yData"] = {}
-    PlotConf["zData"] = {}
-    Label = 0
-    PlotConf["xData"][Label] = Hpe
-    PlotConf["yData"][Label] = Hpl
-    PlotConf["zData"][Label] = ZData
-
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
-
-# Plot Vertical Standford Diagram
-def plotVerStand(PosFile, PosData, Sol):
+# Plot Horizontal Standford Diagram
+def plotHorStand(PosFile, Grid, Sol):
 
     # Graph settings definition
     PlotConf = {}
-    initPlot(PosFile, PlotConf, "Vertical Standford Diagram", "VER_STANDFORD_DIAGRAM", Sol[0])
+    initPlot(PosFile, PlotConf, "Horizontal Standford Diagram", "HOR_STANDFORD_DIAGRAM", Sol[0])
+    initHorStand(PlotConf, Sol)
+
+    plotStanfordGrid(PlotConf, Grid)
+
+# Vertical Standford Diagram settings
+def initVerStand(PlotConf, Sol):
 
     PlotConf["Type"] = "Lines"
     PlotConf["FigSize"] = (8.4,7.6)
@@ -312,49 +367,32 @@ def plotVerStand(PosFile, PosData, Sol):
 
     PlotConf["Grid"] = True
     
-    PlotConf["Marker"] = '.'
+    PlotConf["Marker"] = 's'
     PlotConf["LineWidth"] = 1.5
 
-    # Processing data to be plotted
-    FilterCond = PosData[PosIdx["SOL"]] == Sol[1]
-    Vpe = PosData[PosIdx["VPE"]][FilterCond].to_numpy()
-    Vpl = PosData[PosIdx["VPL"]][FilterCond].to_numpy()
-    # Get point density data
-    Den = np.vstack([Vpe,Vpl])
-    ZData = gaussian_kde(Den)(Den)
-    # Sort data by point density values
-    idx = ZData.argsort()
-    Vpe, Vpl, ZData = Vpe[idx], Vpl[idx], ZData[idx]
-
-    # Colorbar definition
-    PlotConf["ColorBar"] = "gnuplot"
-    PlotConf["ColorBarLabel"] = "Point Density (Number of Samples : " + str(len(Vpe)) + ")"
-    PlotConf["ColorBarMin"] = min(ZData)
-    PlotConf["ColorBarMax"] = max(ZData)
-    PlotConf["ColorBarTicks"] = None
+# Plot Vertical Standford Diagram
+def plotVerStand(PosFile, Grid, Sol):
 
-    # Plotting
-    PlotConf["xData"] = {}
-    PlotConf["yData"] = {}
-    PlotConf["zData"] = {}
-    Label = 0
-    PlotConf["xData"][Label] = abs(Vpe)
-    PlotConf["yData"][Label] = Vpl
-    PlotConf["zData"][Label] = ZData
+    # Graph settings definition
+    PlotConf = {}
+    initPlot(PosFile, PlotConf, "Vertical Standford Diagram", "VER_STANDFORD_DIAGRAM", Sol[0])
+    initVerStand(PlotConf, Sol)
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    plotStanfordGrid(PlotConf, Grid)
 
-def generatePosPlots(PosFile, Mode):
+def generatePosPlots(PosFile, Mode, StanfordFile=None):
     
     # Purpose: generate output plots regarding svpt results
 
     # Parameters
     # ==========
-    # Conf: dict
-    #       Configuration dictionary
     # PosFile: str
     #          Path to POS output file
+    # Mode: str
+    #       Solution mode (PA or NPA)
+    # StanfordFile: str
+    #               Path to the Standford diagrams grids output file
+    #               (not written if None)
 
     # Returns
     # =======
@@ -371,13 +409,12 @@ def generatePosPlots(PosFile, Mode):
     # PLOTTING FUNCTIONS
     # ----------------------------------------------------------
 
+    # Read once the columns needed by all the activated plots
+    PosData = readPlotsData(PosFile, PosIdx, PosFmt, ConfPos, POS_PLOT_COLS)
+
     # DOPS vs TIME
     # ----------------------------------------------------------
     if(ConfPos["PLOT_DOP"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["SOD"],PosIdx["NVS-SOL"],PosIdx["HDOP"],PosIdx["VDOP"],PosIdx["PDOP"],PosIdx["TDOP"],PosIdx["SOL"]])
-
         print( 'Plot DOPS vs Time in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
@@ -386,10 +423,6 @@ def generatePosPlots(PosFile, Mode):
     # POSITION ERRORS VS POSITION LIMITS
     # ----------------------------------------------------------
     if(ConfPos["PLOT_ERR_vs_LIM"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["SOD"],PosIdx["HPE"],PosIdx["VPE"],PosIdx["HPL"],PosIdx["VPL"],PosIdx["SOL"]])
-
         print( 'Plot Position Errors vs Position Limits vs Time in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
@@ -398,10 +431,6 @@ def generatePosPlots(PosFile, Mode):
     # POSITION ERRORS vs TIME
     # ----------------------------------------------------------
     if(ConfPos["PLOT_ERROR"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["SOD"],PosIdx["HPE"],PosIdx["VPE"],PosIdx["SOL"]])
-
         print( 'Plot Position Errors vs Time in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
@@ -410,10 +439,6 @@ def generatePosPlots(PosFile, Mode):
     # HORIZONTAL POSITION ERROR vs HDOP
     # ----------------------------------------------------------
     if(ConfPos["PLOT_HPE_vs_HDOP"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["EPE"],PosIdx["NPE"],PosIdx["HDOP"],PosIdx["SOL"]])
-
         print( 'Plot Horizontal Position Error vs HDOP in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
@@ -422,35 +447,34 @@ def generatePosPlots(PosFile, Mode):
     # SAFETY INDEX vs TIME
     # ----------------------------------------------------------
     if(ConfPos["PLOT_SAF_INDEX"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["SOD"],PosIdx["HSI"],PosIdx["VSI"],PosIdx["SOL"]])
-
         print( 'Plot Safety Index vs Time in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
         plotSafeIndex(PosFile, PosData, Sol)
 
+    # STANDFORD DIAGRAMS GRIDS
+    # ----------------------------------------------------------
+    Grids = OrderedDict({})
+    if(ConfPos["PLOT_HOR_STANDFORD"] == 1 or ConfPos["PLOT_VER_STANDFORD"] == 1):
+        Grids = computeStanfordGrids(PosData, Sol)
+
+        # Write them to build Standford diagrams of several days or
+        # receivers by summing their grids
+        if StanfordFile is not None:
+            writeHist2D(StanfordFile, Grids)
+
     # HORIZONTAL STANDFORD DIAGRAM
     # ----------------------------------------------------------
     if(ConfPos["PLOT_HOR_STANDFORD"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["HPE"],PosIdx["HPL"],PosIdx["SOL"]])
-
         print( 'Plot Horizontal Standford Diagram in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
-        plotHorStand(PosFile, PosData, Sol)
+        plotHorStand(PosFile, Grids["HOR"], Sol)
 
     # VERTICAL STANDFORD DIAGRAM
     # ----------------------------------------------------------
     if(ConfPos["PLOT_VER_STANDFORD"] == 1):
-        # Read the cols we need from PosFile file
-        PosData = read_csv(PosFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PosIdx["VPE"],PosIdx["VPL"],PosIdx["SOL"]])
-
         print( 'Plot Vertical Standford Diagram in ' + Sol[0] + ' mode...')
       
         # Configure plot and call plot generation function
-        plotVerStand(PosFile, PosData, Sol)
\ No newline at end of file
+        plotVerStand(PosFile, Grids["VER"], Sol)
\ No newline at end of file
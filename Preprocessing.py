@@ -65,8 +65,9 @@ def runPreProcMeas(Conf, Rcvr, ObsInfo, PrevPreproObsInfo):
     #         Configuration dictionary
     # Rcvr: list
     #         Receiver information: position, masking angle...
-    # ObsInfo: list
-    #         OBS info for current epoch
+    # ObsInfo: list or numpy.ndarray
+    #         OBS info for current epoch (split lines or rows
+    #         of the typed OBS file loaded by readObsFile)
     #         ObsInfo[1][1] is the second field of the 
     #         second satellite
     # PrevPreproObsInfo: dict
@@ -536,6 +537,404 @@ def runPreProcMeas(Conf, Rcvr, ObsInfo, PrevPreproObsInfo):
 
 # End of function runPreProcMeas()
 
+def initPreproState(Conf):
+
+    # Purpose: initialize the array-backed preprocessing state used by
+    #          runPreProcMeasVec
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #         Configuration dictionary
+
+    # Returns
+    # =======
+    # PreproState: dict
+    #         Preprocessing state per satellite, one NumPy array per
+    #         field of PrevPreproObsInfo, indexed by PRN
+    #         PreproState["PrevL1"][1] is the previous L1 of G01
+
+    # Get the size of the arrays (position 0 is not used)
+    NSats = Const.MAX_NUM_SATS_CONSTEL + 1
+
+    PreproState = {
+        "L1_n_1": np.zeros(NSats),                              # t-1 Carrier Phase in L1
+        "L1_n_2": np.zeros(NSats),                              # t-2 Carrier Phase in L1
+        "L1_n_3": np.zeros(NSats),                              # t-3 Carrier Phase in L1
+        "t_n_1": np.zeros(NSats),                               # t-1 epoch
+        "t_n_2": np.zeros(NSats),                               # t-2 epoch
+        "t_n_3": np.zeros(NSats),                               # t-3 epoch
+        "CsBuff": np.zeros((NSats, int(Conf["MIN_NCS_TH"][CSNEPOCHS])), dtype=int),
+                                                                # Number of consecutive epochs for CS
+        "CsIdx": np.zeros(NSats, dtype=int),                    # Index of CS detector buffer
+        "ResetHatchFilter": np.ones(NSats, dtype=int),          # Flag to reset Hatch filter
+        "Ksmooth": np.zeros(NSats),                             # Hatch filter K
+        "PrevEpoch": np.full(NSats, 86400.0),                   # Previous SoD
+        "PrevL1": np.zeros(NSats),                              # Previous L1
+        "PrevSmoothC1": np.zeros(NSats),                        # Previous Smoothed C1
+        "PrevRangeRateL1": np.zeros(NSats),                     # Previous Code Rate
+        "PrevPhaseRateL1": np.zeros(NSats),                     # Previous Phase Rate
+        "PrevGeomFree": np.zeros(NSats),                        # Previous Geometry-Free Observable
+        "PrevGeomFreeEpoch": np.zeros(NSats),                   # Previous Geometry-Free Observable
+        "PrevRej": np.zeros(NSats, dtype=int),                  # Previous Rejection flag
+        "GapCounter": np.zeros(NSats),                          # Gap counter
+    } # End of PreproState
+
+    return PreproState
+
+# End of initPreproState()
+
+def runPreProcMeasVec(Conf, Rcvr, ObsInfo, PreproState):
+
+    # Purpose: preprocess GNSS raw measurements from OBS file, evaluating
+    #          the checks for all the satellites of the epoch at once
+
+    # This is the array-backed counterpart of runPreProcMeas: it applies
+    # the same checks in the same order with masked NumPy operations and
+    # keeps the per-satellite state in the arrays of initPreproState.
+    # The floating point operations are the same as in runPreProcMeas, so
+    # that the outputs match bit for bit.
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #         Configuration dictionary
+    # Rcvr: list
+    #         Receiver information: position, masking angle...
+    # ObsInfo: numpy.ndarray
+    #         OBS info for current epoch, as yielded by readObsEpochs
+    #         ObsInfo["PRN"] are the PRNs of all the satellites
+    # PreproState: dict
+    #         Preprocessing state per satellite, from initPreproState
+
+    # Returns
+    # =======
+    # PreproObsInfo: dict
+    #         Preprocessed observations for current epoch per sat
+    #         PreproObsInfo["G01"]["C1"]
+
+    # Get the inputs of the epoch
+    Prn = ObsInfo["PRN"].astype(int)
+    Sod = ObsInfo["SOD"]
+    Elev = ObsInfo["ELEV"]
+    C1 = ObsInfo["C1"]
+    L1 = ObsInfo["L1"]
+    S1 = ObsInfo["S1"]
+    L2 = ObsInfo["L2"]
+    NObs = len(ObsInfo)
+
+    # Initialize outputs
+    Valid = np.ones(NObs, dtype=int)
+    Rej = np.zeros(NObs, dtype=int)
+    Status = np.zeros(NObs, dtype=int)
+    SmoothC1 = np.zeros(NObs)
+    RangeRate = np.zeros(NObs)
+    RangeRateStep = np.zeros(NObs)
+    PhaseRate = np.zeros(NObs)
+    PhaseRateStep = np.zeros(NObs)
+    GeomFree = np.zeros(NObs)
+    VtecRate = np.zeros(NObs)
+    iAATR = np.zeros(NObs)
+
+    # Get the state arrays
+    S = PreproState
+    NCsEpochs = int(Conf["MIN_NCS_TH"][CSNEPOCHS])
+
+    # Satellites still under processing
+    Active = np.ones(NObs, dtype=bool)
+
+    # The formulas are evaluated over all the rows and only the rows
+    # selected by the masks are kept, so ignore the invalid operations
+    # on the discarded rows
+    with np.errstate(all='ignore'):
+
+        # Limit the satellites to the Number of Channels
+        # ----------------------------------------------------------
+        ChannelsElevation = 0.0
+        NChannelsRejections = NObs - int(Conf["NCHANNELS_GPS"])
+        if NChannelsRejections > 0:
+            ChannelsElevation = np.sort(Elev)[NChannelsRejections]
+
+        Mask = Elev < ChannelsElevation
+        Valid[Mask] = 0
+        Rej[Mask] = REJECTION_CAUSE["NCHANNELS_GPS"]
+        Active &= ~Mask
+
+        # Reject satellites due to mask angle
+        # ----------------------------------------------------------
+        Mask = Active & (Elev < Rcvr[RcvrIdx["MASK"]])
+        Valid[Mask] = 0
+        Rej[Mask] = REJECTION_CAUSE["MASKANGLE"]
+        S["PrevRej"][Prn[Mask]] = REJECTION_CAUSE["MASKANGLE"]
+        Active &= ~Mask
+
+        # Reject satellites due to C/N0 (only if activated in conf)
+        # ----------------------------------------------------------
+        if Conf["MIN_CNR"][FLAG] == 1:
+            Mask = Active & (S1 < float(Conf["MIN_CNR"][VALUE]))
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MIN_CNR"]
+            S["PrevRej"][Prn[Mask]] = REJECTION_CAUSE["MIN_CNR"]
+            Active &= ~Mask
+
+        # Reject satellites due to Pseudorange Out-of-range (only if activated in conf)
+        # ----------------------------------------------------------
+        if Conf["MAX_PSR_OUTRNG"][FLAG] == 1:
+            Mask = Active & (C1 > float(Conf["MAX_PSR_OUTRNG"][VALUE]))
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MAX_PSR_OUTRNG"]
+            Active &= ~Mask
+
+        # Check data gaps
+        # ----------------------------------------------------------
+        DeltaT = Sod - S["PrevEpoch"][Prn]
+        Gap = Active & (DeltaT > Conf["SAMPLING_RATE"])
+        S["GapCounter"][Prn[Gap]] = DeltaT[Gap]
+        S["GapCounter"][Prn[Active & ~Gap]] = 0
+
+        # If the length of the gap is larger than the allowed value
+        Mask = Gap & (DeltaT > Conf["HATCH_GAP_TH"])
+        S["ResetHatchFilter"][Prn[Mask]] = 1
+        S["GapCounter"][Prn[Mask]] = 0
+        Mask = Mask & (S["PrevRej"][Prn] != REJECTION_CAUSE["MASKANGLE"])
+        Rej[Mask] = REJECTION_CAUSE["DATA_GAP"]
+
+        # Cycle Slips (CS) detection
+        # ----------------------------------------------------------
+        # If CS detection is activated
+        if Conf["MIN_NCS_TH"][FLAG] == 1:
+            Cs = Active & (S["ResetHatchFilter"][Prn] == 0)
+
+            # Get current and previous phase measurements
+            CP_n_1 = S["L1_n_1"][Prn]
+            CP_n_2 = S["L1_n_2"][Prn]
+            CP_n_3 = S["L1_n_3"][Prn]
+
+            # Get Previous measurements' epochs deltas
+            dt1 = Sod - S["t_n_1"][Prn]
+            dt2 = S["t_n_1"][Prn] - S["t_n_2"][Prn]
+            dt3 = S["t_n_2"][Prn] - S["t_n_3"][Prn]
+
+            # Satellites with t-3 available
+            Check = Cs & (S["t_n_3"][Prn] > 0)
+
+            # Compute residual coefficients
+            l1 = ((dt1+dt2)*(dt1+dt2+dt3))/(dt2*(dt2+dt3))
+            l2 = (-dt1*(dt1+dt2+dt3))/(dt2*dt3)
+            l3 = (dt1*(dt1+dt2))/((dt2+dt3)*dt3)
+
+            # Compute propagated L1 and residuals
+            CP_prop = l1*CP_n_1 + l2*CP_n_2 + l3*CP_n_3
+            CsResidual = np.abs(L1-CP_prop)
+
+            # Compute CS flag and update CS detector buffer
+            CsFlag = Check & (CsResidual > float(Conf["MIN_NCS_TH"][TH]))
+            S["CsBuff"][Prn[Check], S["CsIdx"][Prn[Check]]] = CsFlag[Check]
+
+            # Invalid measurements above the threshold
+            Valid[CsFlag] = 0
+
+            # A CS is declared if it was detected Conf["MIN_NCS_TH"][CSNEPOCHS]
+            # consecutive times (recommended value is 3)
+            CsDeclared = CsFlag & \
+                (np.sum(S["CsBuff"][Prn], axis=1) == Conf["MIN_NCS_TH"][CSNEPOCHS])
+            Rej[CsDeclared] = REJECTION_CAUSE["CYCLE_SLIP"]
+            S["ResetHatchFilter"][Prn[CsDeclared]] = 1
+
+            # Update index of CS detector buffer
+            S["CsIdx"][Prn[Cs]] = (S["CsIdx"][Prn[Cs]] + 1) % NCsEpochs
+
+            # Satellites with a CS not yet declared are not processed further
+            Cs = Cs & ~(CsFlag & ~CsDeclared)
+            Active &= ~(CsFlag & ~CsDeclared)
+
+            # If CS flag was not True in the Conf["MIN_NCS_TH"][CSNEPOCHS] previous epochs
+            Mask = Cs & (np.sum(S["CsBuff"][Prn], axis=1) == 0)
+            PrnMask = Prn[Mask]
+            S["L1_n_3"][PrnMask] = CP_n_2[Mask]
+            S["L1_n_2"][PrnMask] = CP_n_1[Mask]
+            S["L1_n_1"][PrnMask] = L1[Mask]
+            S["t_n_3"][PrnMask] = S["t_n_2"][PrnMask]
+            S["t_n_2"][PrnMask] = S["t_n_1"][PrnMask]
+            S["t_n_1"][PrnMask] = Sod[Mask]
+
+        # End of if Conf["MIN_NCS_TH"][FLAG] == 1:
+
+        # Hatch filter (re)initialization
+        # ----------------------------------------------------------
+        Mask = Active & (S["ResetHatchFilter"][Prn] == 1)
+        PrnMask = Prn[Mask]
+        S["GapCounter"][PrnMask] = 0
+        S["Ksmooth"][PrnMask] = 1
+        SmoothC1[Mask] = C1[Mask]
+        S["PrevSmoothC1"][PrnMask] = C1[Mask]
+        S["PrevL1"][PrnMask] = L1[Mask]
+        S["PrevEpoch"][PrnMask] = Sod[Mask]
+        S["PrevRangeRateL1"][PrnMask] = -9999.9
+        S["PrevPhaseRateL1"][PrnMask] = -9999.9
+        S["ResetHatchFilter"][PrnMask] = 0
+        Status[Mask] = 0
+        S["L1_n_1"][PrnMask] = 0.0
+        S["L1_n_2"][PrnMask] = 0.0
+        S["L1_n_3"][PrnMask] = 0.0
+        S["t_n_1"][PrnMask] = 0.0
+        S["t_n_2"][PrnMask] = 0.0
+        S["t_n_3"][PrnMask] = 0.0
+        S["CsBuff"][PrnMask] = 0
+        Active &= ~Mask
+
+        # Code Carrier Smoothing with a Hatch Filter
+        # ----------------------------------------------------------
+        # Update Smoothing iterator
+        S["Ksmooth"][Prn[Active]] = S["Ksmooth"][Prn[Active]] + DeltaT[Active]
+        Ksmooth = S["Ksmooth"][Prn]
+
+        # Smoothing Time computation
+        SmoothingTime = np.where(Ksmooth <= Conf["HATCH_TIME"], Ksmooth, Conf["HATCH_TIME"])
+
+        # Weighting factor of the Smoothing filter
+        Alpha = DeltaT / SmoothingTime
+
+        # Compute Smoothed C1
+        PrevL1 = S["PrevL1"][Prn]
+        PrevSmoothC1 = S["PrevSmoothC1"][Prn]
+        SmoothC1[Active] = (Alpha * C1 + (1-Alpha) * \
+            (PrevSmoothC1 + (L1 - PrevL1) * Const.GPS_L1_WAVE))[Active]
+
+        # Check Phase Rate (only if activated in conf)
+        # ----------------------------------------------------------
+        PhaseRate[Active] = ((L1 - PrevL1) / DeltaT * Const.GPS_L1_WAVE)[Active]
+        if Conf["MAX_PHASE_RATE"][FLAG] == 1:
+            Mask = Active & (np.abs(PhaseRate) > Conf["MAX_PHASE_RATE"][VALUE])
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MAX_PHASE_RATE"]
+            S["ResetHatchFilter"][Prn[Mask]] = 1
+            Active &= ~Mask
+
+        # Check Phase Rate Step (only if activated in conf)
+        # ----------------------------------------------------------
+        PrevPhaseRate = S["PrevPhaseRateL1"][Prn]
+        Step = Active & (PrevPhaseRate != -9999.9)
+        PhaseRateStep[Step] = ((PhaseRate - PrevPhaseRate) / DeltaT)[Step]
+        if Conf["MAX_PHASE_RATE_STEP"][FLAG] == 1:
+            Mask = Step & (np.abs(PhaseRateStep) > Conf["MAX_PHASE_RATE_STEP"][VALUE])
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MAX_PHASE_RATE_STEP"]
+            S["ResetHatchFilter"][Prn[Mask]] = 1
+            Active &= ~Mask
+
+        # Check Code Rate (only if activated in conf)
+        # ----------------------------------------------------------
+        RangeRate[Active] = ((SmoothC1 - PrevSmoothC1) / DeltaT)[Active]
+        if Conf["MAX_CODE_RATE"][FLAG] == 1:
+            Mask = Active & (np.abs(RangeRate) > Conf["MAX_CODE_RATE"][VALUE])
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MAX_CODE_RATE"]
+            S["ResetHatchFilter"][Prn[Mask]] = 1
+            Active &= ~Mask
+
+        # Check Code Rate Step (only if activated in conf)
+        # ----------------------------------------------------------
+        PrevRangeRate = S["PrevRangeRateL1"][Prn]
+        Step = Active & (PrevRangeRate != -9999.9)
+        RangeRateStep[Step] = ((RangeRate - PrevRangeRate) / DeltaT)[Step]
+        if Conf["MAX_CODE_RATE_STEP"][FLAG] == 1:
+            Mask = Step & (np.abs(RangeRateStep) > Conf["MAX_CODE_RATE_STEP"][VALUE])
+            Valid[Mask] = 0
+            Rej[Mask] = REJECTION_CAUSE["MAX_CODE_RATE_STEP"]
+            S["ResetHatchFilter"][Prn[Mask]] = 1
+            Active &= ~Mask
+
+        # Set Status flag: 1 if convergence was reached, 0 otherwise
+        # ----------------------------------------------------------
+        Status[Active & (Ksmooth > Conf["HATCH_STATE_F"] * Conf["HATCH_TIME"]) & \
+            (Valid != 0)] = 1
+
+        # Update previous values
+        # ----------------------------------------------------------
+        PrnMask = Prn[Active]
+        S["PrevSmoothC1"][PrnMask] = SmoothC1[Active]
+        S["PrevL1"][PrnMask] = L1[Active]
+        S["PrevEpoch"][PrnMask] = Sod[Active]
+        S["PrevRangeRateL1"][PrnMask] = RangeRate[Active]
+        S["PrevPhaseRateL1"][PrnMask] = PhaseRate[Active]
+        S["PrevRej"][PrnMask] = Rej[Active]
+
+        # Compute Iono Mapping Function
+        # ----------------------------------------------------------
+        Mpp = np.array([computeIonoMappingFunction(Elevation) \
+            for Elevation in Elev.tolist()], dtype=float)
+
+        # Build Geometry-Free combination of Phases
+        # ----------------------------------------------------------
+        # Check if L1 and L2 are OK
+        Gf = (Valid > 0) & (L2 > 0)
+        GeomFree[Gf] = ((Const.GPS_L1_WAVE * L1 - Const.GPS_L2_WAVE * L2) / \
+            (1 - Const.GPS_GAMMA_L1L2))[Gf]
+
+        # Compute the VTEC Rate and the Instantaneous AATR
+        # if valid Previous Geometry-Free Observable
+        Mask = Gf & (S["PrevGeomFree"][Prn] > 0)
+        DeltaStec = (GeomFree - S["PrevGeomFree"][Prn]) / \
+            (Sod - S["PrevGeomFreeEpoch"][Prn])
+        VtecRate[Mask] = ((DeltaStec / Mpp) * 1000)[Mask]
+        iAATR[Mask] = (VtecRate / Mpp)[Mask]
+
+        # Update previous Geometry-Free Observable
+        S["PrevGeomFree"][Prn[Gf]] = GeomFree[Gf]
+        S["PrevGeomFreeEpoch"][Prn[Gf]] = Sod[Gf]
+
+    # End of with np.errstate(all='ignore'):
+
+    # Build the output dictionary as runPreProcMeas does
+    # ----------------------------------------------------------
+    PreproObsInfo = OrderedDict({})
+    Columns = zip(ObsInfo["CONST"].tolist(), Prn.tolist(), Sod.tolist(),
+        ObsInfo["DOY"].astype(int).tolist(), Elev.tolist(), ObsInfo["AZIM"].tolist(),
+        C1.tolist(), L1.tolist(), (L1 * Const.GPS_L1_WAVE).tolist(), S1.tolist(),
+        L2.tolist(), SmoothC1.tolist(), GeomFree.tolist(), Valid.tolist(), Rej.tolist(),
+        Status.tolist(), RangeRate.tolist(), RangeRateStep.tolist(), PhaseRate.tolist(),
+        PhaseRateStep.tolist(), VtecRate.tolist(), iAATR.tolist(), Mpp.tolist())
+
+    for Constel, SatPrn, SatSod, SatDoy, SatElev, SatAzim, SatC1, SatL1, SatL1Meters, \
+        SatS1, SatL2, SatSmoothC1, SatGeomFree, SatValid, SatRej, SatStatus, \
+        SatRangeRate, SatRangeRateStep, SatPhaseRate, SatPhaseRateStep, \
+        SatVtecRate, SatiAATR, SatMpp in Columns:
+        PreproObsInfo[Constel + "%02d" % SatPrn] = {
+            "Sod": SatSod,                          # Second of day
+            "Doy": SatDoy,                          # Day of year
+            "Elevation": SatElev,                   # Elevation
+            "Azimuth": SatAzim,                     # Azimuth
+            "C1": SatC1,                            # GPS L1C/A pseudorange
+            "P1": 0.0,                              # GPS L1P pseudorange
+            "L1": SatL1,                            # GPS L1 carrier phase (in cycles)
+            "L1Meters": SatL1Meters,                # GPS L1 carrier phase (in m)
+            "S1": SatS1,                            # GPS L1C/A C/No
+            "P2": 0.0,                              # GPS L2P pseudorange
+            "L2": SatL2,                            # GPS L2 carrier phase 
+            "S2": 0.0,                              # GPS L2 C/No
+            "SmoothC1": SatSmoothC1,                # Smoothed L1CA 
+            "GeomFree": SatGeomFree,                # Geom-free in Phases
+            "GeomFreePrev": 0.0,                    # t-1 Geom-free in Phases
+            "ValidL1": SatValid,                    # L1 Measurement Status
+            "RejectionCause": SatRej,               # Cause of rejection flag
+            "StatusL2": 0,                          # L2 Measurement Status
+            "Status": SatStatus,                    # L1 Smoothing status
+            "RangeRateL1": SatRangeRate,            # L1 Code Rate
+            "RangeRateStepL1": SatRangeRateStep,    # L1 Code Rate Step
+            "PhaseRateL1": SatPhaseRate,            # L1 Phase Rate
+            "PhaseRateStepL1": SatPhaseRateStep,    # L1 Phase Rate Step
+            "VtecRate": SatVtecRate,                # VTEC Rate
+            "iAATR": SatiAATR,                      # Instantaneous AATR
+            "Mpp": SatMpp,                          # Iono Mapping
+        } # End of PreproObsInfo[SatLabel]
+
+    # End of for Constel, SatPrn, ... in Columns:
+
+    return PreproObsInfo
+
+# End of function runPreProcMeasVec()
+
 ########################################################################
 # END OF PREPROCESSING FUNCTIONS MODULE
 ########################################################################
@@ -19,19 +19,36 @@
 
 import sys, os
 from pandas import unique
-from pandas import read_csv
-from InputOutput import PreproIdx
+from InputOutput import readPlotsData
+from InputOutput import PreproIdx, PreproFmt
 from InputOutput import REJECTION_CAUSE_DESC
+from Aggregation import countPerKey, groupRows
 sys.path.append(os.getcwd() + '/' + \
     os.path.dirname(sys.argv[0]) + '/' + 'COMMON')
 from COMMON import GnssConstants
-from COMMON.Plots import generatePlot, saveFigure
+from COMMON.Plots import saveFigure
+from PlotQueue import queuePlot
 import numpy as np
 from collections import OrderedDict
 from ConPlots import ConfPrepro
 import matplotlib.pyplot as plt
 from math import pi
 
+# Columns read for each plot
+PREPRO_PLOT_COLS = OrderedDict({})
+PREPRO_PLOT_COLS["PLOT_VIS"] = ["SOD", "PRN", "ELEV", "STATUS"]
+PREPRO_PLOT_COLS["PLOT_NSAT"] = ["SOD", "STATUS"]
+PREPRO_PLOT_COLS["PLOT_POLAR"] = ["PRN", "ELEV", "AZIM"]
+PREPRO_PLOT_COLS["PLOT_SATS_FLAGS"] = ["SOD", "PRN", "REJECT"]
+PREPRO_PLOT_COLS["PLOT_C1_C1SMOOTHED_T"] = ["SOD", "STATUS", "C1", "C1SMOOTHED", "S1"]
+PREPRO_PLOT_COLS["PLOT_C1_C1SMOOTHED_E"] = ["ELEV", "STATUS", "C1", "C1SMOOTHED", "S1"]
+PREPRO_PLOT_COLS["PLOT_C1_RATE"] = ["SOD", "ELEV", "STATUS", "CODE RATE"]
+PREPRO_PLOT_COLS["PLOT_L1_RATE"] = ["SOD", "ELEV", "STATUS", "PHASE RATE"]
+PREPRO_PLOT_COLS["PLOT_C1_RATE_STEP"] = ["SOD", "ELEV", "STATUS", "CODE ACC"]
+PREPRO_PLOT_COLS["PLOT_L1_RATE_STEP"] = ["SOD", "ELEV", "STATUS", "PHASE ACC"]
+PREPRO_PLOT_COLS["PLOT_VTEC"] = ["SOD", "ELEV", "STATUS", "VTEC RATE"]
+PREPRO_PLOT_COLS["PLOT_AATR_INDEX"] = ["SOD", "ELEV", "STATUS", "iAATR"]
+
 def initPlot(PreproObsFile, PlotConf, Title, Label):
     
     # Compute information from PreproObsFile
@@ -89,19 +106,24 @@ def plotSatVisibility(PreproObsFile, PreproObsData):
     PlotConf["yData"], PlotConf["yData2"] = {}, {}
     PlotConf["zData"] = {}
 
-    FilterCond2 = PreproObsData[PreproIdx["STATUS"]] == 1
-    FilterCond3 = PreproObsData[PreproIdx["STATUS"]] == 0
-    for Prn in PrnList:
+    Sod = PreproObsData[PreproIdx["SOD"]].to_numpy()
+    Prns = PreproObsData[PreproIdx["PRN"]].to_numpy()
+    Elev = PreproObsData[PreproIdx["ELEV"]].to_numpy()
+    Status = PreproObsData[PreproIdx["STATUS"]].to_numpy()
+
+    # Split the rows per satellite in a single pass
+    for Prn, Rows in groupRows(Prns).items():
         Label = "G" + ("%02d" % Prn)
-        FilterCond1 = PreproObsData[PreproIdx["PRN"]] == Prn
-        PlotConf["xData"][Label] = PreproObsData[PreproIdx["SOD"]][FilterCond1][FilterCond2] / GnssConstants.S_IN_H
-        PlotConf["yData"][Label] = PreproObsData[PreproIdx["PRN"]][FilterCond1][FilterCond2]
-        PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond1][FilterCond2]
-        PlotConf["xData2"][Label] = PreproObsData[PreproIdx["SOD"]][FilterCond1][FilterCond3] / GnssConstants.S_IN_H
-        PlotConf["yData2"][Label] = PreproObsData[PreproIdx["PRN"]][FilterCond1][FilterCond3]
+        Smoothed = Rows[Status[Rows] == 1]
+        NotSmoothed = Rows[Status[Rows] == 0]
+        PlotConf["xData"][Label] = Sod[Smoothed] / GnssConstants.S_IN_H
+        PlotConf["yData"][Label] = Prns[Smoothed]
+        PlotConf["zData"][Label] = Elev[Smoothed]
+        PlotConf["xData2"][Label] = Sod[NotSmoothed] / GnssConstants.S_IN_H
+        PlotConf["yData2"][Label] = Prns[NotSmoothed]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Number of Satellites
 def plotNumSats(PreproObsFile, PreproObsData):
@@ -126,18 +148,13 @@ def plotNumSats(PreproObsFile, PreproObsData):
     PlotConf["LineWidth"] = 0.75
 
     # Processing the data to be plotted
+    # Count the satellites of every second of the day in a single pass
     Sod = np.arange(GnssConstants.S_IN_D + 1)
-    SatsRaw = []
-    SatsSmooth = []
+    SatsRaw = countPerKey(PreproObsData[PreproIdx["SOD"]], 0, GnssConstants.S_IN_D)
+    SatsSmooth = countPerKey(PreproObsData[PreproIdx["SOD"]], 0, GnssConstants.S_IN_D, \
+        Weights=PreproObsData[PreproIdx["STATUS"]])
     Data = [SatsRaw, SatsSmooth]
 
-    for Second in Sod:
-        FilterCond = PreproObsData[PreproIdx["SOD"]] == Second
-        DataEpoch = PreproObsData[PreproIdx["STATUS"]][FilterCond]
-        DataEpoch.to_numpy()
-        SatsRaw.append(len(DataEpoch))
-        SatsSmooth.append(sum(DataEpoch))
-
     # Plotting
     PlotConf["xData"] = {}
     PlotConf["yData"] = {}
@@ -146,8 +163,8 @@ def plotNumSats(PreproObsFile, PreproObsData):
         PlotConf["xData"][index] = Sod / GnssConstants.S_IN_H
         PlotConf["yData"][index] = np.array(Data[index])
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Satellite Polar View
 def plotSatPolarView(PreproObsFile, PreproObsData):
@@ -176,6 +193,16 @@ def plotSatPolarView(PreproObsFile, PreproObsData):
     PlotConf["ColorBarTicks"] = range(min(PrnList), max(PrnList) + 1)
 
     # Plotting
+    PlotConf["xData"] = PreproObsData[PreproIdx["AZIM"]].to_numpy()
+    PlotConf["yData"] = PreproObsData[PreproIdx["ELEV"]].to_numpy()
+    PlotConf["zData"] = PreproObsData[PreproIdx["PRN"]].to_numpy()
+
+    # Queue generatePolarPlot
+    queuePlot(PlotConf, generatePolarPlot)
+
+# Generate a Polar Plot
+def generatePolarPlot(PlotConf):
+
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='polar')
 
@@ -194,12 +221,8 @@ def plotSatPolarView(PreproObsFile, PreproObsData):
     ax.set_yticklabels(PlotConf["yTicksLabels"])
     plt.gca().invert_yaxis()
 
-    xData = PreproObsData[PreproIdx["AZIM"]]
-    yData = PreproObsData[PreproIdx["ELEV"]]
-    zData = PreproObsData[PreproIdx["PRN"]]
-
-    p = ax.scatter(x = np.radians(xData), y = yData, c = zData, cmap = PlotConf["ColorBar"],\
-        marker = PlotConf["Marker"], linewidth = PlotConf["LineWidth"])
+    p = ax.scatter(x = np.radians(PlotConf["xData"]), y = PlotConf["yData"], c = PlotConf["zData"], \
+        cmap = PlotConf["ColorBar"], marker = PlotConf["Marker"], linewidth = PlotConf["LineWidth"])
 
     fig.colorbar(p, ticks = PlotConf["ColorBarTicks"], label = PlotConf["ColorBarLabel"], pad = 0.1)  
 
@@ -251,8 +274,8 @@ def plotC1C1Smoothed(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = np.array(Noise)
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["S1"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot C1 - C1 Smoothed vs Elevation
 def plotC1C1SmoothedE(PreproObsFile, PreproObsData):
@@ -300,8 +323,8 @@ def plotC1C1SmoothedE(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = np.array(Noise)
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["S1"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Rejection Flags vs Time
 def plotRejectionFlags(PreproObsFile, PreproObsData):
@@ -343,8 +366,8 @@ def plotRejectionFlags(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["REJECT"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["PRN"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Code Rate vs Time
 def plotCodeRate(PreproObsFile, PreproObsData):
@@ -383,8 +406,8 @@ def plotCodeRate(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["CODE RATE"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Phase Rate vs Time
 def plotPhaseRate(PreproObsFile, PreproObsData):
@@ -423,8 +446,8 @@ def plotPhaseRate(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["PHASE RATE"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Code Rate Step vs Time
 def plotCodeRateStep(PreproObsFile, PreproObsData):
@@ -463,8 +486,8 @@ def plotCodeRateStep(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["CODE ACC"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # Plot Phase Rate Step vs Time
 def plotPhaseRateStep(PreproObsFile, PreproObsData):
@@ -503,8 +526,8 @@ def plotPhaseRateStep(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["PHASE ACC"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # VTEC Gradient vs Time
 def plotVtecGradient(PreproObsFile, PreproObsData):
@@ -543,8 +566,8 @@ def plotVtecGradient(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["VTEC RATE"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 # AATR index vs Time
 def plotAatr(PreproObsFile, PreproObsData):
@@ -583,8 +606,8 @@ def plotAatr(PreproObsFile, PreproObsData):
     PlotConf["yData"][Label] = PreproObsData[PreproIdx["iAATR"]][FilterCond]
     PlotConf["zData"][Label] = PreproObsData[PreproIdx["ELEV"]][FilterCond]
 
-    # Call generatePlot from Plots library
-    generatePlot(PlotConf)
+    # Queue generatePlot from Plots library
+    queuePlot(PlotConf)
 
 def generatePreproPlots(PreproObsFile):
     
@@ -598,14 +621,13 @@ def generatePreproPlots(PreproObsFile):
     # Returns
     # =======
     # Nothing
+
+    # Read once the columns needed by all the activated plots
+    PreproObsData = readPlotsData(PreproObsFile, PreproIdx, PreproFmt, ConfPrepro, PREPRO_PLOT_COLS)
     
     # Satellite Visibility
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_VIS"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["PRN"],PreproIdx["ELEV"],PreproIdx["STATUS"]])
-
         print( 'Plot Satellites Visibility vs Time ...')
       
         # Configure plot and call plot generation function
@@ -614,10 +636,6 @@ def generatePreproPlots(PreproObsFile):
     # Plot Number of Satellites
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_NSAT"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["STATUS"]])
-
         print( 'Plot Number of Satellites vs Time ...')
       
         # Configure plot and call plot generation function
@@ -626,10 +644,6 @@ def generatePreproPlots(PreproObsFile):
     # Plot Polar View
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_POLAR"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["PRN"],PreproIdx["ELEV"],PreproIdx["AZIM"]])
-
         print( 'Plot Satellites Polar View ...')
       
         # Configure plot and call plot generation function
@@ -638,10 +652,6 @@ def generatePreproPlots(PreproObsFile):
     # Plot Rejection Flags of satellite
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_SATS_FLAGS"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["PRN"],PreproIdx["REJECT"]])
-
         print( 'Plot Rejection Flags of Satellites vs Time ...')
       
         # Configure plot and call plot generation function
@@ -650,10 +660,6 @@ def generatePreproPlots(PreproObsFile):
     # Plot C1 - C1 Smoothed vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_C1_C1SMOOTHED_T"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["STATUS"],PreproIdx["C1"],PreproIdx["C1SMOOTHED"],PreproIdx["S1"]])
-
         print( 'Plot C1 - C1 Smoothed vs Time ...')
       
         # Configure plot and call plot generation function
@@ -662,10 +668,6 @@ def generatePreproPlots(PreproObsFile):
     # Plot C1 - C1 Smoothed vs Elevation
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_C1_C1SMOOTHED_E"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["C1"],PreproIdx["C1SMOOTHED"],PreproIdx["S1"]])
-
         print( 'Plot C1 - C1 Smoothed vs Elevation ...')
       
         # Configure plot and call plot generation function
@@ -674,10 +676,6 @@ def generatePreproPlots(PreproObsFile):
     # Code Rate vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_C1_RATE"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["CODE RATE"]])
-
         print( 'Plot Code Rate vs Time ...')
       
         # Configure plot and call plot generation function
@@ -686,10 +684,6 @@ def generatePreproPlots(PreproObsFile):
     # Phase Rate vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_L1_RATE"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["PHASE RATE"]])
-
         print( 'Plot Phase Rate vs Time ...')
       
         # Configure plot and call plot generation function
@@ -698,10 +692,6 @@ def generatePreproPlots(PreproObsFile):
     # Code Rate Step vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_C1_RATE_STEP"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["CODE ACC"]])
-
         print( 'Plot Code Rate Step vs Time ...')
       
         # Configure plot and call plot generation function
@@ -710,10 +700,6 @@ def generatePreproPlots(PreproObsFile):
     # Phase Rate Step vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_L1_RATE_STEP"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["PHASE ACC"]])
-
         print( 'Plot Phase Rate Step vs Time ...')
       
         # Configure plot and call plot generation function
@@ -722,10 +708,6 @@ def generatePreproPlots(PreproObsFile):
     # Phase Rate Step vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_VTEC"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["VTEC RATE"]])
-
         print( 'Plot VTEC Gradient vs Time ...')
       
         # Configure plot and call plot generation function
@@ -734,10 +716,6 @@ def generatePreproPlots(PreproObsFile):
     # AATR Index vs Time
     # ----------------------------------------------------------
     if(ConfPrepro["PLOT_AATR_INDEX"] == 1):
-        # Read the cols we need from PreproObsFile file
-        PreproObsData = read_csv(PreproObsFile, delim_whitespace=True, skiprows=1, header=None,\
-        usecols=[PreproIdx["SOD"],PreproIdx["ELEV"],PreproIdx["STATUS"],PreproIdx["iAATR"]])
-
         print( 'Plot AATR Index vs Time ...')
       
         # Configure plot and call plot generation function
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/Profiling.py:
+# This is the Profiling Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           Profiling.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+import json
+import time
+import cProfile
+from contextlib import contextmanager, nullcontext
+from collections import OrderedDict
+import numpy as np
+
+# Profiling internal parameters
+#-----------------------------------------------------------------------
+# Profiling modes (PROFILING configuration parameter)
+PROF_OFF = 0            # No profiling
+PROF_TIMES = 1          # Time of each stage and epoch (or batch), written in JSON
+PROF_CPROFILE = 2       # Times, plus a cProfile dump of each stage
+
+# Context of the stages when the profiling is off
+NO_PROFILING = nullcontext()
+
+# Profiler of the receiver day being processed
+Profiler = {
+    "Mode": PROF_OFF,                   # Profiling mode
+    "Start": 0.0,                       # Start of the receiver day
+    "EpochStart": 0.0,                  # Start of the current epoch
+    "EpochTimes": [],                   # Processing time of each epoch processed alone [s]
+    "BatchTimes": [],                   # Processing time of each batch of epochs [s]
+    "BatchEpochs": [],                  # Number of epochs of each batch
+    "Stages": OrderedDict({}),          # [Time, Calls] per stage
+    "Profiles": OrderedDict({}),        # cProfile per stage
+    "Active": None,                     # Stage whose cProfile is enabled
+} # End of Profiler
+
+# Profiling internal functions
+#-----------------------------------------------------------------------
+
+@contextmanager
+def timeStage(Name):
+
+    # Purpose: time a stage and, in PROF_CPROFILE mode, profile it. The
+    #          cProfile of a stage nested in another one is not enabled,
+    #          its calls are in the profile of the outer stage
+
+    Profile = None
+    if Profiler["Mode"] == PROF_CPROFILE and Profiler["Active"] is None:
+        Profile = Profiler["Profiles"].setdefault(Name, cProfile.Profile())
+        Profiler["Active"] = Name
+        Profile.enable()
+
+    Start = time.perf_counter()
+
+    try:
+        yield
+
+    finally:
+        Elapsed = time.perf_counter() - Start
+
+        if Profile is not None:
+            Profile.disable()
+            Profiler["Active"] = None
+
+        Stage = Profiler["Stages"].setdefault(Name, [0.0, 0])
+        Stage[0] = Stage[0] + Elapsed
+        Stage[1] = Stage[1] + 1
+
+# End of timeStage()
+
+def getPeakMemory():
+
+    # Purpose: get the peak resident memory of the process [MB]
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    MaxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # In bytes in macOS, in kB otherwise
+    if sys.platform == "darwin":
+        return MaxRss / 2**20
+
+    return MaxRss / 2**10
+
+# End of getPeakMemory()
+
+# Profiling main functions
+#-----------------------------------------------------------------------
+
+def startProfiling(Conf):
+
+    # Purpose: start the profiling of a receiver day
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+
+    # Returns
+    # =======
+    # Nothing
+
+    Profiler["Mode"] = int(Conf["PROFILING"])
+    Profiler["Start"] = time.perf_counter()
+    Profiler["EpochStart"] = Profiler["Start"]
+    Profiler["EpochTimes"] = []
+    Profiler["BatchTimes"] = []
+    Profiler["BatchEpochs"] = []
+    Profiler["Stages"] = OrderedDict({})
+    Profiler["Profiles"] = OrderedDict({})
+    Profiler["Active"] = None
+
+# End of startProfiling()
+
+def profileStage(Name):
+
+    # Purpose: get the context timing a stage, to be used as
+    #          "with profileStage(Name):" around the stage
+
+    # Parameters
+    # ==========
+    # Name: str
+    #       Stage name
+
+    # Returns
+    # =======
+    # Context: context manager
+    #          Stage timing context (a no-op context if the profiling
+    #          is off)
+
+    if Profiler["Mode"] == PROF_OFF:
+        return NO_PROFILING
+
+    return timeStage(Name)
+
+# End of profileStage()
+
+def markProfilingEpochs(NEpochs=1, Batch=False):
+
+    # Purpose: mark the end of the processing of one epoch, or of a batch
+    #          of NEpochs epochs processed together (e.g. in pipeline
+    #          mode), whose epochs have no time of their own
+
+    # Parameters
+    # ==========
+    # NEpochs: int
+    #          Number of epochs processed since the previous mark
+    # Batch: bool
+    #        If True, the epochs were processed together as a batch
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Profiler["Mode"] == PROF_OFF or NEpochs == 0:
+        return
+
+    Now = time.perf_counter()
+    if Batch:
+        Profiler["BatchTimes"].append(Now - Profiler["EpochStart"])
+        Profiler["BatchEpochs"].append(NEpochs)
+    else:
+        Profiler["EpochTimes"].append(Now - Profiler["EpochStart"])
+    Profiler["EpochStart"] = Now
+
+# End of markProfilingEpochs()
+
+def stopProfiling(Path, Rcvr, Year, Doy):
+
+    # Purpose: stop the profiling of a receiver day and write its report
+    #          in JSON format (and the cProfile dumps of the stages next
+    #          to it, as <Path without .json>_<Stage>.prof)
+
+    # Parameters
+    # ==========
+    # Path: str
+    #       Path to the JSON report
+    # Rcvr: str
+    #       Receiver acronym
+    # Year: int
+    #       Year
+    # Doy: int
+    #      Day of year
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Profiler["Mode"] == PROF_OFF:
+        return
+
+    WallTime = time.perf_counter() - Profiler["Start"]
+    EpochTimes = np.array(Profiler["EpochTimes"])
+    BatchTimes = np.array(Profiler["BatchTimes"])
+    NEpochs = len(EpochTimes) + int(sum(Profiler["BatchEpochs"]))
+    EpochsTime = float(EpochTimes.sum() + BatchTimes.sum())
+
+    # The epoch latencies are only reported for the epochs processed
+    # alone, and the batch latencies for the batches
+    Report = OrderedDict({})
+    Report["Rcvr"] = Rcvr
+    Report["Year"] = Year
+    Report["Doy"] = Doy
+    Report["WallTime"] = WallTime
+    Report["Epochs"] = NEpochs
+    Report["EpochsPerSecond"] = NEpochs / EpochsTime if EpochsTime > 0 else None
+    Report["EpochLatencyP50"] = float(np.percentile(EpochTimes, 50)) if len(EpochTimes) > 0 else None
+    Report["EpochLatencyP99"] = float(np.percentile(EpochTimes, 99)) if len(EpochTimes) > 0 else None
+    Report["Batches"] = len(BatchTimes)
+    Report["EpochsPerBatch"] = float(np.mean(Profiler["BatchEpochs"])) if len(BatchTimes) > 0 else None
+    Report["BatchLatencyP50"] = float(np.percentile(BatchTimes, 50)) if len(BatchTimes) > 0 else None
+    Report["BatchLatencyP99"] = float(np.percentile(BatchTimes, 99)) if len(BatchTimes) > 0 else None
+    Report["PeakRssMB"] = getPeakMemory()
+
+    # Stages sorted by decreasing time
+    Report["Stages"] = OrderedDict({})
+    for Name, (Time, Calls) in sorted(Profiler["Stages"].items(), key = lambda Item: -Item[1][0]):
+        Report["Stages"][Name] = OrderedDict({})
+        Report["Stages"][Name]["Time"] = Time
+        Report["Stages"][Name]["Calls"] = Calls
+        Report["Stages"][Name]["TimePerCall"] = Time / Calls
+        Report["Stages"][Name]["Share"] = Time / WallTime if WallTime > 0 else None
+
+    os.makedirs(os.path.dirname(Path) or '.', exist_ok=True)
+    with open(Path, 'w') as f:
+        json.dump(Report, f, indent=1)
+
+    # cProfile dumps, to be read with pstats or snakeviz
+    for Name, Profile in Profiler["Profiles"].items():
+        Profile.dump_stats("%s_%s.prof" % (os.path.splitext(Path)[0], \
+            "".join(c if c.isalnum() else '_' for c in Name)))
+
+    print("INFO: Profiling report: %s" % Path)
+
+    Profiler["Mode"] = PROF_OFF
+
+# End of stopProfiling()
+
+########################################################################
+# END OF PROFILING FUNCTIONS MODULE
+########################################################################
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/ReadAhead.py:
+# This is the Read Ahead Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           ReadAhead.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+Common = os.path.dirname(os.path.dirname(
+    os.path.abspath(sys.argv[0]))) + '/COMMON'
+sys.path.insert(0, Common)
+import threading
+import queue
+from InputOutput import ObsIdx
+from InputOutput import readObsChunks, readObsEpochs
+from InputOutput import readIndexedCorrectEpochs
+from Profiling import profileStage
+
+# Read ahead internal parameters
+#-----------------------------------------------------------------------
+# Epochs passed through the queue at a time, not to synchronize the
+# threads at every epoch
+READ_AHEAD_CHUNK_EPOCHS = 60
+
+# Time waiting for a free slot in the queue before checking whether the
+# reading was stopped [s]
+READ_AHEAD_POLL = 0.1
+
+# End of the input files, queued after the last chunk
+END_OF_INPUTS = None
+
+# Read ahead internal functions
+#-----------------------------------------------------------------------
+
+def queueChunk(Reader, Chunk):
+
+    # Purpose: queue a chunk of epochs, waiting while the queue is full
+
+    # Returns
+    # =======
+    # Queued: bool
+    #         False if the reading was stopped before the chunk could
+    #         be queued
+
+    while not Reader["Stop"].is_set():
+        try:
+            Reader["Queue"].put(Chunk, timeout = READ_AHEAD_POLL)
+            return True
+
+        except queue.Full:
+            pass
+
+    return False
+
+# End of queueChunk()
+
+def readInputsAhead(Reader, Conf, ObsFile, SatInput, LosInput):
+
+    # Purpose: read the epochs of the OBS file, with the SAT and LOS info
+    #          of the sampled ones, and queue them by chunks. Runs in the
+    #          read ahead thread: errors are queued to be raised by the
+    #          processing thread, and the SAT and LOS info is not
+    #          checked here, so that the gaps are reported in the
+    #          processing order
+
+    try:
+        for ObsData, EpochIdx in readObsChunks(ObsFile, Reader["Control"]):
+            Chunk = []
+            for ObsInfo in readObsEpochs(ObsData, EpochIdx):
+                SatData = LosData = None
+
+                # SAT and LOS info only read at the configured sampling rate
+                Sod = int(float(ObsInfo[0][ObsIdx["SOD"]]))
+                if(Sod % Conf["SAMPLING_RATE"] == 0):
+                    SatData, LosData = readIndexedCorrectEpochs(SatInput, LosInput, Sod)
+
+                Chunk.append((ObsInfo, SatData, LosData))
+
+            if not queueChunk(Reader, Chunk):
+                return
+
+        queueChunk(Reader, END_OF_INPUTS)
+
+    except BaseException as Error:
+        queueChunk(Reader, Error)
+
+# End of readInputsAhead()
+
+# Read ahead main functions
+#-----------------------------------------------------------------------
+
+def readAheadEpochs(Conf, ObsFile, SatInput, LosInput):
+
+    # Purpose: iterate over the epochs of the OBS file, read ahead of the
+    #          processing in a background thread with the SAT and LOS
+    #          info of the sampled epochs
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary: up to Conf["READ_AHEAD"] epochs are
+    #       read ahead
+    # ObsFile: str
+    #          Path to OBS file
+    # SatInput: dict
+    #           Indexed SAT input file, only read by the thread until the
+    #           iteration ends
+    # LosInput: dict
+    #           Indexed LOS input file, only read by the thread until the
+    #           iteration ends
+
+    # Returns
+    # =======
+    # ObsInfo: numpy.ndarray (yielded)
+    #          OBS info of the epoch, as yielded by readObsEpochs
+    # SatData: numpy.ndarray (yielded)
+    #          SAT info of the epoch, as read by readIndexedCorrectEpochs
+    #          (None if the epoch is not sampled)
+    # LosData: numpy.ndarray (yielded)
+    #          LOS info of the epoch, as read by readIndexedCorrectEpochs
+    #          (None if the epoch is not sampled)
+
+    ChunkEpochs = max(min(READ_AHEAD_CHUNK_EPOCHS, int(Conf["READ_AHEAD"])), 1)
+
+    Reader = {
+        "Queue": queue.Queue(maxsize = max(int(Conf["READ_AHEAD"]) // ChunkEpochs, 1)),
+                                                    # Chunks read ahead
+        "Stop": threading.Event(),                  # Reading stopped
+        "Control": {"BatchEpochs": ChunkEpochs},    # Epochs per chunk
+    } # End of Reader
+
+    Thread = threading.Thread(target = readInputsAhead, name = "ReadAhead", daemon = True,
+        args = (Reader, Conf, ObsFile, SatInput, LosInput))
+    Thread.start()
+
+    # The thread is stopped when the iteration ends, also if the
+    # processing fails or stops before the end of the file
+    try:
+        while True:
+            with profileStage("READ_AHEAD_WAIT"):
+                Chunk = Reader["Queue"].get()
+
+            if Chunk is END_OF_INPUTS:
+                break
+
+            if isinstance(Chunk, BaseException):
+                raise Chunk
+
+            for Epoch in Chunk:
+                yield Epoch
+
+    finally:
+        Reader["Stop"].set()
+        Thread.join()
+
+# End of readAheadEpochs()
+
+########################################################################
+# END OF READ AHEAD FUNCTIONS MODULE
+########################################################################
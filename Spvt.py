@@ -29,8 +29,16 @@ from collections import OrderedDict
 from InputOutput import RcvrIdx
 from COMMON import GnssConstants
 from COMMON.Wlsq import wlsqComputation
+from Profiling import profileStage
 import numpy as np
 
+# Spvt internal parameters
+# ----------------------------------------------------------------------
+# Maximum residual max|N x inv(N) - I| of the NPA inverses updated from the PA ones,
+# which bounds their relative error. Above it, they are computed again from the NPA
+# normal matrices
+SPVT_UPDATE_TOL = 1e-9
+
 # Spvt internal functions
 # ----------------------------------------------------------------------
 
@@ -98,6 +106,252 @@ def computeProtectionLevels(GMatrix, WMatrix, PosInfo, Mode):
         PosInfo["Hpl"] = np.sqrt(((DDiag1[0] + DDiag1[1])/2) + np.sqrt(((DDiag1[0] - DDiag1[1])/2)**2 + DDiag2[0]**2))*GnssConstants.MOPS_KH_NPA
         PosInfo["Vpl"] = np.sqrt(DDiag1[2])*GnssConstants.MOPS_KV_NPA
 
+def initPosInfo(RcvrInfo, CorrInfo):
+
+    # Purpose: Initialize the spvt outputs of an epoch with the receiver position first guess
+
+    PosInfo = {
+        "Sod": 0.0,             # Second of day
+        "Doy": 0,               # Day of year
+        "Lon": 0.0,             # Receiver estimated longitude
+        "Lat": 0.0,             # Receiver estimated latitude
+        "Alt": 0.0,             # Receiver estimated altitude
+        "Clk": 0.0,             # Receiver estimated clock
+        "Sol": 0,               # 0: No solution 1: PA Sol 2: NPA Sol
+        "NumSatVis": 0.0,       # Number of visible satellites
+        "NumSatSol": 0.0,       # Number of visible satellites in solution
+        "Hpe": 0.0,             # HPE 
+        "Vpe": 0.0,             # VPE 
+        "Epe": 0.0,             # EPE
+        "Npe": 0.0,             # NPE 
+        "Hpl": 0.0,             # HPL
+        "Vpl": 0.0,             # VPL
+        "Hsi": 0.0,             # Horiontal Safety Index
+        "Vsi": 0.0,             # Vertical Safety Index
+        "Hdop": 0.0,            # HDOP
+        "Vdop": 0.0,            # VDOP
+        "Pdop": 0.0,            # PDOP
+        "Tdop": 0.0,            # TDOP
+    } # End of PosInfo
+
+    # Get SoD and DoY
+    PosInfo["Sod"] = CorrInfo[list(CorrInfo.keys())[0]]["Sod"]
+    PosInfo["Doy"] = CorrInfo[list(CorrInfo.keys())[0]]["Doy"]
+    # Get receiver coordinates first guess in the ENU reference frame
+    PosInfo["Lon"] = float(RcvrInfo[RcvrIdx["LON"]])
+    PosInfo["Lat"] = float(RcvrInfo[RcvrIdx["LAT"]])
+    PosInfo["Alt"] = float(RcvrInfo[RcvrIdx["ALT"]])
+
+    return PosInfo
+
+def buildGeometryBatch(CorrInfoList):
+
+    # Purpose: Build the geometry matrices G in the ENU reference frame and the diagonals of the 
+    # weighting matrices W of several epochs, zero-padded to the maximum number of satellites.
+    # G and W are built once for the NPA geometry (Flag 1 and Flag 2 satellites, in CorrInfo order),
+    # which is a superset of the PA geometry (Flag 1 satellites)
+
+    # Get the satellites available for PA or NPA at each epoch
+    SatsList = [[SatCorrInfo for SatCorrInfo in CorrInfo.values() if SatCorrInfo["Flag"] in (1, 2)] \
+        for CorrInfo in CorrInfoList]
+    MaxSats = max([len(Sats) for Sats in SatsList] + [1])
+
+    # Fill padded elevation, azimuth, sigma UERE and flag arrays
+    Elev = np.zeros((len(CorrInfoList), MaxSats))
+    Azim = np.zeros((len(CorrInfoList), MaxSats))
+    SigmaUere = np.ones((len(CorrInfoList), MaxSats))
+    Flag = np.zeros((len(CorrInfoList), MaxSats), dtype=int)
+    for Epoch, Sats in enumerate(SatsList):
+        for Sat, SatCorrInfo in enumerate(Sats):
+            Elev[Epoch, Sat] = SatCorrInfo["Elevation"]
+            Azim[Epoch, Sat] = SatCorrInfo["Azimuth"]
+            SigmaUere[Epoch, Sat] = SatCorrInfo["SigmaUere"]
+            Flag[Epoch, Sat] = SatCorrInfo["Flag"]
+
+    # Get the satellites used in the PA and NPA solutions
+    PaMask = Flag == 1
+    NpaMask = Flag > 0
+
+    # Convert degrees to radians
+    DegtoRad = np.pi / 180.0
+
+    # Compute geometry matrices G
+    CosElev = np.cos(Elev*DegtoRad)
+    GBatch = np.stack([- (CosElev*np.sin(Azim*DegtoRad)),
+                       - (CosElev*np.cos(Azim*DegtoRad)),
+                       - (np.sin(Elev*DegtoRad)),
+                       np.ones(Elev.shape)], axis=-1)
+    GBatch[~NpaMask] = 0.0
+
+    # Compute diagonal elements of the weighting matrices W
+    WBatch = np.where(NpaMask, 1/SigmaUere**2, 0.0)
+
+    return GBatch, WBatch, PaMask, NpaMask
+
+def invertNormalBatch(NBatch, Valid):
+
+    # Purpose: Invert a stack of normal matrices with one Cholesky factorization per matrix.
+    # The matrices of the epochs without solution are replaced by the identity
+
+    NBatch = np.where(Valid[:, np.newaxis, np.newaxis], NBatch, np.eye(NBatch.shape[-1]))
+
+    try:
+        # inv(N) = inv(L).T x inv(L), with N = L x L.T
+        LInv = np.linalg.inv(np.linalg.cholesky(NBatch))
+        return np.matmul(np.swapaxes(LInv, -1, -2), LInv)
+
+    except np.linalg.LinAlgError:
+        # Some matrix is not positive-definite: invert epoch by epoch
+        return np.array([np.linalg.inv(NMatrix) for NMatrix in NBatch])
+
+def updateInverseBatch(NInvBatch, UBatch, CInvBatch):
+
+    # Purpose: Update a stack of inverted normal matrices inv(N) after adding k rows U with weights C
+    # to the geometry (rank-k update of the normal matrix), with the Woodbury identity applied one
+    # row u at a time (Sherman-Morrison formula), without any further matrix inversion:
+    #   inv(N + u.T x c x u) = inv(N) - inv(N) x u.T x u x inv(N) / (1/c + u x inv(N) x u.T)
+    # Padded rows of U must be zero, with inv(C) = 1
+
+    NInvBatch = NInvBatch.copy()
+
+    # Only the epochs with the row are updated
+    NumRows = np.any(UBatch != 0, axis=-1).sum(axis=1)
+
+    for Row in range(UBatch.shape[1]):
+        Epochs = np.flatnonzero(NumRows > Row)
+        UVec = UBatch[Epochs, Row]
+        XVec = np.einsum("nij,nj->ni", NInvBatch[Epochs], UVec)
+        Den = CInvBatch[Epochs, Row] + (UVec*XVec).sum(axis=1)
+        NInvBatch[Epochs] -= XVec[:, :, np.newaxis]*(XVec/Den[:, np.newaxis])[:, np.newaxis, :]
+
+    return NInvBatch
+
+def getInverseResidual(NBatch, NInvBatch):
+
+    # Purpose: Get the residual max|N x inv(N) - I| of a stack of inverted normal matrices
+
+    Residual = np.matmul(NBatch, NInvBatch) - np.eye(NBatch.shape[-1])
+
+    return np.abs(Residual).max(axis=(-2, -1))
+
+def computeSpvtOutputsBatch(QBatch, DBatch, GBatch, WBatch, Mode):
+
+    # Purpose: Compute the DOPs, the S matrices and the protection levels of several epochs
+    # from their DOP matrices Q = inv(GT x G) and D = inv(GT x W x G)
+
+    # Initialize output
+    SpvtBatch = OrderedDict({})
+    SpvtBatch["Q"] = QBatch
+    SpvtBatch["D"] = DBatch
+
+    # Compute the DOPs
+    QDiag = np.diagonal(QBatch, axis1=-2, axis2=-1)
+    SpvtBatch["Hdop"] = np.sqrt(QDiag[:, 0] + QDiag[:, 1])
+    SpvtBatch["Vdop"] = np.sqrt(QDiag[:, 2])
+    SpvtBatch["Pdop"] = np.sqrt(QDiag[:, 0] + QDiag[:, 1] + QDiag[:, 2])
+    SpvtBatch["Tdop"] = np.sqrt(QDiag[:, 3])
+
+    # Compute the S matrices
+    SpvtBatch["S"] = np.matmul(DBatch, np.swapaxes(GBatch, -1, -2))*WBatch[:, np.newaxis, :]
+
+    # Compute the protection levels
+    if Mode == "PA":
+        KH = GnssConstants.MOPS_KH_PA
+        KV = GnssConstants.MOPS_KV_PA
+    else:
+        KH = GnssConstants.MOPS_KH_NPA
+        KV = GnssConstants.MOPS_KV_NPA
+    DDiag1 = np.diagonal(DBatch, axis1=-2, axis2=-1)
+    DDiag2 = DBatch[:, 0, 1]
+    SpvtBatch["Hpl"] = np.sqrt(((DDiag1[:, 0] + DDiag1[:, 1])/2) + \
+        np.sqrt(((DDiag1[:, 0] - DDiag1[:, 1])/2)**2 + DDiag2**2))*KH
+    SpvtBatch["Vpl"] = np.sqrt(DDiag1[:, 2])*KV
+
+    return SpvtBatch
+
+def solveSpvtBatch(GBatch, WBatch, Mask, Mode):
+
+    # Purpose: Compute the DOPs, the S matrices and the protection levels of several epochs
+    # using the satellites selected by Mask, with one factorization of each normal matrix
+
+    # Keep only the selected satellites
+    GBatch = GBatch*Mask[:, :, np.newaxis]
+    WBatch = WBatch*Mask
+    GTBatch = np.swapaxes(GBatch, -1, -2)
+
+    # Get epochs with enough satellites to compute the solution
+    Valid = Mask.sum(axis=1) >= GnssConstants.MIN_NUM_SATS_PVT
+
+    # Compute the normal matrices GT x G and GT x W x G
+    NBatch = np.matmul(GTBatch, GBatch)
+    NWBatch = np.matmul(GTBatch, WBatch[:, :, np.newaxis]*GBatch)
+
+    # Compute the DOP matrices Q and the D matrices
+    QBatch = invertNormalBatch(NBatch, Valid)
+    DBatch = invertNormalBatch(NWBatch, Valid)
+
+    SpvtBatch = computeSpvtOutputsBatch(QBatch, DBatch, GBatch, WBatch, Mode)
+
+    # Keep the normal matrices, to be updated with other satellites
+    SpvtBatch["N"] = NBatch
+    SpvtBatch["NW"] = NWBatch
+
+    return SpvtBatch
+
+def updateSpvtBatch(PaSpvtBatch, GBatch, WBatch, PaMask, NpaMask):
+
+    # Purpose: Derive the NPA DOPs, S matrices and protection levels of several epochs from the
+    # PA ones, adding the NPA-only satellites U with weights C to the PA solution with a rank-k
+    # update of the PA inverses (N + U.T x C x U). The PA inverses are reused as they are at the
+    # epochs without NPA-only satellites. The epochs without PA solution, or whose updated
+    # inverses are not accurate enough (ill-conditioned update), are factorized from scratch
+
+    # Get the NPA-only satellites of each epoch, packed at the beginning of the rows
+    AddMask = NpaMask & ~PaMask
+    NumAdd = AddMask.sum(axis=1)
+    K = max(int(NumAdd.max(initial=0)), 1)
+    Epochs, Sats = np.nonzero(AddMask)
+    Slots = np.arange(len(Sats)) - np.repeat(np.cumsum(NumAdd) - NumAdd, NumAdd)
+    UBatch = np.zeros((len(GBatch), K, 4))
+    UBatch[Epochs, Slots] = GBatch[Epochs, Sats]
+    CBatch = np.zeros((len(GBatch), K))
+    CBatch[Epochs, Slots] = WBatch[Epochs, Sats]
+    CInvBatch = np.ones((len(GBatch), K))
+    CInvBatch[Epochs, Slots] = 1/WBatch[Epochs, Sats]
+
+    # Start from the PA DOP matrices Q and D matrices
+    QBatch = PaSpvtBatch["Q"].copy()
+    DBatch = PaSpvtBatch["D"].copy()
+
+    # Get the epochs to be updated and the ones to be solved from scratch
+    PaValid = PaMask.sum(axis=1) >= GnssConstants.MIN_NUM_SATS_PVT
+    NpaValid = NpaMask.sum(axis=1) >= GnssConstants.MIN_NUM_SATS_PVT
+    Update = PaValid & (NumAdd > 0)
+    Full = NpaValid & ~PaValid
+
+    if Update.any():
+        # Update the DOP matrices Q (unit weights) and the D matrices
+        UUpd = UBatch[Update]
+        UTUpd = np.swapaxes(UUpd, -1, -2)
+        QBatch[Update] = updateInverseBatch(QBatch[Update], UUpd, np.ones((len(UUpd), K)))
+        DBatch[Update] = updateInverseBatch(DBatch[Update], UUpd, CInvBatch[Update])
+
+        # Check the updated inverses against the updated normal matrices
+        NUpd = PaSpvtBatch["N"][Update] + np.matmul(UTUpd, UUpd)
+        NWUpd = PaSpvtBatch["NW"][Update] + np.matmul(UTUpd, CBatch[Update][:, :, np.newaxis]*UUpd)
+        Inaccurate = np.maximum(getInverseResidual(NUpd, QBatch[Update]),
+            getInverseResidual(NWUpd, DBatch[Update])) > SPVT_UPDATE_TOL
+        Full[np.flatnonzero(Update)[Inaccurate]] = True
+
+    if Full.any():
+        GFull = GBatch[Full]
+        GTFull = np.swapaxes(GFull, -1, -2)
+        Valid = np.ones(len(GFull), dtype=bool)
+        QBatch[Full] = invertNormalBatch(np.matmul(GTFull, GFull), Valid)
+        DBatch[Full] = invertNormalBatch(np.matmul(GTFull, WBatch[Full][:, :, np.newaxis]*GFull), Valid)
+
+    return computeSpvtOutputsBatch(QBatch, DBatch, GBatch, WBatch, "NPA")
+
 # Spvt main function
 # -----------------------------------------------------------------------
 
@@ -153,37 +407,7 @@ def computeSpvtSolution(Conf, RcvrInfo, CorrInfo, Mode):
 
     # Check if corrected information is available at current epoch
     if len(CorrInfo) > 0:
-        PosInfo = {
-            "Sod": 0.0,             # Second of day
-            "Doy": 0,               # Day of year
-            "Lon": 0.0,             # Receiver estimated longitude
-            "Lat": 0.0,             # Receiver estimated latitude
-            "Alt": 0.0,             # Receiver estimated altitude
-            "Clk": 0.0,             # Receiver estimated clock
-            "Sol": 0,               # 0: No solution 1: PA Sol 2: NPA Sol
-            "NumSatVis": 0.0,       # Number of visible satellites
-            "NumSatSol": 0.0,       # Number of visible satellites in solution
-            "Hpe": 0.0,             # HPE 
-            "Vpe": 0.0,             # VPE 
-            "Epe": 0.0,             # EPE
-            "Npe": 0.0,             # NPE 
-            "Hpl": 0.0,             # HPL
-            "Vpl": 0.0,             # VPL
-            "Hsi": 0.0,             # Horiontal Safety Index
-            "Vsi": 0.0,             # Vertical Safety Index
-            "Hdop": 0.0,            # HDOP
-            "Vdop": 0.0,            # VDOP
-            "Pdop": 0.0,            # PDOP
-            "Tdop": 0.0,            # TDOP
-        } # End of PosInfo
-
-        # Get SoD and DoY
-        PosInfo["Sod"] = CorrInfo[list(CorrInfo.keys())[0]]["Sod"]
-        PosInfo["Doy"] = CorrInfo[list(CorrInfo.keys())[0]]["Doy"]
-        # Get receiver coordinates first guess in the ENU reference frame
-        PosInfo["Lon"] = float(RcvrInfo[RcvrIdx["LON"]])
-        PosInfo["Lat"] = float(RcvrInfo[RcvrIdx["LAT"]])
-        PosInfo["Alt"] = float(RcvrInfo[RcvrIdx["ALT"]])
+        PosInfo = initPosInfo(RcvrInfo, CorrInfo)
 
         # Loop over all satellites in CorrInfo dictionary
         for SatCorrInfo in CorrInfo.values():
@@ -242,6 +466,147 @@ def computeSpvtSolution(Conf, RcvrInfo, CorrInfo, Mode):
     return PosInfo
 
     # End of computespvtsolution:
+
+def computeSpvtSolutionBatch(Conf, RcvrInfo, CorrInfoList, Modes):
+
+    # Purpose: Compute the svpt solution of several epochs at once, in PA and/or NPA modes
+
+    # The geometry and weighting matrices of all the epochs are built once
+    # and stacked in zero-padded arrays. Each PA normal matrix is factorized
+    # once (Cholesky) and the DOPs, S matrices and protection levels are
+    # obtained with batched linear algebra. The NPA ones are derived from
+    # the PA ones with a rank-k update (Woodbury identity), since the NPA
+    # geometry adds the Flag 2 satellites to the PA one, checked against
+    # the updated normal matrices.
+    # The iterative WLSQ filter is then called epoch by epoch with the 
+    # precomputed S matrix.
+    # The results are equivalent to calling computeSpvtSolution for
+    # every epoch and mode, so this function can be used either with chunks
+    # of epochs while streaming or with a whole day.
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: list
+    #           Receiver information: position, masking angle...
+    # CorrInfoList: list
+    #               Corrected information per satellite of each epoch
+    #               CorrInfoList[0]["G01"]["C1"]
+    # Modes: list
+    #        Modes to compute: ["PA"], ["NPA"] or ["PA", "NPA"]
+
+    # Returns
+    # =======
+    # PosInfoBatch: dict
+    #               Spvt outputs for Rcvr on each epoch, per mode
+    #               PosInfoBatch["PA"][0]["Lat"]
+
+    # Initialize output
+    PosInfoBatch = OrderedDict({})
+
+    # Build the geometry and weighting matrices, shared by the modes
+    with profileStage("SPVT_GEOMETRY"):
+        GBatch, WBatch, PaMask, NpaMask = buildGeometryBatch(CorrInfoList)
+
+    # Solve all epochs, each mode timed on its own
+    SpvtBatch = OrderedDict({})
+    with profileStage("SPVT_PA"):
+        SpvtBatch["PA"] = solveSpvtBatch(GBatch, WBatch, PaMask, "PA")
+    if "NPA" in Modes:
+        with profileStage("SPVT_NPA"):
+            SpvtBatch["NPA"] = updateSpvtBatch(SpvtBatch["PA"], GBatch, WBatch, PaMask, NpaMask)
+    Masks = {"PA": PaMask, "NPA": NpaMask}
+
+    # Loop over all modes and epochs
+    for Mode in Modes:
+        with profileStage("SPVT_" + Mode):
+            PosInfoBatch[Mode] = []
+            NumSatSol = Masks[Mode].sum(axis=1)
+
+            for Epoch, CorrInfo in enumerate(CorrInfoList):
+                PosInfo = OrderedDict({})
+
+                # Check if corrected information is available at current epoch
+                if len(CorrInfo) > 0:
+                    PosInfo = initPosInfo(RcvrInfo, CorrInfo)
+
+                    # Get number of visible satellites and satellites used in the solution
+                    PosInfo["NumSatVis"] = len(CorrInfo)
+                    PosInfo["NumSatSol"] = int(NumSatSol[Epoch])
+
+                    # Check the number of available satellites for computing the solution
+                    if NumSatSol[Epoch] >= GnssConstants.MIN_NUM_SATS_PVT:
+                        # Get DOPS
+                        for Dop in ["Hdop", "Vdop", "Pdop", "Tdop"]:
+                            PosInfo[Dop] = SpvtBatch[Mode][Dop][Epoch]
+
+                        if PosInfo["Pdop"] < float(Conf["PDOP_MAX"]):
+                            # Call WLSQ function
+                            SMatrix = SpvtBatch[Mode]["S"][Epoch][:, Masks[Mode][Epoch]]
+                            wlsqComputation(Conf, CorrInfo, PosInfo, SMatrix, Mode)
+                            # Get protection levels
+                            PosInfo["Hpl"] = SpvtBatch[Mode]["Hpl"][Epoch]
+                            PosInfo["Vpl"] = SpvtBatch[Mode]["Vpl"][Epoch]
+                            # Compute safety indexes
+                            PosInfo["Hsi"] = PosInfo["Hpe"]/PosInfo["Hpl"]
+                            PosInfo["Vsi"] = PosInfo["Vpe"]/PosInfo["Vpl"]
+
+                        # End of if(PosInfo["Pdop"] < float(Conf["PDOP_MAX"])):
+
+                    # End if(NumSatSol[Epoch] >= GnssConstants.MIN_NUM_SATS_PVT):
+
+                PosInfoBatch[Mode].append(PosInfo)
+
+            # End of for Epoch, CorrInfo in enumerate(CorrInfoList):
+
+    # End of for Mode in Modes:
+
+    return PosInfoBatch
+
+    # End of computeSpvtSolutionBatch:
+
+def computeSpvtEpochs(Conf, RcvrInfo, CorrInfoList):
+
+    # Purpose: Compute the svpt solution of several epochs in the activated modes
+
+    # In PA mode only and with SPVT_BATCH = 1, the epochs are solved one by one
+    # with computeSpvtSolution. Otherwise, they are solved together with 
+    # computeSpvtSolutionBatch, which also shares the PA and NPA geometry.
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary
+    # RcvrInfo: list
+    #           Receiver information: position, masking angle...
+    # CorrInfoList: list
+    #               Corrected information per satellite of each epoch
+
+    # Returns
+    # =======
+    # PosInfoBatch: dict
+    #               Spvt outputs for Rcvr on each epoch, per mode
+    #               PosInfoBatch["PA"][0]["Lat"]
+
+    # Get the activated modes
+    Modes = ["PA"]
+    if Conf["NPA"][0] == 1:
+        Modes.append("NPA")
+
+    # If epoch by epoch computation in PA mode only
+    if Conf["SPVT_BATCH"] == 1 and len(Modes) == 1:
+        PosInfoBatch = OrderedDict({})
+        with profileStage("SPVT_PA"):
+            PosInfoBatch["PA"] = [computeSpvtSolution(Conf, RcvrInfo, CorrInfo, "PA") \
+                for CorrInfo in CorrInfoList]
+
+        return PosInfoBatch
+
+    # Otherwise, build the geometry once and derive NPA from PA
+    return computeSpvtSolutionBatch(Conf, RcvrInfo, CorrInfoList, Modes)
+
+    # End of computeSpvtEpochs:
     
     ########################################################################
     # END OF SVPT FUNCTIONS MODULE
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+########################################################################
+# StanfordMerge.py:
+# This is the Standford Diagrams Merging Module of PETRUS tool
+#
+#  Project:        PETRUS
+#  File:           StanfordMerge.py
+#  Date(YY/MM/DD): 01/02/21
+#
+#   Author: GNSS Academy
+#   Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+# Usage:
+#   StanfordMerge.py $OUT_PREFIX PA|NPA $STANFORD_FILE [$STANFORD_FILE ...]
+#
+#   Sums the Standford diagrams grids (STANFORD_*.npz files written by
+#   Petrus.py) of several days and/or receivers, and writes the merged
+#   grids in $OUT_PREFIX.npz and the merged Standford diagrams in
+#   $OUT_PREFIX_HOR.png and $OUT_PREFIX_VER.png
+########################################################################
+
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys
+from collections import OrderedDict
+from InputOutput import readHist2D, writeHist2D
+from Histogram import mergeHist2D
+from PosPlots import initHorStand, initVerStand, plotStanfordGrid
+
+#----------------------------------------------------------------------
+# INTERNAL FUNCTIONS
+#----------------------------------------------------------------------
+
+# Solution modes
+MERGE_MODES = ["PA", "NPA"]
+
+def displayUsage():
+    sys.stderr.write("ERROR: Please provide the output prefix, the mode and the grids files\n")
+    sys.stderr.write("Usage: StanfordMerge.py $OUT_PREFIX PA|NPA $STANFORD_FILE [$STANFORD_FILE ...]\n")
+
+def mergeStanfordGrids(StanfordFiles):
+
+    # Purpose: sum the Standford diagrams grids of several files
+
+    # Parameters
+    # ==========
+    # StanfordFiles: list
+    #                Paths to the Standford diagrams grids files
+
+    # Returns
+    # =======
+    # Grids: dict
+    #        Merged 2D histogram per diagram (HOR, VER)
+
+    Grids = OrderedDict({})
+
+    for StanfordFile in StanfordFiles:
+        for Name, Grid in readHist2D(StanfordFile).items():
+            if Name not in Grids:
+                Grids[Name] = Grid
+            else:
+                mergeHist2D(Grids[Name], Grid)
+
+    return Grids
+
+# End of mergeStanfordGrids()
+
+#######################################################
+# MAIN BODY
+#######################################################
+
+if __name__ == "__main__":
+
+    # Check the arguments
+    if len(sys.argv) < 4 or sys.argv[2] not in MERGE_MODES:
+        displayUsage()
+        sys.exit()
+
+    OutPrefix = sys.argv[1]
+    Sol = [sys.argv[2]]
+    StanfordFiles = sys.argv[3:]
+
+    # Merge the grids and write them
+    Grids = mergeStanfordGrids(StanfordFiles)
+    writeHist2D(OutPrefix + ".npz", Grids)
+
+    # Plot the merged diagrams
+    Titles = {"HOR": "Horizontal Standford Diagram", "VER": "Vertical Standford Diagram"}
+    initStand = {"HOR": initHorStand, "VER": initVerStand}
+    for Name, Grid in Grids.items():
+        PlotConf = {}
+        PlotConf["Title"] = "%s in %s from %d files" % (Titles[Name], Sol[0], len(StanfordFiles))
+        PlotConf["Path"] = "%s_%s.png" % (OutPrefix, Name)
+        initStand[Name](PlotConf, Sol)
+        plotStanfordGrid(PlotConf, Grid)
+
+    print("INFO: %d grids files merged: %s.npz" % (len(StanfordFiles), OutPrefix))
+
+#######################################################
+# End of StanfordMerge.py
+#######################################################
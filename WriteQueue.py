@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+
+########################################################################
+# PETRUS/SRC/WriteQueue.py:
+# This is the Write Queue Module of PETRUS tool
+#
+# Project:        PETRUS
+# File:           WriteQueue.py
+# Date(YY/MM/DD): 16/02/21
+#
+# Author: GNSS Academy
+# Copyright 2021 GNSS Academy
+#
+# -----------------------------------------------------------------
+# Date       | Author             | Action
+# -----------------------------------------------------------------
+#
+########################################################################
+
+# Import External and Internal functions and Libraries
+#----------------------------------------------------------------------
+import sys, os
+# Add path to find all modules
+Common = os.path.dirname(os.path.dirname(
+    os.path.abspath(sys.argv[0]))) + '/COMMON'
+sys.path.insert(0, Common)
+import threading
+import queue
+from InputOutput import endOutputEpoch
+
+# Write queue internal parameters
+#-----------------------------------------------------------------------
+# Time waiting for a free slot in the queue before checking whether the
+# writer thread failed [s]
+WRITE_QUEUE_POLL = 0.1
+
+# End of the outputs, queued after the last epoch
+END_OF_OUTPUTS = None
+
+# Write queue internal functions
+#-----------------------------------------------------------------------
+
+def writeOutputsThread(Writer):
+
+    # Purpose: run the queued write jobs in order. Runs in the writer
+    #          thread: an error stops the thread and is kept to be
+    #          raised by the processing thread
+
+    try:
+        while True:
+            Jobs = Writer["Queue"].get()
+            if Jobs is END_OF_OUTPUTS:
+                return
+
+            for WriteFunc, Args in Jobs:
+                WriteFunc(*Args)
+
+    except BaseException as Error:
+        Writer["Error"] = Error
+
+# End of writeOutputsThread()
+
+def raiseWriteError(Writer):
+
+    # Purpose: raise in the processing thread the error of the writer
+    #          thread, if any
+
+    if Writer["Error"] is not None:
+        raise Writer["Error"]
+
+# End of raiseWriteError()
+
+def queueJobs(Writer, Jobs):
+
+    # Purpose: queue the write jobs of an epoch, waiting while the queue
+    #          is full (i.e. while the writer thread is behind by the
+    #          configured number of epochs)
+
+    while True:
+        raiseWriteError(Writer)
+
+        try:
+            Writer["Queue"].put(Jobs, timeout = WRITE_QUEUE_POLL)
+            return
+
+        except queue.Full:
+            pass
+
+# End of queueJobs()
+
+# Write queue main functions
+#-----------------------------------------------------------------------
+
+def openWriteQueue(Conf):
+
+    # Purpose: start the thread writing the outputs of a receiver day,
+    #          if activated
+
+    # Parameters
+    # ==========
+    # Conf: dict
+    #       Configuration dictionary: up to Conf["WRITE_QUEUE"] epochs
+    #       of outputs are queued (0: the outputs are written when they
+    #       are queued, in the calling thread)
+
+    # Returns
+    # =======
+    # Writer: dict
+    #         Write queue (None if not activated)
+
+    if int(Conf["WRITE_QUEUE"]) == 0:
+        return None
+
+    Writer = {
+        "Queue": queue.Queue(maxsize = int(Conf["WRITE_QUEUE"])),
+                                                    # Write jobs per epoch
+        "Jobs": [],                                 # Write jobs of the current epoch
+        "Error": None,                              # Error of the writer thread
+        "Thread": None,                             # Writer thread
+    } # End of Writer
+
+    Writer["Thread"] = threading.Thread(target = writeOutputsThread, name = "WriteQueue",
+        daemon = True, args = (Writer,))
+    Writer["Thread"].start()
+
+    return Writer
+
+# End of openWriteQueue()
+
+def queueWrite(Writer, WriteFunc, *Args):
+
+    # Purpose: queue the writing of the outputs of an epoch to the writer
+    #          thread, or write them if there is no writer thread
+
+    # Parameters
+    # ==========
+    # Writer: dict
+    #         Write queue (None if not activated)
+    # WriteFunc: function
+    #            Function writing the outputs (e.g. generatePreproFile)
+    # Args: tuple
+    #       Arguments of WriteFunc: output file writer and the
+    #       outputs, which must not be modified once queued
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Writer is None:
+        WriteFunc(*Args)
+        return
+
+    Writer["Jobs"].append((WriteFunc, Args))
+
+# End of queueWrite()
+
+def endWriteEpoch(Writer, Files):
+
+    # Purpose: notify the end of an epoch to the output file writers and
+    #          pass the write jobs of the epoch to the writer thread
+
+    # Parameters
+    # ==========
+    # Writer: dict
+    #         Write queue (None if not activated)
+    # Files: list
+    #        Output file writers written at every epoch
+
+    # Returns
+    # =======
+    # Nothing
+
+    for f in Files:
+        queueWrite(Writer, endOutputEpoch, f)
+
+    if Writer is not None:
+        queueJobs(Writer, Writer["Jobs"])
+        Writer["Jobs"] = []
+
+# End of endWriteEpoch()
+
+def closeWriteQueue(Writer):
+
+    # Purpose: wait until all the queued outputs are written and stop
+    #          the writer thread. The output files can be closed after
+
+    # Parameters
+    # ==========
+    # Writer: dict
+    #         Write queue (None if not activated)
+
+    # Returns
+    # =======
+    # Nothing
+
+    if Writer is None:
+        return
+
+    # Outputs queued after the last epoch
+    if len(Writer["Jobs"]) > 0:
+        queueJobs(Writer, Writer["Jobs"])
+        Writer["Jobs"] = []
+
+    queueJobs(Writer, END_OF_OUTPUTS)
+    Writer["Thread"].join()
+
+    raiseWriteError(Writer)
+
+# End of closeWriteQueue()
+
+########################################################################
+# END OF WRITE QUEUE FUNCTIONS MODULE
+########################################################################